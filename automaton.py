@@ -0,0 +1,241 @@
+# A stepping engine for Life-like cellular automata.
+#
+# example.process_grid counts each cell's non-zero neighbours; a cellular
+# automaton does the same for every cell, every generation, and decides
+# from the count whether the cell is alive next time. Doing that for the
+# whole grid each step costs the grid's area even when only a glider is
+# moving, so this engine:
+# - keeps the cells in two flat bytearrays (this generation and the next)
+#   and swaps them after each step, instead of copying rows;
+# - pads the grid with a border as wide as the neighbourhood, so every
+#   neighbour is a fixed offset away and no bounds checks are needed;
+# - only looks at cells whose neighbourhood held a change last step. Any
+#   other cell sees exactly what it saw before, so it cannot change. The
+#   work per step follows the activity, not the size of the grid.
+#   The exception is a rule with B0, where a dead cell with no live
+#   neighbours is born: a quiet cell can then change too, so every
+#   generation is worked out over the whole grid.
+#
+# Rules use the usual B/S notation: "B3/S23" (Conway's Life) means a dead
+# cell with 3 live neighbours is born and a live cell with 2 or 3 survives.
+
+def parse_rule(rule):
+    """
+    Reads a rule like "B3/S23".
+
+    Parameters:
+    - rule (str or tuple): The rule in B/S notation, or a (birth, survival)
+                           pair of iterables of neighbour counts.
+
+    Returns:
+    - tuple of frozenset: (birth, survival) neighbour counts.
+
+    Raises:
+    - ValueError: If the rule cannot be read.
+    """
+    if not isinstance(rule, str):
+        birth, survival = rule
+        return frozenset(birth), frozenset(survival)
+    parts = {}
+    for part in rule.upper().replace(" ", "").split("/"):
+        digits = part[1:]
+        if not part or part[0] not in "BS" or (digits and not digits.isdigit()):
+            raise ValueError(f"Cannot read the rule {rule!r}.")
+        parts[part[0]] = frozenset(int(digit) for digit in digits)
+    if set(parts) != {"B", "S"}:
+        raise ValueError(f"The rule {rule!r} needs a B part and an S part.")
+    return parts["B"], parts["S"]
+
+def neighbourhood_offsets(neighbourhood="moore", radius=1):
+    """
+    Lists the (row, col) offsets of a cell's neighbours.
+
+    Parameters:
+    - neighbourhood (str or iterable): "moore" (the square around the cell),
+                                       "von_neumann" (the diamond), or the
+                                       offsets themselves.
+    - radius (int): How far the neighbourhood reaches (default is 1).
+
+    Returns:
+    - list of tuple of int: The offsets, without (0, 0).
+    """
+    if not isinstance(neighbourhood, str):
+        return [offset for offset in neighbourhood if offset != (0, 0)]
+    if neighbourhood not in ("moore", "von_neumann"):
+        raise ValueError(f"Unknown neighbourhood {neighbourhood!r}.")
+    return [(dr, dc)
+            for dr in range(-radius, radius + 1)
+            for dc in range(-radius, radius + 1)
+            if (dr or dc) and (neighbourhood == "moore" or abs(dr) + abs(dc) <= radius)]
+
+class Automaton:
+    """
+    A grid of live and dead cells that can be stepped through generations.
+
+    Cells outside the grid count as dead.
+
+    Parameters:
+    - rows (int): The number of rows.
+    - cols (int): The number of columns.
+    - rule (str or tuple): The rule, e.g. "B3/S23" (see parse_rule).
+    - neighbourhood (str or iterable): See neighbourhood_offsets.
+    - radius (int): The neighbourhood's reach (default is 1).
+    """
+
+    def __init__(self, rows, cols, rule="B3/S23", neighbourhood="moore", radius=1):
+        self.rows = rows
+        self.cols = cols
+        self.offsets = neighbourhood_offsets(neighbourhood, radius)
+        self.birth, self.survival = parse_rule(rule)
+        self.generation = 0
+        self.population = 0
+
+        # The padded grid: a border as wide as the neighbourhood's reach
+        self._pad = max((max(abs(dr), abs(dc)) for dr, dc in self.offsets), default=0)
+        self._width = cols + 2 * self._pad
+        size = (rows + 2 * self._pad) * self._width
+        self._cells = bytearray(size)
+        self._next = bytearray(size)
+        self._inside = bytearray(size)  # 1 for real cells, 0 for the border
+        for row in range(rows):
+            start = self._index(row, 0)
+            self._inside[start:start + cols] = b"\1" * cols
+        self._flat_offsets = [dr * self._width + dc for dr, dc in self.offsets]
+        # A change at a cell matters to every cell that has it as a neighbour
+        self._watcher_offsets = [-offset for offset in self._flat_offsets]
+
+        # What a cell becomes, by whether it is alive and its live neighbours
+        counts = range(len(self.offsets) + 1)
+        self._next_state = (bytes(1 if count in self.birth else 0 for count in counts),
+                            bytes(1 if count in self.survival else 0 for count in counts))
+        self._changed = set()  # Padded indexes that changed since the last step
+        # With B0 quiet cells change too, so every cell is looked at each step
+        self._every_cell = (
+            [index for index, real in enumerate(self._inside) if real]
+            if 0 in self.birth else None)
+
+    @classmethod
+    def from_grid(cls, grid, **options):
+        """
+        Creates an automaton from a list of lists, where non-zero cells are alive.
+
+        Parameters:
+        - grid (list of list): The starting cells.
+        - options: rule, neighbourhood and radius, as for Automaton.
+
+        Returns:
+        - Automaton: The automaton.
+        """
+        rows = len(grid)
+        cols = max((len(row) for row in grid), default=0)
+        automaton = cls(rows, cols, **options)
+        for row, cells in enumerate(grid):
+            for col, cell in enumerate(cells):
+                if cell:
+                    automaton.set(row, col, True)
+        return automaton
+
+    def _index(self, row, col):
+        return (row + self._pad) * self._width + col + self._pad
+
+    def __getitem__(self, key):
+        row, col = key
+        return self._cells[self._index(row, col)]
+
+    def set(self, row, col, alive=True):
+        """
+        Makes a cell alive or dead.
+
+        Parameters:
+        - row (int): The row index of the cell.
+        - col (int): The column index of the cell.
+        - alive (bool): The new state (default is True).
+        """
+        if not (0 <= row < self.rows and 0 <= col < self.cols):
+            raise IndexError(f"({row}, {col}) is not on the grid.")
+        index = self._index(row, col)
+        value = 1 if alive else 0
+        if self._cells[index] != value:
+            self._cells[index] = self._next[index] = value
+            self.population += 1 if value else -1
+            self._changed.add(index)
+
+    @property
+    def active(self):
+        """
+        int: How many cells changed in the last step (or since it).
+        """
+        return len(self._changed)
+
+    def step(self, generations=1):
+        """
+        Advances the grid.
+
+        Parameters:
+        - generations (int): How many generations to advance (default is 1).
+
+        Returns:
+        - int: The number of cells that changed in the last generation.
+        """
+        cells, following, inside = self._cells, self._next, self._inside
+        flat_offsets, watchers = self._flat_offsets, self._watcher_offsets
+        next_state = self._next_state
+        changed = self._changed
+        every_cell = self._every_cell
+        for done in range(generations):
+            if every_cell is not None:
+                candidates = every_cell
+            elif not changed:  # Nothing moved, so nothing ever will
+                self.generation += generations - done
+                break
+            else:
+                # Cells that might change: those watching a cell that just did
+                candidates = set(changed)
+                for index in changed:
+                    for offset in watchers:
+                        candidates.add(index + offset)
+
+            now_changed = []
+            for index in candidates:
+                if not inside[index]:
+                    continue
+                count = 0
+                for offset in flat_offsets:
+                    count += cells[index + offset]
+                value = next_state[cells[index]][count]
+                if value != cells[index]:
+                    following[index] = value
+                    now_changed.append(index)
+
+            # Swap the buffers, then bring the spare one up to date so the
+            # two agree everywhere before the next step writes into it
+            cells, following = following, cells
+            for index in now_changed:
+                following[index] = cells[index]
+                self.population += 1 if cells[index] else -1
+            changed = set(now_changed)
+            self.generation += 1
+
+        self._cells, self._next = cells, following
+        self._changed = changed
+        return len(changed)
+
+    def live_cells(self):
+        """
+        Lists the live cells.
+
+        Returns:
+        - list of tuple of int: The (row, col) of each live cell.
+        """
+        return [(row, col) for row in range(self.rows) for col in range(self.cols)
+                if self._cells[self._index(row, col)]]
+
+    def to_grid(self):
+        """
+        Converts the cells to a list of lists of 0 and 1.
+
+        Returns:
+        - list of list of int: The grid.
+        """
+        return [list(self._cells[self._index(row, 0):self._index(row, self.cols)])
+                for row in range(self.rows)]
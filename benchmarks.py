@@ -0,0 +1,263 @@
+# Benchmarks for the grid functions.
+# Run with: python benchmarks.py [--full] [--output results.json]
+#                                [--baseline baseline.json] [--save-baseline baseline.json]
+#
+# Every case reports how many operations per second it manages and the peak
+# memory it allocates (measured with tracemalloc in a separate run, so the
+# tracing does not slow the timing down). Results are printed as JSON and can
+# be compared against a baseline file saved from an earlier run.
+
+import argparse
+import contextlib
+import json
+import os
+import platform
+import random
+import time
+import tracemalloc
+
+import example
+import tutorial
+from minesweeper import (build_count_grid, count_adjacent_mines, create_random_grid,
+                         mark_mines, print_grid, reveal_cell)
+from optional import load_numpy
+
+QUICK_SIZES = (10, 100, 500)
+FULL_SIZES = (10, 100, 1000, 4000)
+DENSITIES = (0.01, 0.1, 0.2, 0.5)
+SEED = 0
+
+def time_call(func, *args, repeat=3):
+    """
+    Times a function call and keeps the best of a few runs.
+
+    Parameters:
+    - func (callable): The function to time.
+    - args: The arguments passed to the function.
+    - repeat (int): How many times to run it (default is 3).
+
+    Returns:
+    - float: The fastest run in seconds.
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def peak_memory(func, *args):
+    """
+    Measures the most memory allocated while a function runs.
+
+    Parameters:
+    - func (callable): The function to measure.
+    - args: The arguments passed to the function.
+
+    Returns:
+    - int: The peak number of bytes allocated.
+    """
+    tracemalloc.start()
+    try:
+        func(*args)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+def measure(func, *args, ops=1, repeat=3):
+    """
+    Times and measures one benchmark case.
+
+    Parameters:
+    - func (callable): The function to run.
+    - args: The arguments passed to the function.
+    - ops (int): How many operations one call of func performs (default is 1).
+    - repeat (int): How many timed runs to take the best of (default is 3).
+
+    Returns:
+    - dict: The operations per second, best time and peak memory.
+    """
+    seconds = time_call(func, *args, repeat=repeat)
+    return {
+        "ops_per_sec": ops / seconds if seconds else float("inf"),
+        "seconds": seconds,
+        "peak_bytes": peak_memory(func, *args),
+    }
+
+def random_cells(rows, cols, count, rng):
+    """
+    Picks random cells to probe.
+
+    Parameters:
+    - rows (int): The number of rows in the grid.
+    - cols (int): The number of columns in the grid.
+    - count (int): How many cells to pick.
+    - rng (random.Random): The random source.
+
+    Returns:
+    - list of tuple of int: The (row, col) of each picked cell.
+    """
+    return [(rng.randrange(rows), rng.randrange(cols)) for _ in range(count)]
+
+def count_every_cell(grid):
+    """
+    Counts the adjacent mines of every cell one at a time (the old path).
+
+    Parameters:
+    - grid (list of list of str): The grid with "#" for mines.
+
+    Returns:
+    - list of list of int: The number of adjacent mines for each cell.
+    """
+    return [[count_adjacent_mines(grid, row, col) for col in range(len(grid[0]))]
+            for row in range(len(grid))]
+
+def count_cells(grid, cells):
+    # count_adjacent_mines on a plain list, so nothing is precomputed
+    for row, col in cells:
+        count_adjacent_mines(grid, row, col)
+
+def reveal_cells(grid, visible_grid, cells):
+    for row, col in cells:
+        reveal_cell(grid, visible_grid, row, col)
+
+def print_to_null(grid):
+    with open(os.devnull, "w") as sink, contextlib.redirect_stdout(sink):
+        print_grid(grid)
+
+def seeded_grid(size, density):
+    # create_random_grid uses the global random module, so seed it first
+    random.seed(SEED)
+    return create_random_grid(size, size, density)
+
+def minesweeper_cases(size, density, probes=10_000):
+    """
+    Yields the Minesweeper benchmark cases for one board size and density.
+
+    Parameters:
+    - size (int): The side length of the square board.
+    - density (float): The chance of a cell being a mine.
+    - probes (int): How many cells the per-cell cases touch.
+
+    Returns:
+    - generator of tuple: (name, func, args, ops) for each case.
+    """
+    rng = random.Random(SEED)
+    grid = seeded_grid(size, density)
+    plain_grid = [list(row) for row in grid]
+    cells = random_cells(size, size, probes, rng)
+    cell_count = size * size
+
+    yield "create_random_grid", seeded_grid, (size, density), cell_count
+    yield "build_count_grid", build_count_grid, (plain_grid,), cell_count
+    yield "count_adjacent_mines", count_cells, (plain_grid, cells), probes
+    visible_grid = [["-"] * size for _ in range(size)]
+    yield "reveal_cell", reveal_cells, (grid, visible_grid, cells), probes
+    yield "mark_mines", mark_mines, (grid, visible_grid), cell_count
+    if density == DENSITIES[0]:
+        # Printing does not depend on where the mines are
+        yield "print_grid", print_to_null, (visible_grid,), cell_count
+
+def image_cases(size):
+    """
+    Yields the grid and image benchmark cases for one size.
+
+    Parameters:
+    - size (int): The side length of the square image.
+
+    Returns:
+    - generator of tuple: (name, func, args, ops) for each case.
+    """
+    rng = random.Random(SEED)
+    grid = [[rng.choice((0, 0, 0, 1, 2)) for _ in range(size)] for _ in range(size)]
+    yield "example.process_grid", example.process_grid, (grid,), size * size
+    yield "example.process_grid_fast", example.process_grid_fast, (grid,), size * size
+    image = [[rng.randrange(-50, 400) for _ in range(size)] for _ in range(size)]
+    yield "tutorial.normalize_image", tutorial.normalize_image, (image,), size * size
+    yield "tutorial.threshold_image", tutorial.threshold_image, (image,), size * size
+
+def run_suite(sizes=QUICK_SIZES, densities=DENSITIES, repeat=3):
+    """
+    Runs every benchmark case.
+
+    Parameters:
+    - sizes (tuple of int): The board and image side lengths to sweep.
+    - densities (tuple of float): The mine densities to sweep.
+    - repeat (int): How many timed runs to take the best of (default is 3).
+
+    Returns:
+    - dict: Information about the machine and a result for each case.
+    """
+    # NumPy is loaded the first time it is used; load it now so its import
+    # is not timed as part of the first process_grid_fast case
+    load_numpy()
+    results = {}
+    for size in sizes:
+        for density in densities:
+            for name, func, args, ops in minesweeper_cases(size, density):
+                key = f"{name}[{size}x{size},d={density}]"
+                results[key] = measure(func, *args, ops=ops, repeat=repeat)
+        for name, func, args, ops in image_cases(size):
+            key = f"{name}[{size}x{size}]"
+            results[key] = measure(func, *args, ops=ops, repeat=repeat)
+    return {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "cases": results,
+    }
+
+def compare(results, baseline, tolerance=0.1):
+    """
+    Compares results with a baseline run.
+
+    Parameters:
+    - results (dict): The output of run_suite.
+    - baseline (dict): An earlier output of run_suite.
+    - tolerance (float): How much slower a case may be before it counts
+                         as a regression (default is 0.1, 10%).
+
+    Returns:
+    - dict: For each case found in both runs, the speed ratio (above 1 is
+            faster than the baseline) and whether it regressed.
+    """
+    comparison = {}
+    for key, result in results["cases"].items():
+        old = baseline.get("cases", {}).get(key)
+        if old is None or not old["ops_per_sec"]:
+            continue
+        ratio = result["ops_per_sec"] / old["ops_per_sec"]
+        comparison[key] = {
+            "speed_ratio": ratio,
+            "memory_ratio": result["peak_bytes"] / max(old["peak_bytes"], 1),
+            "regressed": ratio < 1 - tolerance,
+        }
+    return comparison
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the grid functions.")
+    parser.add_argument("--full", action="store_true",
+                        help="sweep sizes up to 4000x4000 (slow)")
+    parser.add_argument("--sizes", type=int, nargs="+", help="board sizes to sweep")
+    parser.add_argument("--densities", type=float, nargs="+", help="mine densities to sweep")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", help="write the JSON results to this file")
+    parser.add_argument("--baseline", help="compare against this results file")
+    parser.add_argument("--save-baseline", help="also save the results as a baseline")
+    parser.add_argument("--tolerance", type=float, default=0.1)
+    args = parser.parse_args()
+
+    sizes = args.sizes or (FULL_SIZES if args.full else QUICK_SIZES)
+    results = run_suite(sizes, args.densities or DENSITIES, args.repeat)
+    if args.baseline:
+        with open(args.baseline) as file:
+            results["comparison"] = compare(results, json.load(file), args.tolerance)
+
+    text = json.dumps(results, indent=2)
+    print(text)
+    for path in (args.output, args.save_baseline):
+        if path:
+            with open(path, "w") as file:
+                file.write(text + "\n")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,438 @@
+# A compact Minesweeper board for very large grids.
+#
+# The list of lists version in minesweeper.py stores every cell as its own
+# string inside its own row list. That is easy to read but costs a lot of
+# memory on big boards. This board keeps the same information in flat
+# byte arrays using row-major indexing (index = row * cols + col):
+# - mines: one bit per cell.
+# - cells: one byte per cell, holding the adjacent mine count (bits 0-3),
+#          whether the cell is revealed (bit 4) and whether it is flagged (bit 5).
+# A MineIndex (see mineindex.py) can also list where the mines are, so work
+# on just the mines does not have to scan the whole board. It is built the
+# first time it is used, since on a dense board it is bigger than the rest.
+
+import random
+
+from generation import place_mines
+from mineindex import MineIndex, bitset_indexes
+from optional import load_numpy
+
+COUNT_MASK = 0x0F
+REVEALED = 0x10
+FLAGGED = 0x20
+
+class CompactBoard:
+    """
+    A Minesweeper board stored as a mine bitset plus one byte per cell.
+
+    It offers the same operations as the list of lists functions in
+    minesweeper.py (count_adjacent_mines, reveal_cell, mark_mines and
+    print_grid), and those functions hand over to it when they are given
+    a CompactBoard.
+
+    Parameters:
+    - rows (int): The number of rows in the grid.
+    - cols (int): The number of columns in the grid.
+    - mines (iterable of int or MineIndex): Row-major indexes of the cells
+                                           holding mines. Repeats count once.
+    """
+
+    __slots__ = ("rows", "cols", "mines", "cells",
+                 "mine_count", "hidden_safe", "mines_revealed", "_mine_index")
+
+    def __init__(self, rows, cols, mines=()):
+        self.rows = rows
+        self.cols = cols
+        # An index that is passed in is kept; otherwise it waits until it is used
+        self._mine_index = mines if isinstance(mines, MineIndex) else None
+        self.mines = bytearray((rows * cols + 7) // 8)
+        self.cells = bytearray(rows * cols)
+        bits = self.mines
+        for index in mines:
+            bits[index >> 3] |= 1 << (index & 7)
+        self._start_counters()
+        self._build_counts()
+
+    @classmethod
+    def generate(cls, rows, cols, mine_count, seed=None, rng=None,
+                 safe_cell=None, safe_radius=1, use_numpy=None):
+        """
+        Creates a board with exactly mine_count mines.
+
+        The same seed always gives the same board. See generation.place_mines
+        for the arguments.
+
+        Parameters:
+        - rows (int): The number of rows in the grid.
+        - cols (int): The number of columns in the grid.
+        - mine_count (int): How many mines to place.
+        - seed (int or None): Seed so the same board can be made again.
+        - rng (random.Random or numpy.random.Generator): A random source to
+                                                         use instead of a seed.
+        - safe_cell (tuple of int or None): The (row, col) of the first click.
+        - safe_radius (int): The size of the mine-free area around safe_cell.
+        - use_numpy (bool or None): Force the NumPy path on or off.
+
+        Returns:
+        - CompactBoard: The new board.
+        """
+        mines = place_mines(rows, cols, mine_count, seed=seed, rng=rng,
+                            safe_cell=safe_cell, safe_radius=safe_radius,
+                            use_numpy=use_numpy)
+        if not isinstance(mines, list):  # A NumPy array
+            return cls._from_numpy(rows, cols, mines)
+        return cls(rows, cols, mines)
+
+    @classmethod
+    def _from_numpy(cls, rows, cols, mines):
+        # Builds the bitset and all counts with whole-array operations
+        np = load_numpy()
+        mask = np.zeros(rows * cols, dtype=np.uint8)
+        mask[mines] = 1
+        padded = np.pad(mask.reshape(rows, cols), 1)
+        counts = sum(padded[1 + dr:rows + 1 + dr, 1 + dc:cols + 1 + dc]
+                     for dr in (-1, 0, 1) for dc in (-1, 0, 1)
+                     if dr or dc)
+        board = cls.__new__(cls)
+        board.rows = rows
+        board.cols = cols
+        board.mines = bytearray(np.packbits(mask, bitorder="little").tobytes())
+        board.cells = bytearray(counts.astype(np.uint8).tobytes())
+        board._mine_index = None
+        board._start_counters()
+        return board
+
+    def _start_counters(self):
+        # Counters kept up to date as cells are revealed, so the game never
+        # has to scan the board to see whether it has been won. The mines
+        # are counted from the bitset, so repeated indexes count once.
+        self.mine_count = int.from_bytes(self.mines, "little").bit_count()
+        self.hidden_safe = self.rows * self.cols - self.mine_count
+        self.mines_revealed = 0
+
+    @classmethod
+    def random(cls, rows, cols, mine_probability=0.2, rng=random):
+        """
+        Creates a board where each cell is a mine with the given probability.
+
+        Parameters:
+        - rows (int): The number of rows in the grid.
+        - cols (int): The number of columns in the grid.
+        - mine_probability (float): The probability of a cell being a mine
+                                   (default is 0.2).
+        - rng (random.Random): The random source (default is the random module).
+
+        Returns:
+        - CompactBoard: The new board.
+        """
+        chance = rng.random
+        return cls(rows, cols, (index for index in range(rows * cols)
+                                if chance() < mine_probability))
+
+    @classmethod
+    def from_grid(cls, grid):
+        """
+        Creates a board from a list of lists grid with "#" for mines.
+
+        Parameters:
+        - grid (list of list of str): The grid to convert.
+
+        Returns:
+        - CompactBoard: The new board.
+        """
+        rows = len(grid)
+        cols = len(grid[0]) if rows else 0
+        return cls(rows, cols, (row * cols + col
+                                for row in range(rows)
+                                for col in range(cols)
+                                if grid[row][col] == "#"))
+
+    def copy(self):
+        """
+        Makes an independent copy of the board and its visible state.
+
+        Returns:
+        - CompactBoard: The copy.
+        """
+        board = CompactBoard.__new__(CompactBoard)
+        board.rows = self.rows
+        board.cols = self.cols
+        board.mines = bytearray(self.mines)
+        board.cells = bytearray(self.cells)
+        board.mine_count = self.mine_count
+        board.hidden_safe = self.hidden_safe
+        board.mines_revealed = self.mines_revealed
+        board._mine_index = self._mine_index  # The mines never move, so it can be shared
+        return board
+
+    def _build_counts(self):
+        # Adds one to the neighbours of each mine, so the work grows with
+        # the number of mines rather than with the number of cells.
+        rows, cols, cells = self.rows, self.cols, self.cells
+        for index in bitset_indexes(self.mines):
+            row, col = divmod(index, cols)
+            for r in range(max(row - 1, 0), min(row + 2, rows)):
+                base = r * cols
+                for c in range(max(col - 1, 0), min(col + 2, cols)):
+                    if r != row or c != col:
+                        cells[base + c] += 1
+
+    @property
+    def mine_index(self):
+        """
+        MineIndex: Where the mines are, built from the bitset the first
+        time it is used.
+        """
+        if self._mine_index is None:
+            self._mine_index = MineIndex.from_bitset(self.rows, self.cols, self.mines)
+        return self._mine_index
+
+    def mine_indexes(self):
+        """
+        Yields the row-major index of every mine.
+
+        Uses the MineIndex when it has been built, and reads the bitset
+        otherwise rather than building it.
+
+        Returns:
+        - generator of int: The mine indexes in increasing order.
+        """
+        if self._mine_index is not None:
+            yield from self._mine_index
+        else:
+            yield from bitset_indexes(self.mines)
+
+    def mines_in(self, top, left, bottom, right):
+        """
+        Lists the mines in a rectangle (rows and columns inclusive).
+
+        Parameters:
+        - top (int), left (int): The first row and column.
+        - bottom (int), right (int): The last row and column.
+
+        Returns:
+        - list of tuple of int: The (row, col) of each mine.
+        """
+        return self.mine_index.in_rectangle(top, left, bottom, right)
+
+    def count_mines_in(self, top, left, bottom, right):
+        """
+        Counts the mines in a rectangle (rows and columns inclusive).
+
+        Parameters:
+        - top (int), left (int): The first row and column.
+        - bottom (int), right (int): The last row and column.
+
+        Returns:
+        - int: The number of mines.
+        """
+        return self.mine_index.count_in_rectangle(top, left, bottom, right)
+
+    def is_mine(self, row, col):
+        """
+        Checks whether a cell holds a mine.
+
+        Parameters:
+        - row (int): The row index of the cell.
+        - col (int): The column index of the cell.
+
+        Returns:
+        - bool: True if the cell is a mine.
+        """
+        index = row * self.cols + col
+        return bool(self.mines[index >> 3] >> (index & 7) & 1)
+
+    def is_revealed(self, row, col):
+        """
+        Checks whether a cell has been revealed.
+
+        Parameters:
+        - row (int): The row index of the cell.
+        - col (int): The column index of the cell.
+
+        Returns:
+        - bool: True if the cell is revealed.
+        """
+        return bool(self.cells[row * self.cols + col] & REVEALED)
+
+    def count_adjacent_mines(self, row, col):
+        """
+        Returns the number of mines next to a cell.
+
+        Parameters:
+        - row (int): The row index of the cell.
+        - col (int): The column index of the cell.
+
+        Returns:
+        - int: The number of mines adjacent to the cell at (row, col).
+        """
+        return self.cells[row * self.cols + col] & COUNT_MASK
+
+    def reveal_cell(self, row, col):
+        """
+        Reveals a cell.
+
+        Parameters:
+        - row (int): The row index of the cell to reveal.
+        - col (int): The column index of the cell to reveal.
+
+        Returns:
+        - bool: True if the revealed cell is a mine, False otherwise.
+        """
+        index = row * self.cols + col
+        is_mine = self.is_mine(row, col)
+        if not self.cells[index] & REVEALED:
+            self.cells[index] |= REVEALED
+            if is_mine:
+                self.mines_revealed += 1
+            else:
+                self.hidden_safe -= 1
+        return is_mine
+
+    def reveal_region(self, row, col):
+        """
+        Reveals a cell and, when it has no adjacent mines, opens the whole
+        connected empty area around it together with its numbered border.
+
+        Uses a list of pending cells rather than recursion, and visits each
+        opened cell once, so the work grows with the size of the area, not
+        the board.
+        Flagged cells are left closed.
+
+        Parameters:
+        - row (int): The row index of the cell to reveal.
+        - col (int): The column index of the cell to reveal.
+
+        Returns:
+        - list of tuple of int: The (row, col) of every cell that was revealed.
+        """
+        cols, cells = self.cols, self.cells
+        start = row * cols + col
+        opened = []
+        is_mine = self.is_mine(row, col)
+        if not cells[start] & REVEALED:
+            cells[start] |= REVEALED
+            opened.append(start)
+            if is_mine:
+                self.mines_revealed += 1
+            else:
+                self.hidden_safe -= 1
+        if is_mine or cells[start] & COUNT_MASK:
+            return [divmod(index, cols) for index in opened]
+
+        # Cells still to spread from. Neighbours of an empty cell can never
+        # be mines, so they are opened straight away.
+        pending = [start]
+        flood_start = len(opened)
+        blocked = REVEALED | FLAGGED
+        size = len(cells)
+        last_col = cols - 1
+        while pending:
+            index = pending.pop()
+            column = index % cols
+            first = -1 if column else 0
+            stop = 2 if column < last_col else 1
+            for base in (index - cols, index, index + cols):
+                if 0 <= base < size:
+                    for neighbour in range(base + first, base + stop):
+                        value = cells[neighbour]
+                        if not value & blocked:
+                            cells[neighbour] = value | REVEALED
+                            opened.append(neighbour)
+                            if not value & COUNT_MASK:
+                                pending.append(neighbour)
+        self.hidden_safe -= len(opened) - flood_start
+        return [divmod(index, cols) for index in opened]
+
+    def toggle_flag(self, row, col):
+        """
+        Puts a flag on a hidden cell, or takes it away again.
+
+        Parameters:
+        - row (int): The row index of the cell.
+        - col (int): The column index of the cell.
+        """
+        index = row * self.cols + col
+        if not self.cells[index] & REVEALED:
+            self.cells[index] ^= FLAGGED
+
+    def mark_mines(self):
+        """
+        Reveals the locations of all mines.
+
+        Returns:
+        - list of tuple of int: The (row, col) of every mine that was revealed.
+        """
+        cells, cols = self.cells, self.cols
+        changed = []
+        for index in self.mine_indexes():
+            if not cells[index] & REVEALED:
+                cells[index] |= REVEALED
+                self.mines_revealed += 1
+                changed.append(divmod(index, cols))
+        return changed
+
+    def is_cleared(self):
+        """
+        Checks whether every mine-free cell has been revealed.
+
+        Returns:
+        - bool: True if the player has won.
+        """
+        return self.hidden_safe == 0
+
+    def visible_cell(self, row, col):
+        """
+        Returns what the player sees in a cell.
+
+        Parameters:
+        - row (int): The row index of the cell.
+        - col (int): The column index of the cell.
+
+        Returns:
+        - str: "-" if hidden, "F" if flagged, "#" for a revealed mine or
+               the adjacent mine count.
+        """
+        value = self.cells[row * self.cols + col]
+        if value & REVEALED:
+            return "#" if self.is_mine(row, col) else str(value & COUNT_MASK)
+        return "F" if value & FLAGGED else "-"
+
+    def visible_row(self, row):
+        """
+        Returns one row of the player's view.
+
+        Parameters:
+        - row (int): The row index.
+
+        Returns:
+        - list of str: What the player sees in each cell of the row.
+        """
+        return [self.visible_cell(row, col) for col in range(self.cols)]
+
+    def to_visible_grid(self):
+        """
+        Converts the player's view to a list of lists.
+
+        Returns:
+        - list of list of str: The grid visible to the player.
+        """
+        return [self.visible_row(row) for row in range(self.rows)]
+
+    def print_grid(self):
+        """
+        Prints the player's view with row and column numbers.
+        """
+        print("    " + "  ".join(f"{i:>2}" for i in range(self.cols)))
+        for row_idx in range(self.rows):
+            formatted_row = "  ".join(f"{cell:>2}" for cell in self.visible_row(row_idx))
+            print(f"{row_idx:>2}  {formatted_row}")
+
+    @property
+    def nbytes(self):
+        """
+        int: The number of bytes used by the board's cell storage, plus the
+        MineIndex once it has been built.
+        """
+        index = self._mine_index.nbytes if self._mine_index is not None else 0
+        return len(self.mines) + len(self.cells) + index
@@ -0,0 +1,70 @@
+# Checks that importing the game modules stays quick.
+# Run with: python check_import_time.py [--budget 0.1]
+#
+# Each module is imported in a fresh Python process a few times, and the
+# check fails (exit status 1) if the median import takes longer than the
+# budget, or if the import pulled in a heavy optional library that should
+# only be loaded when it is used (see optional.py).
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+# Modules that must import cheaply, and libraries none of them may load
+MODULES = ("minesweeper", "board", "engine", "example", "tutorial", "export")
+HEAVY = ("numpy", "matplotlib")
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+seconds = time.perf_counter() - start
+print(json.dumps({{"seconds": seconds,
+                  "heavy": [name for name in {heavy!r} if name in sys.modules]}}))
+"""
+
+def time_import(module, runs=5):
+    """
+    Times importing a module in new Python processes.
+
+    Parameters:
+    - module (str): The module name.
+    - runs (int): How many processes to time (default is 5).
+
+    Returns:
+    - tuple: (median seconds, list of heavy libraries the import loaded).
+    """
+    here = os.path.dirname(os.path.abspath(__file__))
+    times, heavy = [], set()
+    for _ in range(runs):
+        output = subprocess.run([sys.executable, "-c", PROBE.format(module=module, heavy=HEAVY)],
+                                cwd=here, capture_output=True, text=True, check=True).stdout
+        result = json.loads(output)
+        times.append(result["seconds"])
+        heavy.update(result["heavy"])
+    return statistics.median(times), sorted(heavy)
+
+def main():
+    parser = argparse.ArgumentParser(description="Check the import time of the game modules.")
+    parser.add_argument("--budget", type=float, default=0.1,
+                        help="most seconds an import may take (default 0.1)")
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    failed = False
+    for module in MODULES:
+        seconds, heavy = time_import(module, args.runs)
+        problems = []
+        if seconds > args.budget:
+            problems.append(f"over the {args.budget * 1000:.0f} ms budget")
+        if heavy:
+            problems.append("loaded " + ", ".join(heavy))
+        failed = failed or bool(problems)
+        print(f"{module:<12} {seconds * 1000:7.1f} ms  {'; '.join(problems) or 'ok'}")
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
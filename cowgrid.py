@@ -0,0 +1,127 @@
+# A 2D grid that shares its rows with the grid it was copied from.
+#
+# copy.deepcopy(grid) and [row[:] for row in grid] copy every cell even
+# when only one will change. A CowGrid ("copy on write") starts out pointing
+# at the same row lists as its source and copies a row only the first time
+# that row is written to. Taking a snapshot copies just the list of row
+# references, so game states and image stages can be forked cheaply.
+
+class _Row:
+    # One row of a CowGrid as seen from outside. It holds no cells itself:
+    # reads go to whichever list the grid has for the row now, and writes go
+    # through the grid so a shared row is copied first.
+
+    __slots__ = ("_grid", "_row")
+
+    def __init__(self, grid, row):
+        self._grid = grid
+        self._row = row
+
+    def __len__(self):
+        return len(self._grid._rows[self._row])
+
+    def __iter__(self):
+        return iter(self._grid._rows[self._row])
+
+    def __getitem__(self, col):
+        return self._grid._rows[self._row][col]
+
+    def __setitem__(self, col, value):
+        self._grid[self._row, col] = value
+
+    def __eq__(self, other):
+        if not isinstance(other, (_Row, list, tuple)):
+            return NotImplemented
+        return list(self) == list(other)
+
+    def __repr__(self):
+        return repr(self._grid._rows[self._row])
+
+class CowGrid:
+    """
+    A grid whose rows are shared until they are changed.
+
+    Read and write cells with grid[row][col] or grid[row, col], so the grid
+    can be passed to functions that expect a list of lists. grid[row] is a
+    view of the row, not the shared list itself, so writing through it
+    still copies the row first and never changes another grid.
+
+    Parameters:
+    - rows (list of list or CowGrid): The source grid. Its rows are shared,
+                                      not copied.
+    """
+
+    __slots__ = ("_rows", "_owned")
+
+    def __init__(self, rows):
+        if isinstance(rows, CowGrid):
+            # Share the row lists themselves rather than views of them, and
+            # make the source copy its rows again before writing, as snapshot does
+            rows._owned = set()
+            rows = rows._rows
+        self._rows = list(rows)
+        self._owned = set()  # Rows this grid has its own copy of
+
+    def __len__(self):
+        return len(self._rows)
+
+    def __iter__(self):
+        return (_Row(self, row) for row in range(len(self._rows)))
+
+    def __getitem__(self, key):
+        if isinstance(key, tuple):
+            row, col = key
+            return self._rows[row][col]
+        if key < 0:
+            key += len(self._rows)
+        if not 0 <= key < len(self._rows):
+            raise IndexError("CowGrid row index out of range")
+        return _Row(self, key)
+
+    def __setitem__(self, key, value):
+        if not isinstance(key, tuple):
+            raise TypeError("Write cells with grid[row, col] = value.")
+        row, col = key
+        if row < 0:
+            row += len(self._rows)
+        if row not in self._owned:
+            self._rows[row] = list(self._rows[row])
+            self._owned.add(row)
+        self._rows[row][col] = value
+
+    def __eq__(self, other):
+        if not isinstance(other, (CowGrid, list, tuple)):
+            return NotImplemented
+        return [list(row) for row in self._rows] == [list(row) for row in other]
+
+    def __repr__(self):
+        return repr([list(row) for row in self._rows])
+
+    def snapshot(self):
+        """
+        Makes an independent copy that shares every row until written.
+
+        Costs one reference per row, however wide the rows are. Afterwards
+        both grids treat all rows as shared.
+
+        Returns:
+        - CowGrid: The copy.
+        """
+        self._owned = set()
+        return CowGrid(self._rows)
+
+    def to_lists(self):
+        """
+        Converts the grid to a plain list of lists, copying every row.
+
+        Returns:
+        - list of list: The grid's cells.
+        """
+        return [list(row) for row in self._rows]
+
+    @property
+    def copied_rows(self):
+        """
+        int: How many rows this grid has copied for itself.
+        """
+        return len(self._owned)
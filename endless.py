@@ -0,0 +1,247 @@
+# An endless Minesweeper board.
+#
+# Whether a cell holds a mine is worked out from (seed, row, col) with a
+# hash, so nothing has to be stored up front and the board has no edges.
+# Cells are grouped into square chunks which are only built when a cell in
+# them is used. The most recently used chunks are kept in memory; older ones
+# are dropped, or squeezed with zlib if the player has changed them, and
+# rebuilt the next time they are needed.
+
+import zlib
+from collections import OrderedDict
+
+from board import COUNT_MASK, FLAGGED, REVEALED
+
+MASK_64 = (1 << 64) - 1
+MASK_32 = (1 << 32) - 1
+
+def mix64(value):
+    """
+    Scrambles a 64-bit number (the SplitMix64 finaliser).
+
+    Parameters:
+    - value (int): The number to scramble.
+
+    Returns:
+    - int: A 64-bit number that looks random.
+    """
+    value = (value ^ (value >> 30)) * 0xBF58476D1CE4E5B9 & MASK_64
+    value = (value ^ (value >> 27)) * 0x94D049BB133111EB & MASK_64
+    return value ^ (value >> 31)
+
+class EndlessBoard:
+    """
+    A Minesweeper board without edges, built in chunks as it is explored.
+
+    Rows and columns can be any integers, including negative ones.
+
+    Parameters:
+    - seed (int): Decides where the mines are (default is 0).
+    - mine_probability (float): The chance of a cell being a mine
+                               (default is 0.2).
+    - chunk_size (int): The width and height of a chunk (default is 64).
+    - max_chunks (int): How many chunks to keep built in memory
+                        (default is 256).
+    """
+
+    def __init__(self, seed=0, mine_probability=0.2, chunk_size=64, max_chunks=256):
+        self.seed = seed
+        self.mine_probability = mine_probability
+        self.chunk_size = chunk_size
+        self.max_chunks = max_chunks
+        self._threshold = int(mine_probability * (1 << 64))
+        self._seed_hash = mix64(seed & MASK_64)
+        self._chunks = OrderedDict()  # (chunk_row, chunk_col) -> bytearray
+        self._stored = {}             # Compressed chunks the player changed
+
+    def is_mine(self, row, col):
+        """
+        Checks whether a cell holds a mine. This never builds a chunk.
+
+        Parameters:
+        - row (int): The row index of the cell.
+        - col (int): The column index of the cell.
+
+        Returns:
+        - bool: True if the cell is a mine.
+        """
+        key = (row & MASK_32) << 32 | (col & MASK_32)
+        return mix64(self._seed_hash ^ key) < self._threshold
+
+    def _build_chunk(self, chunk_row, chunk_col):
+        # Works out the mines for the chunk plus a one cell border, so the
+        # counts along its edges are right without building its neighbours.
+        size = self.chunk_size
+        top, left = chunk_row * size, chunk_col * size
+        mines = [[self.is_mine(row, col) for col in range(left - 1, left + size + 1)]
+                 for row in range(top - 1, top + size + 1)]
+        cells = bytearray(size * size)
+        for r in range(size):
+            above, middle, below = mines[r], mines[r + 1], mines[r + 2]
+            base = r * size
+            for c in range(size):
+                cells[base + c] = (above[c] + above[c + 1] + above[c + 2]
+                                   + middle[c] + middle[c + 2]
+                                   + below[c] + below[c + 1] + below[c + 2])
+        return cells
+
+    def _chunk(self, chunk_row, chunk_col):
+        # Returns a chunk's cells, building it and dropping old chunks if needed
+        key = (chunk_row, chunk_col)
+        cells = self._chunks.get(key)
+        if cells is not None:
+            self._chunks.move_to_end(key)
+            return cells
+        stored = self._stored.pop(key, None)
+        if stored is not None:
+            cells = bytearray(zlib.decompress(stored))
+        else:
+            cells = self._build_chunk(chunk_row, chunk_col)
+        self._chunks[key] = cells
+        while len(self._chunks) > self.max_chunks:
+            old_key, old_cells = self._chunks.popitem(last=False)
+            # Untouched chunks can simply be built again later
+            if any(value & (REVEALED | FLAGGED) for value in old_cells):
+                self._stored[old_key] = zlib.compress(bytes(old_cells))
+        return cells
+
+    def _locate(self, row, col):
+        # Finds the chunk cells and the position of (row, col) inside them
+        size = self.chunk_size
+        chunk_row, r = divmod(row, size)
+        chunk_col, c = divmod(col, size)
+        return self._chunk(chunk_row, chunk_col), r * size + c
+
+    def count_adjacent_mines(self, row, col):
+        """
+        Returns the number of mines next to a cell.
+
+        Parameters:
+        - row (int): The row index of the cell.
+        - col (int): The column index of the cell.
+
+        Returns:
+        - int: The number of mines adjacent to the cell at (row, col).
+        """
+        cells, index = self._locate(row, col)
+        return cells[index] & COUNT_MASK
+
+    def is_revealed(self, row, col):
+        """
+        Checks whether a cell has been revealed.
+
+        Parameters:
+        - row (int): The row index of the cell.
+        - col (int): The column index of the cell.
+
+        Returns:
+        - bool: True if the cell is revealed.
+        """
+        cells, index = self._locate(row, col)
+        return bool(cells[index] & REVEALED)
+
+    def reveal_cell(self, row, col):
+        """
+        Reveals a cell.
+
+        Parameters:
+        - row (int): The row index of the cell to reveal.
+        - col (int): The column index of the cell to reveal.
+
+        Returns:
+        - bool: True if the revealed cell is a mine, False otherwise.
+        """
+        cells, index = self._locate(row, col)
+        cells[index] |= REVEALED
+        return self.is_mine(row, col)
+
+    def reveal_region(self, row, col, limit=100_000):
+        """
+        Reveals a cell and the connected empty area around it, crossing
+        chunk borders as needed.
+
+        Because the board never ends, an empty area could be very large, so
+        at most limit cells are opened in one go.
+
+        Parameters:
+        - row (int): The row index of the cell to reveal.
+        - col (int): The column index of the cell to reveal.
+        - limit (int): The most cells to open (default is 100,000).
+
+        Returns:
+        - list of tuple of int: The (row, col) of every cell that was revealed.
+        """
+        changed = []
+        cells, index = self._locate(row, col)
+        if not cells[index] & REVEALED:
+            cells[index] |= REVEALED
+            changed.append((row, col))
+        if self.is_mine(row, col) or cells[index] & COUNT_MASK:
+            return changed
+
+        pending = [(row, col)]
+        while pending and len(changed) < limit:
+            r, c = pending.pop()
+            for new_row in (r - 1, r, r + 1):
+                for new_col in (c - 1, c, c + 1):
+                    cells, index = self._locate(new_row, new_col)
+                    value = cells[index]
+                    if not value & (REVEALED | FLAGGED):
+                        cells[index] = value | REVEALED
+                        changed.append((new_row, new_col))
+                        if not value & COUNT_MASK:
+                            pending.append((new_row, new_col))
+        return changed
+
+    def toggle_flag(self, row, col):
+        """
+        Puts a flag on a hidden cell, or takes it away again.
+
+        Parameters:
+        - row (int): The row index of the cell.
+        - col (int): The column index of the cell.
+        """
+        cells, index = self._locate(row, col)
+        if not cells[index] & REVEALED:
+            cells[index] ^= FLAGGED
+
+    def visible_cell(self, row, col):
+        """
+        Returns what the player sees in a cell.
+
+        Parameters:
+        - row (int): The row index of the cell.
+        - col (int): The column index of the cell.
+
+        Returns:
+        - str: "-" if hidden, "F" if flagged, "#" for a revealed mine or
+               the adjacent mine count.
+        """
+        cells, index = self._locate(row, col)
+        value = cells[index]
+        if value & REVEALED:
+            return "#" if self.is_mine(row, col) else str(value & COUNT_MASK)
+        return "F" if value & FLAGGED else "-"
+
+    def print_grid(self, top, left, rows, cols):
+        """
+        Prints part of the board with row and column numbers.
+
+        Parameters:
+        - top (int): The first row to print.
+        - left (int): The first column to print.
+        - rows (int): How many rows to print.
+        - cols (int): How many columns to print.
+        """
+        print("     " + " ".join(f"{i:>3}" for i in range(left, left + cols)))
+        for row in range(top, top + rows):
+            formatted_row = " ".join(f"{self.visible_cell(row, col):>3}"
+                                     for col in range(left, left + cols))
+            print(f"{row:>4} {formatted_row}")
+
+    @property
+    def loaded_chunks(self):
+        """
+        int: The number of chunks currently built in memory.
+        """
+        return len(self._chunks)
@@ -0,0 +1,195 @@
+# The Minesweeper rules without any input() or print() calls.
+#
+# A Game holds the board, the lives and the move count, and a policy is
+# any function that looks at a Game and picks the next (row, col). This
+# lets the same rules drive the terminal game, simulations and bots.
+
+import random
+
+from board import CompactBoard
+from generation import fitting_safe_radius
+
+class Game:
+    """
+    One game of Minesweeper.
+
+    The mines are placed on the first move, keeping the area around that
+    cell free, so the first click is always safe. On boards too crowded
+    for that, only the clicked cell is kept free, and when even that
+    leaves no room, no cell is.
+
+    Parameters:
+    - rows (int): The number of rows in the grid.
+    - cols (int): The number of columns in the grid.
+    - mine_count (int): How many mines to place.
+    - seed (int or None): Seed so the same game can be played again.
+    - lives (int): How many mines the player may hit (default is 3).
+    - use_numpy (bool or None): Passed on to CompactBoard.generate.
+
+    Raises:
+    - ValueError: If the board has no cells or cannot hold mine_count mines.
+    """
+
+    def __init__(self, rows, cols, mine_count, seed=None, lives=3, use_numpy=None):
+        if rows < 1 or cols < 1:
+            raise ValueError(f"A {rows} x {cols} board has no cells.")
+        if not 0 <= mine_count <= rows * cols:
+            raise ValueError(f"Cannot place {mine_count} mines on a {rows} x {cols} board.")
+        self.rows = rows
+        self.cols = cols
+        self.mine_count = mine_count
+        self.seed = seed
+        self.lives = lives
+        self.starting_lives = lives
+        self.moves = 0
+        self.last_changed = []  # The cells revealed by the latest move
+        self.use_numpy = use_numpy
+        # An empty board to show until the mines are placed
+        self.board = CompactBoard(rows, cols)
+        self._started = False
+
+    @classmethod
+    def resume(cls, board, seed=None, lives=3, starting_lives=3):
+        """
+        Carries on a game from a board that is already in play, such as one
+        opened with savefile.load_board.
+
+        Parameters:
+        - board (CompactBoard): The board with its mines already placed.
+        - seed (int or None): The seed the board was made from, if known.
+        - lives (int): The player's remaining lives (default is 3).
+        - starting_lives (int): The lives the game began with (default is 3).
+
+        Returns:
+        - Game: The resumed game.
+        """
+        game = cls(board.rows, board.cols, board.mine_count, seed=seed,
+                   lives=starting_lives)
+        game.board = board
+        game.lives = lives
+        game._started = True
+        return game
+
+    @property
+    def won(self):
+        """
+        bool: True once every mine-free cell has been revealed.
+        """
+        return self._started and self.board.is_cleared()
+
+    @property
+    def lost(self):
+        """
+        bool: True once the player has run out of lives.
+        """
+        return self.lives == 0
+
+    @property
+    def over(self):
+        """
+        bool: True when the game has been won or lost.
+        """
+        return self.won or self.lost
+
+    @property
+    def lives_used(self):
+        """
+        int: How many lives have been lost so far.
+        """
+        return self.starting_lives - self.lives
+
+    def in_bounds(self, row, col):
+        """
+        Checks whether (row, col) is on the board.
+
+        Parameters:
+        - row (int): The row index.
+        - col (int): The column index.
+
+        Returns:
+        - bool: True if the cell exists.
+        """
+        return 0 <= row < self.rows and 0 <= col < self.cols
+
+    def move(self, row, col):
+        """
+        Reveals a cell, opening empty areas and taking a life for a mine.
+
+        Parameters:
+        - row (int): The row index of the cell to reveal.
+        - col (int): The column index of the cell to reveal.
+
+        Returns:
+        - tuple: (hit_mine, changed) where hit_mine (bool) says whether the
+                 cell was a mine and changed (list of tuple of int) holds
+                 every cell that was revealed. Mines revealed at the end of
+                 the game are included.
+
+        Raises:
+        - ValueError: If the cell is off the board or the game is over.
+        """
+        if not self.in_bounds(row, col):
+            raise ValueError(f"({row}, {col}) is not on the board.")
+        if self.over:
+            raise ValueError("The game is already over.")
+
+        if not self._started:
+            # Keep as much of the area around the click free as the mines allow
+            radius = fitting_safe_radius(self.rows, self.cols, self.mine_count, (row, col))
+            self.board = CompactBoard.generate(self.rows, self.cols, self.mine_count,
+                                               seed=self.seed,
+                                               safe_cell=None if radius is None else (row, col),
+                                               safe_radius=radius or 0,
+                                               use_numpy=self.use_numpy)
+            self._started = True
+        self.moves += 1
+
+        hit_mine = self.board.is_mine(row, col)
+        changed = self.board.reveal_region(row, col)
+        if hit_mine:
+            self.lives -= 1
+            changed = [(row, col)]
+        if self.over:
+            changed += self.board.mark_mines()
+        self.last_changed = changed
+        return hit_mine, changed
+
+    def play(self, policy, max_moves=None):
+        """
+        Plays the game to the end with a policy choosing each move.
+
+        Parameters:
+        - policy (callable): Takes the Game and returns the next (row, col).
+        - max_moves (int or None): Stop after this many moves.
+
+        Returns:
+        - Game: This game, so results can be read straight off it.
+        """
+        while not self.over and (max_moves is None or self.moves < max_moves):
+            self.move(*policy(self))
+        return self
+
+def random_policy(seed=None):
+    """
+    Makes a policy that reveals hidden cells at random.
+
+    Parameters:
+    - seed (int or None): Seed for the policy's choices.
+
+    Returns:
+    - callable: The policy, taking a Game and returning (row, col).
+    """
+    rng = random.Random(seed)
+
+    def choose(game):
+        board = game.board
+        # Random guesses find a hidden cell quickly while most are hidden
+        for _ in range(32):
+            row, col = rng.randrange(game.rows), rng.randrange(game.cols)
+            if not board.is_revealed(row, col):
+                return row, col
+        hidden = [(row, col) for row in range(game.rows) for col in range(game.cols)
+                  if not board.is_revealed(row, col)]
+        return rng.choice(hidden)
+
+    return choose
@@ -1,12 +1,15 @@
 # Find each zero position
 # Go through each adjacent position.
 # Looking at how many non-zeros exist.
+# Works for grids of any size, including ragged ones (rows of different lengths).
+
+from optional import load_numpy  # NumPy is optional, process_grid_fast falls back to lists
 
 def process_grid(grid):
     result_grid = [row[:] for row in grid]  # Make a deep copy of the grid
     # Step 1: navigating the grid
-    for row in range(3):
-        for col in range(3):
+    for row in range(len(grid)):
+        for col in range(len(grid[row])):
             if grid[row][col] == 0:
                 # Step 2: Find adjacent positions.
                 count = count_adjacent(grid, row, col)
@@ -15,7 +18,10 @@ def process_grid(grid):
                 result_grid[row][col] = grid[row][col]
     return result_grid
 
-def count_adjacent(grid, row, col):
+# An index from neighbourhood.py (built with is_non_zero) can answer instead.
+def count_adjacent(grid, row, col, index=None):
+    if index is not None:
+        return index.moore(row, col)
     coordinates = [
         (-1, -1), (-1, 0), (-1, 1),
         (0, -1),          (0, 1),
@@ -26,12 +32,66 @@ def count_adjacent(grid, row, col):
         new_row = row + coor_row
         new_col = col + coor_col
 
-        # Step 3: validating index boundaries.
-        if 0 <= new_row < 3 and 0 <= new_col < 3:
+        # Step 3: validating index boundaries (each row can have its own length).
+        if 0 <= new_row < len(grid) and 0 <= new_col < len(grid[new_row]):
             if grid[new_row][new_col] != 0:
                 count += 1
     return count
 
+# The same result for the whole grid at once. Rows are padded with zeros to
+# the widest row (zeros never count as neighbours), then each cell's count is
+# the sum of the non-zero flags in the 3x3 block around it minus its own.
+def process_grid_fast(grid, use_numpy=None):
+    if not grid:
+        return []
+    if use_numpy is None:
+        use_numpy = load_numpy() is not None
+    if use_numpy:
+        return _process_grid_numpy(grid)
+    return _process_grid_lists(grid)
+
+def _process_grid_numpy(grid):
+    np = load_numpy()
+    rows = len(grid)
+    width = max(len(row) for row in grid)
+    try:
+        values = _to_array(grid, rows, width, float)
+    except (TypeError, ValueError):  # Cells that are not numbers
+        values = _to_array(grid, rows, width, object)
+    non_zero = np.pad(values != 0, 1).astype(np.int8)
+    # Add the 3x3 block around every cell with shifted slices of the padded grid
+    counts = sum(non_zero[1 + dr:rows + 1 + dr, 1 + dc:width + 1 + dc]
+                 for dr in (-1, 0, 1) for dc in (-1, 0, 1) if dr or dc)
+    counts = counts.tolist()
+    return [[counts[row][col] if cells[col] == 0 else cells[col]
+             for col in range(len(cells))]
+            for row, cells in enumerate(grid)]
+
+def _to_array(grid, rows, width, dtype):
+    np = load_numpy()
+    values = np.zeros((rows, width), dtype=dtype)
+    for row, cells in enumerate(grid):
+        values[row, :len(cells)] = cells
+    return values
+
+def _process_grid_lists(grid):
+    width = max(len(row) for row in grid)
+    zeros = [0] * (width + 2)
+    # Non-zero flags with a border of zeros all the way round
+    flags = [zeros] + [[0] + [1 if cell != 0 else 0 for cell in row]
+                       + [0] * (width - len(row) + 1) for row in grid] + [zeros]
+    # Sums of each flag with its left and right neighbours
+    across = [[row[c - 1] + row[c] + row[c + 1] for c in range(1, width + 1)]
+              for row in flags]
+    result_grid = []
+    for row, cells in enumerate(grid):
+        above, middle, below = across[row], across[row + 1], across[row + 2]
+        own = flags[row + 1]
+        result_grid.append([above[col] + middle[col] + below[col] - own[col + 1]
+                            if cells[col] == 0 else cells[col]
+                            for col in range(len(cells))])
+    return result_grid
+
 def main():
     grid = [
         [0, 2, 0],
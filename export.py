@@ -0,0 +1,253 @@
+# Saving grids as image files without matplotlib.
+#
+# tutorial.py can only show its images through plt.imshow, which needs a
+# display, loads the whole matplotlib stack and draws a figure for every
+# image. To dump thousands of grids (images or Minesweeper boards) this
+# module writes the files itself:
+# - PGM (greyscale) and PBM (black and white) are a short text header
+#   followed by the raw pixel bytes.
+# - PNG is the same rows, each with a filter byte in front, squeezed
+#   through zlib and cut into chunks.
+# Every writer works a row at a time, turning each row into bytes with C
+# level operations (bytes, translate, int/to_bytes) where it can, so a
+# whole image is never held twice in memory. export_many writes many files
+# with a pool of threads; zlib and file writes let other threads run.
+
+import os
+import struct
+import sys
+import zlib
+from array import array
+from concurrent.futures import ThreadPoolExecutor
+
+from board import COUNT_MASK, FLAGGED, REVEALED, CompactBoard
+from optional import load_numpy  # NumPy is optional, arrays are exported when it is there
+
+# Shades (0 is black, 255 is white) for drawing a board as the player sees it
+HIDDEN_SHADE = 128
+FLAG_SHADE = 48
+MINE_SHADE = 0
+EMPTY_SHADE = 255
+NUMBER_STEP = 10   # Each adjacent mine makes a revealed cell this much darker
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+IDAT_SIZE = 1 << 16  # Compressed bytes gathered before a PNG data chunk is written
+NUMPY_BLOCK = 1 << 20  # Pixels converted at a time from a NumPy array
+
+def _shade(value):
+    # The shade of a CompactBoard cell byte, leaving mines to board_rows
+    if value & REVEALED:
+        return EMPTY_SHADE - NUMBER_STEP * (value & COUNT_MASK)
+    return FLAG_SHADE if value & FLAGGED else HIDDEN_SHADE
+
+_BOARD_SHADES = bytes(_shade(value) for value in range(256))
+# Turns cell bytes into b"1" for revealed cells and b"0" for the rest
+_REVEALED_DIGITS = bytes(ord("1") if value & REVEALED else ord("0") for value in range(256))
+
+def board_rows(board, cell_size=1):
+    """
+    Draws a board as the player sees it, one row of pixels at a time.
+
+    Hidden cells are grey, flags dark grey, revealed mines black, and
+    revealed cells white, getting darker with more adjacent mines.
+
+    Parameters:
+    - board (CompactBoard): The board to draw.
+    - cell_size (int): The width and height of each cell in pixels (default is 1).
+
+    Returns:
+    - generator of bytes: One byte per pixel, row by row.
+    """
+    cells, mines, cols = board.cells, board.mines, board.cols
+    row_mask = (1 << cols) - 1
+    widen = [bytes([value]) * cell_size for value in range(256)]
+    for row in range(board.rows):
+        start = row * cols
+        line = bytearray(cells[start:start + cols].translate(_BOARD_SHADES))
+        # Mines live in their own bitset, so the row's mine bits are ANDed
+        # with its revealed bits (bit n for column n) to find revealed mines
+        row_mines = int.from_bytes(mines[start >> 3:(start + cols + 7) >> 3], "little")
+        row_mines = row_mines >> (start & 7) & row_mask
+        if row_mines:
+            digits = bytes(cells[start:start + cols]).translate(_REVEALED_DIGITS)
+            shown = row_mines & int(digits[::-1], 2)
+            while shown:
+                low_bit = shown & -shown
+                line[low_bit.bit_length() - 1] = MINE_SHADE
+                shown ^= low_bit
+        line = bytes(line) if cell_size == 1 else b"".join(map(widen.__getitem__, line))
+        for _ in range(cell_size):
+            yield line
+
+def _image_rows(image, maxval, white=None):
+    # Returns (width, height, white, rows), where rows yields each row of
+    # pixels as bytes: one byte each when white is up to 255, otherwise two
+    # (big-endian). Pixels are clamped to [0, maxval], then stretched so
+    # maxval becomes white when white is given.
+    if isinstance(image, CompactBoard):
+        return image.cols, image.rows, 255, board_rows(image)
+    if not 1 <= maxval <= 65535:
+        raise ValueError(f"maxval must be between 1 and 65535, not {maxval}.")
+    white = white or maxval
+    if hasattr(image, "ndim"):  # A NumPy array
+        height, width = image.shape
+        return width, height, white, _numpy_rows(image, maxval, white)
+    height = len(image)
+    width = len(image[0]) if height else 0
+    if any(len(row) != width for row in image):
+        raise ValueError("Every row of the image must be the same length.")
+    if white <= 255:
+        return width, height, white, _byte_rows(image, maxval, white)
+    return width, height, white, _wide_rows(image, maxval, white)
+
+def _byte_rows(image, maxval, white):
+    # One table does the clamping and stretching for every byte value
+    table = bytes(min(value, maxval) * white // maxval for value in range(256))
+    for row in image:
+        try:
+            data = bytes(row)
+        except (TypeError, ValueError):  # Values outside a byte, or floats
+            data = bytes(min(max(int(pixel), 0), 255) for pixel in row)
+        yield data.translate(table)
+
+def _wide_rows(image, maxval, white):
+    for row in image:
+        data = array("H", (min(max(int(pixel), 0), maxval) * white // maxval for pixel in row))
+        if sys.byteorder == "little":
+            data.byteswap()
+        yield data.tobytes()
+
+def _numpy_rows(image, maxval, white):
+    np = load_numpy()
+    height, width = image.shape
+    dtype = ">u2" if white > 255 else "u1"
+    block = max(1, NUMPY_BLOCK // max(width, 1))
+    for top in range(0, height, block):
+        pixels = np.clip(image[top:top + block], 0, maxval).astype(np.int64)
+        if white != maxval:
+            pixels = pixels * white // maxval
+        data = memoryview(pixels.astype(dtype).tobytes())
+        row_bytes = width * (2 if white > 255 else 1)
+        for start in range(0, len(data), row_bytes):
+            yield data[start:start + row_bytes]
+
+def write_pgm(path, image, maxval=255):
+    """
+    Saves a greyscale image as a binary PGM file.
+
+    Parameters:
+    - path (str): The file to write.
+    - image (list of list of int, NumPy array or CompactBoard): The image.
+            Pixels are clamped to [0, maxval]; a board is drawn with board_rows.
+    - maxval (int): The value shown as white (default is 255; use 1 for a
+                    binary image from tutorial.threshold_image).
+    """
+    width, height, maxval, rows = _image_rows(image, maxval)
+    with open(path, "wb") as file:
+        file.write(b"P5\n%d %d\n%d\n" % (width, height, maxval))
+        file.writelines(rows)
+
+def write_pbm(path, image):
+    """
+    Saves a black and white image as a binary PBM file.
+
+    Pixels above zero are white and the rest black, as imshow shows a
+    binary image from tutorial.threshold_image.
+
+    Parameters:
+    - path (str): The file to write.
+    - image (list of list of int, NumPy array or CompactBoard): The image.
+    """
+    width, height, _, rows = _image_rows(image, 255)
+    # PBM uses 1 for black, so each byte becomes the digit of its bit
+    digits = b"1" + b"0" * 255
+    padding = b"0" * (-width % 8)
+    row_bytes = (width + 7) // 8
+    with open(path, "wb") as file:
+        file.write(b"P4\n%d %d\n" % (width, height))
+        for row in rows:
+            bits = bytes(row).translate(digits) + padding
+            # Reading the digits as one binary number packs them 8 to a byte
+            file.write(int(bits, 2).to_bytes(row_bytes, "big") if bits else b"")
+
+def _write_chunk(file, kind, data):
+    file.write(struct.pack(">I", len(data)))
+    file.write(kind)
+    file.write(data)
+    file.write(struct.pack(">I", zlib.crc32(data, zlib.crc32(kind))))
+
+def write_png(path, image, maxval=255, level=6):
+    """
+    Saves a greyscale image as a PNG file.
+
+    Parameters:
+    - path (str): The file to write.
+    - image (list of list of int, NumPy array or CompactBoard): The image.
+            Pixels are clamped to [0, maxval]; a board is drawn with board_rows.
+    - maxval (int): The value shown as white (default is 255). Values up to
+                    255 make an 8-bit PNG, larger ones a 16-bit PNG.
+    - level (int): The zlib compression level, 0 to 9 (default is 6).
+    """
+    width, height, white, rows = _image_rows(image, maxval, 255 if maxval <= 255 else 65535)
+    depth = 8 if white <= 255 else 16
+    compressor = zlib.compressobj(level)
+    with open(path, "wb") as file:
+        file.write(PNG_SIGNATURE)
+        # Greyscale, no interlacing
+        _write_chunk(file, b"IHDR", struct.pack(">IIBBBBB", width, height, depth, 0, 0, 0, 0))
+        pending, size = [], 0
+        for row in rows:
+            # Filter type 0: the row is stored as it is
+            for data in (compressor.compress(b"\0"), compressor.compress(row)):
+                if data:
+                    pending.append(data)
+                    size += len(data)
+            if size >= IDAT_SIZE:
+                _write_chunk(file, b"IDAT", b"".join(pending))
+                pending, size = [], 0
+        pending.append(compressor.flush())
+        _write_chunk(file, b"IDAT", b"".join(pending))
+        _write_chunk(file, b"IEND", b"")
+
+WRITERS = {".pgm": write_pgm, ".pbm": write_pbm, ".png": write_png}
+
+def export(path, image, **options):
+    """
+    Saves an image, choosing the format from the file extension.
+
+    Parameters:
+    - path (str): The file to write, ending in .pgm, .pbm or .png.
+    - image (list of list of int, NumPy array or CompactBoard): The image.
+    - options: Passed on to write_pgm, write_pbm or write_png.
+
+    Returns:
+    - str: The path written.
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in WRITERS:
+        raise ValueError(f"Cannot tell the image format of {path!r}.")
+    WRITERS[extension](path, image, **options)
+    return path
+
+def export_many(jobs, workers=None):
+    """
+    Saves many images, using a pool of threads.
+
+    Parameters:
+    - jobs (iterable of tuple): (path, image) or (path, image, options) for
+                                each file, as for export.
+    - workers (int or None): The number of threads (default is
+                             ThreadPoolExecutor's; 1 writes the files in order
+                             in this thread).
+
+    Returns:
+    - list of str: The paths written, in the order of the jobs.
+    """
+    def run(job):
+        path, image, *rest = job
+        return export(path, image, **(rest[0] if rest else {}))
+
+    if workers == 1:
+        return [run(job) for job in jobs]
+    with ThreadPoolExecutor(workers) as pool:
+        return list(pool.map(run, jobs))
@@ -0,0 +1,186 @@
+# Fast, repeatable mine placement for Minesweeper boards.
+#
+# create_random_grid rolls a random number for every cell, so the number of
+# mines is only right on average and a game can only be replayed by seeding
+# the global random module. The functions here place an exact number of
+# mines, take their own seed or random source, and can keep an area around
+# the first click free of mines.
+#
+# The pure Python path uses Floyd's algorithm for sampling without
+# replacement. The NumPy path gives different boards for the same seed, so
+# seeded boards always take the Python path unless use_numpy says
+# otherwise: a seed then gives the same board on every machine, whether or
+# not NumPy is installed. NumPy (imported the first time it is needed, so
+# importing the game stays quick) is only used for large unseeded boards,
+# where it is quicker.
+
+import random
+from bisect import bisect_right
+
+from optional import load_numpy
+
+# Unseeded boards smaller than this are quicker to fill without NumPy
+NUMPY_MIN_CELLS = 1 << 14
+
+def uses_numpy(rows, cols, seed=None, rng=None, use_numpy=None):
+    """
+    Works out which path place_mines takes.
+
+    Parameters:
+    - rows (int), cols (int): The size of the grid.
+    - seed (int or None): The seed, if any.
+    - rng (random.Random or numpy.random.Generator or None): The random source.
+    - use_numpy (bool or None): The caller's choice, if any.
+
+    Returns:
+    - bool: True for the NumPy path.
+    """
+    if use_numpy is not None:
+        return use_numpy
+    if rng is not None:
+        return not isinstance(rng, random.Random)
+    return seed is None and rows * cols >= NUMPY_MIN_CELLS and load_numpy() is not None
+
+def make_rng(seed=None, rng=None):
+    """
+    Returns a random.Random to draw from.
+
+    Parameters:
+    - seed (int or None): Seed for a new random source.
+    - rng (random.Random or None): An existing random source to use instead.
+
+    Returns:
+    - random.Random: The random source.
+    """
+    if rng is not None:
+        return rng
+    return random.Random(seed)
+
+def safe_zone(rows, cols, row, col, radius=1):
+    """
+    Lists the cells around (row, col) that must stay free of mines.
+
+    Parameters:
+    - rows (int): The number of rows in the grid.
+    - cols (int): The number of columns in the grid.
+    - row (int): The row of the first click.
+    - col (int): The column of the first click.
+    - radius (int): How far the safe area reaches (default is 1, the cell
+                    and its 8 neighbours; 0 keeps only the cell itself).
+
+    Returns:
+    - list of int: The row-major indexes of the safe cells, in order.
+    """
+    return [r * cols + c
+            for r in range(max(row - radius, 0), min(row + radius + 1, rows))
+            for c in range(max(col - radius, 0), min(col + radius + 1, cols))]
+
+def fitting_safe_radius(rows, cols, mine_count, safe_cell, radius=1):
+    """
+    Finds the largest safe area around the first click that still leaves
+    room for every mine: the full radius, then just the clicked cell, then
+    no safe area at all.
+
+    Parameters:
+    - rows (int): The number of rows in the grid.
+    - cols (int): The number of columns in the grid.
+    - mine_count (int): How many mines must be placed.
+    - safe_cell (tuple of int): The (row, col) of the first click.
+    - radius (int): The safe radius to try first (default is 1).
+
+    Returns:
+    - int or None: The radius to pass to place_mines, or None if even the
+                   clicked cell cannot be kept free.
+    """
+    for tried in (radius, 0):
+        if mine_count <= rows * cols - len(safe_zone(rows, cols, *safe_cell, tried)):
+            return tried
+    return None
+
+def floyd_sample(population, count, rng):
+    """
+    Picks count different numbers from range(population) using Floyd's
+    algorithm, which needs only count random draws.
+
+    Parameters:
+    - population (int): The size of the range to pick from.
+    - count (int): How many numbers to pick.
+    - rng (random.Random): The random source.
+
+    Returns:
+    - set of int: The picked numbers.
+    """
+    chosen = set()
+    for top in range(population - count, population):
+        pick = rng.randrange(top + 1)
+        chosen.add(top if pick in chosen else pick)
+    return chosen
+
+def _skip_excluded(positions, excluded):
+    # Turns positions counted among the allowed cells into real cell indexes.
+    # shifted[i] is the number of allowed cells before the i-th excluded one.
+    shifted = [index - i for i, index in enumerate(excluded)]
+    return [position + bisect_right(shifted, position) for position in positions]
+
+def place_mines(rows, cols, mine_count, seed=None, rng=None, safe_cell=None,
+                safe_radius=1, use_numpy=None):
+    """
+    Chooses exactly mine_count different cells to hold mines.
+
+    Parameters:
+    - rows (int): The number of rows in the grid.
+    - cols (int): The number of columns in the grid.
+    - mine_count (int): How many mines to place.
+    - seed (int or None): Seed so the same board can be made again.
+    - rng (random.Random or numpy.random.Generator): A random source to use
+                                                     instead of a seed.
+    - safe_cell (tuple of int or None): The (row, col) of the first click,
+                                        kept free of mines with its area.
+    - safe_radius (int): The size of the safe area (default is 1).
+    - use_numpy (bool or None): Force the NumPy path on or off. By default
+                                seeded boards use the Python path, and NumPy
+                                is used for large unseeded boards when it is
+                                installed (see uses_numpy).
+
+    Returns:
+    - list of int or numpy.ndarray: The row-major mine indexes, sorted.
+
+    Raises:
+    - ValueError: If there is not enough room for the mines.
+    - TypeError: If rng does not belong to the chosen path.
+    - ImportError: If use_numpy is True but NumPy is not installed.
+    """
+    cells = rows * cols
+    excluded = [] if safe_cell is None else safe_zone(rows, cols, *safe_cell, safe_radius)
+    allowed = cells - len(excluded)
+    if not 0 <= mine_count <= allowed:
+        raise ValueError(f"Cannot place {mine_count} mines in {allowed} free cells.")
+
+    use_numpy = uses_numpy(rows, cols, seed, rng, use_numpy)
+    if use_numpy:
+        if isinstance(rng, random.Random):
+            raise TypeError("The NumPy path needs a numpy.random.Generator, not a random.Random.")
+        np = load_numpy()
+        if np is None:
+            raise ImportError("NumPy is needed for use_numpy=True.")
+        if rng is None and seed is not None and seed < 0:
+            # NumPy only takes non-negative seeds, but random.Random (and
+            # the move log) allow negative ones, so wrap them into 64 bits
+            seed &= (1 << 64) - 1
+        generator = rng if rng is not None else np.random.default_rng(seed)
+        positions = np.sort(generator.choice(allowed, mine_count, replace=False))
+        if excluded:
+            shifted = np.asarray(excluded) - np.arange(len(excluded))
+            positions = positions + np.searchsorted(shifted, positions, side="right")
+        return positions
+
+    if rng is not None and not isinstance(rng, random.Random):
+        raise TypeError("The Python path needs a random.Random, not a NumPy Generator.")
+    rng = make_rng(seed, rng)
+    # Picking the free cells instead is quicker when most cells are mines
+    if mine_count > allowed // 2:
+        free = floyd_sample(allowed, allowed - mine_count, rng)
+        positions = [p for p in range(allowed) if p not in free]
+    else:
+        positions = sorted(floyd_sample(allowed, mine_count, rng))
+    return _skip_excluded(positions, excluded) if excluded else positions
@@ -0,0 +1,170 @@
+# Streaming greyscale image processing for raw files too big for memory.
+#
+# tutorial.py clamps and thresholds an image with nested list
+# comprehensions, building a whole new 2D list at every step. Here the image
+# stays on disk: the input file is memory-mapped and read a block of rows at
+# a time, each block goes through every stage, and the result is written
+# straight into a memory-mapped output file.
+#
+# Stages are per-pixel functions, so for 8 and 16-bit images they can all be
+# worked out once for every possible pixel value and fused into a single
+# lookup table. Processing a block is then one table lookup per pixel, done
+# by NumPy when it is installed, or by bytes.translate for 8-bit images.
+
+import mmap
+import os
+from array import array
+
+from optional import load_numpy  # NumPy is optional
+
+# Pixel types that can be fused into a lookup table:
+# name -> (array typecode, smallest value, number of possible values)
+PIXEL_TYPES = {
+    "uint8": ("B", 0, 1 << 8),
+    "int8": ("b", -(1 << 7), 1 << 8),
+    "uint16": ("H", 0, 1 << 16),
+    "int16": ("h", -(1 << 15), 1 << 16),
+}
+
+def normalize(low=0, high=255):
+    """
+    Makes a stage that clamps pixels into [low, high], like tutorial.py.
+
+    Parameters:
+    - low (int): The smallest value allowed (default is 0).
+    - high (int): The largest value allowed (default is 255).
+
+    Returns:
+    - callable: The stage, taking and returning one pixel value.
+    """
+    return lambda pixel: min(max(pixel, low), high)
+
+def threshold(level=128, high=1):
+    """
+    Makes a stage that turns pixels above level into high and the rest into 0.
+
+    Parameters:
+    - level (int): The threshold (default is 128).
+    - high (int): The value for bright pixels (default is 1; use 255 for
+                  a viewable image).
+
+    Returns:
+    - callable: The stage, taking and returning one pixel value.
+    """
+    return lambda pixel: high if pixel > level else 0
+
+def fuse(stages, pixel_type="uint8"):
+    """
+    Runs every possible input pixel through all the stages in order.
+
+    Parameters:
+    - stages (list of callable): The per-pixel stages.
+    - pixel_type (str): The input pixel type, a key of PIXEL_TYPES.
+
+    Returns:
+    - list of int: The output for each input, indexed by value - smallest.
+    """
+    _, smallest, count = PIXEL_TYPES[pixel_type]
+    table = []
+    for value in range(smallest, smallest + count):
+        for stage in stages:
+            value = stage(value)
+        table.append(value)
+    return table
+
+def process_file(source, destination, width, stages, source_type="uint16",
+                 output_type="uint8", block_rows=1024, use_numpy=None):
+    """
+    Applies the stages to a raw image file, writing a raw output file.
+
+    Only one block of rows is ever held in memory, so files far bigger than
+    memory can be processed. The files hold pixels row by row with no
+    header, in the machine's byte order.
+
+    Parameters:
+    - source (str): Path of the input file.
+    - destination (str): Path of the output file (overwritten).
+    - width (int): The number of pixels in a row.
+    - stages (list of callable): The per-pixel stages, e.g. [normalize()].
+    - source_type (str): The input pixel type (default is "uint16").
+    - output_type (str): The output pixel type (default is "uint8").
+    - block_rows (int): How many rows to process at a time (default is 1024).
+    - use_numpy (bool or None): Force the NumPy path on or off.
+
+    Returns:
+    - int: The number of rows processed.
+
+    Raises:
+    - ValueError: If the pixel types are not supported or the file size is
+                  not a whole number of rows.
+    """
+    for pixel_type in (source_type, output_type):
+        if pixel_type not in PIXEL_TYPES:
+            raise ValueError(f"Unsupported pixel type {pixel_type!r}.")
+    in_code, smallest, _ = PIXEL_TYPES[source_type]
+    out_code = PIXEL_TYPES[output_type][0]
+    in_size = array(in_code).itemsize
+    row_bytes = width * in_size
+    total_bytes = os.path.getsize(source)
+    if width <= 0 or total_bytes % row_bytes:
+        raise ValueError("The file size is not a whole number of rows.")
+    rows = total_bytes // row_bytes
+
+    table = fuse(stages, source_type)
+    if use_numpy is None:
+        use_numpy = load_numpy() is not None
+    if use_numpy:
+        _process_numpy(source, destination, rows, width, table, smallest,
+                       source_type, output_type, block_rows)
+    else:
+        _process_mmap(source, destination, rows, width, table, smallest,
+                      in_code, out_code, block_rows)
+    return rows
+
+def _process_numpy(source, destination, rows, width, table, smallest,
+                   source_type, output_type, block_rows):
+    np = load_numpy()
+    if rows == 0:  # NumPy cannot map an empty file
+        open(destination, "wb").close()
+        return
+    lookup = np.array(table, dtype=output_type)
+    image = np.memmap(source, dtype=source_type, mode="r", shape=(rows, width))
+    output = np.memmap(destination, dtype=output_type, mode="w+", shape=(rows, width))
+    for top in range(0, rows, block_rows):
+        block = image[top:top + block_rows]
+        # Shift signed values so the smallest one indexes the start of the table
+        index = block.astype(np.int32) - smallest if smallest else block
+        output[top:top + block_rows] = lookup[index]
+    output.flush()
+    del output
+
+def _process_mmap(source, destination, rows, width, table, smallest,
+                  in_code, out_code, block_rows):
+    in_size = array(in_code).itemsize
+    out_size = array(out_code).itemsize
+    # For 8-bit to 8-bit images bytes.translate does the lookup in C
+    translate = None
+    if in_size == out_size == 1:
+        raw = array(out_code, table).tobytes()
+        # translate indexes by byte value, so rotate signed tables to match
+        translate = raw[-smallest:] + raw[:-smallest] if smallest else raw
+
+    with open(destination, "wb") as file:
+        file.truncate(rows * width * out_size)
+    if rows == 0:
+        return
+    with open(source, "rb") as in_file, open(destination, "r+b") as out_file, \
+            mmap.mmap(in_file.fileno(), 0, access=mmap.ACCESS_READ) as image, \
+            mmap.mmap(out_file.fileno(), 0) as output:
+        for top in range(0, rows, block_rows):
+            count = min(block_rows, rows - top) * width
+            start = top * width
+            block = image[start * in_size:(start + count) * in_size]
+            if translate is not None:
+                result = block.translate(translate)
+            else:
+                values = array(in_code)
+                values.frombytes(block)
+                result = array(out_code, [table[value - smallest] for value in values]).tobytes()
+            output[start * out_size:(start + count) * out_size] = result
+        output.flush()
@@ -0,0 +1,278 @@
+# Opt-in counters and timers for seeing where a game spends its time.
+#
+# Nothing here runs until enable() is called. enable() swaps the board,
+# grid and drawing functions for wrapped versions that count and time each
+# call, and disable() puts the originals back, so when instrumentation is
+# off the hot paths are exactly the normal functions with no extra checks.
+#
+#     import instrument
+#     instrument.enable()   # or enable(module) for a module run as a script
+#     play_minesweeper(9, 9)
+#     print(instrument.to_prometheus())
+#
+# Counters:
+# - cell_reads: calls that read one cell (is_mine, is_revealed,
+#   visible_cell, and the count lookups).
+# - cell_writes: cells changed by revealing, flagging and marking mines.
+# - neighbour_probes: cells read to count a list grid's mines (the
+#   in-bounds neighbours) or to spread an empty area (the in-bounds 3x3
+#   block around each cell spread from), counted exactly as the loops read
+#   them.
+# - reveals: cells revealed.
+# - redraws: times the board was printed or rendered.
+# Timers add up the seconds and calls for each named phase.
+
+import contextlib
+import functools
+import json
+import time
+
+COUNTERS = ("cell_reads", "cell_writes", "neighbour_probes", "reveals", "redraws")
+
+counters = dict.fromkeys(COUNTERS, 0)
+timers = {}  # Phase name -> [calls, seconds]
+_originals = []  # (owner, name, original) for everything enable() replaced
+
+def reset():
+    """
+    Sets every counter and timer back to zero.
+    """
+    for name in COUNTERS:
+        counters[name] = 0
+    timers.clear()
+
+def is_enabled():
+    """
+    Checks whether instrumentation is on.
+
+    Returns:
+    - bool: True between enable() and disable().
+    """
+    return bool(_originals)
+
+def _record(name, seconds):
+    timer = timers.get(name)
+    if timer is None:
+        timers[name] = [1, seconds]
+    else:
+        timer[0] += 1
+        timer[1] += seconds
+
+@contextlib.contextmanager
+def _timed_phase(name):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        _record(name, time.perf_counter() - start)
+
+_NO_PHASE = contextlib.nullcontext()
+
+def _no_phase(name):
+    return _NO_PHASE
+
+# Times a block of code as a named phase: with instrument.phase("input"): ...
+# Callers must look it up as instrument.phase each time, since enable() and
+# disable() replace it.
+phase = _no_phase
+
+# Wrappers. Each takes the original function and returns a counting one.
+
+def _reads(function):
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        counters["cell_reads"] += 1
+        return function(*args, **kwargs)
+    return wrapper
+
+def _window(rows, cols, row, col):
+    # The number of cells in the 3x3 block around (row, col) that are on the grid
+    return ((min(row + 1, rows - 1) - max(row - 1, 0) + 1)
+            * (min(col + 1, cols - 1) - max(col - 1, 0) + 1))
+
+def _reveal_one(function):
+    # CompactBoard.reveal_cell: only a hidden cell is changed
+    from board import REVEALED
+
+    @functools.wraps(function)
+    def wrapper(board, row, col):
+        if not board.cells[row * board.cols + col] & REVEALED:
+            counters["cell_writes"] += 1
+            counters["reveals"] += 1
+        return function(board, row, col)
+    return wrapper
+
+def _reveal_many(function):
+    # CompactBoard.reveal_region and mark_mines return the cells they opened
+    from board import COUNT_MASK
+
+    @functools.wraps(function)
+    def wrapper(board, *args):
+        changed = function(board, *args)
+        counters["cell_writes"] += len(changed)
+        counters["reveals"] += len(changed)
+        if function.__name__ == "reveal_region":
+            # The flood fill reads the whole in-bounds 3x3 block around the
+            # clicked cell and around every opened cell with no mines next
+            # to it (read straight from the board so these are not counted
+            # as reads)
+            cells, mines, rows, cols = board.cells, board.mines, board.rows, board.cols
+            spread = set(changed)
+            spread.add(tuple(args))
+            probes = 0
+            for row, col in spread:
+                index = row * cols + col
+                if not cells[index] & COUNT_MASK and not mines[index >> 3] >> (index & 7) & 1:
+                    probes += _window(rows, cols, row, col)
+            counters["neighbour_probes"] += probes
+        return changed
+    return wrapper
+
+def _flag(function):
+    @functools.wraps(function)
+    def wrapper(board, row, col):
+        counters["cell_writes"] += 1
+        return function(board, row, col)
+    return wrapper
+
+def _grid_count(function):
+    # minesweeper.count_adjacent_mines only probes neighbours for list
+    # grids; a CompactBoard or an index answers with a lookup
+    from board import CompactBoard
+
+    @functools.wraps(function)
+    def wrapper(grid, row, col, index=None):
+        if index is None and not isinstance(grid, CompactBoard) and grid:
+            # Every in-bounds neighbour is read
+            counters["neighbour_probes"] += _window(len(grid), len(grid[0]), row, col) - 1
+        return function(grid, row, col, index)
+    return wrapper
+
+def _redraw(function):
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        counters["redraws"] += 1
+        start = time.perf_counter()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            _record("redraw", time.perf_counter() - start)
+    return wrapper
+
+def _targets(game_module):
+    # Imported here so importing instrument does not import the game
+    if game_module is None:
+        import minesweeper as game_module
+    from board import CompactBoard
+    from render import ViewportRenderer
+    return [
+        (CompactBoard, "is_mine", _reads),
+        (CompactBoard, "is_revealed", _reads),
+        (CompactBoard, "visible_cell", _reads),
+        (CompactBoard, "count_adjacent_mines", _reads),
+        (CompactBoard, "reveal_cell", _reveal_one),
+        (CompactBoard, "reveal_region", _reveal_many),
+        (CompactBoard, "mark_mines", _reveal_many),
+        (CompactBoard, "toggle_flag", _flag),
+        (game_module, "count_adjacent_mines", _grid_count),
+        (game_module, "print_grid", _redraw),
+        (ViewportRenderer, "render", _redraw),
+    ]
+
+def enable(game_module=None):
+    """
+    Turns instrumentation on. Calling it again does nothing.
+
+    Parameters:
+    - game_module (module or None): The minesweeper module whose functions
+                  should be counted (default imports minesweeper). When the
+                  game runs as a script it is __main__, not the module an
+                  import would load, so it must pass itself in.
+    """
+    global phase
+    if _originals:
+        return
+    for owner, name, wrap in _targets(game_module):
+        original = owner.__dict__[name]
+        _originals.append((owner, name, original))
+        setattr(owner, name, wrap(original))
+    phase = _timed_phase
+
+def disable():
+    """
+    Turns instrumentation off, putting back the original functions. The
+    counts are kept until reset() is called.
+    """
+    global phase
+    while _originals:
+        owner, name, original = _originals.pop()
+        setattr(owner, name, original)
+    phase = _no_phase
+
+@contextlib.contextmanager
+def recording(game_module=None):
+    """
+    Turns instrumentation on for a with block, starting from zero.
+
+    Parameters:
+    - game_module (module or None): See enable.
+
+    Yields:
+    - dict: The same dictionary snapshot() returns, filled in on exit.
+    """
+    result = {}
+    reset()
+    enable(game_module)
+    try:
+        yield result
+    finally:
+        disable()
+        result.update(snapshot())
+
+def snapshot():
+    """
+    Copies the current counters and timers.
+
+    Returns:
+    - dict: {"counters": {name: count}, "timers": {phase: {"calls": int,
+            "seconds": float}}}.
+    """
+    return {
+        "counters": dict(counters),
+        "timers": {name: {"calls": calls, "seconds": seconds}
+                   for name, (calls, seconds) in timers.items()},
+    }
+
+def to_json(indent=2):
+    """
+    Returns the counters and timers as JSON.
+
+    Parameters:
+    - indent (int or None): Indentation for the JSON (default is 2).
+
+    Returns:
+    - str: The JSON text.
+    """
+    return json.dumps(snapshot(), indent=indent)
+
+def to_prometheus(prefix="minesweeper"):
+    """
+    Returns the counters and timers in the Prometheus text format.
+
+    Parameters:
+    - prefix (str): Put in front of every metric name (default is "minesweeper").
+
+    Returns:
+    - str: The metrics, one per line.
+    """
+    lines = []
+    for name in COUNTERS:
+        metric = f"{prefix}_{name}_total"
+        lines.append(f"# TYPE {metric} counter")
+        lines.append(f"{metric} {counters[name]}")
+    for metric, position in ((f"{prefix}_phase_calls_total", 0),
+                             (f"{prefix}_phase_seconds_total", 1)):
+        lines.append(f"# TYPE {metric} counter")
+        for name, timer in sorted(timers.items()):
+            lines.append(f'{metric}{{phase="{name}"}} {timer[position]}')
+    return "\n".join(lines) + "\n"
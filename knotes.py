@@ -131,3 +131,15 @@ for row in grid:
 
 print(grid[1])    # Output: [3, 4]
 print(grid[1:])   # Output: [[3, 4], [5, 6, 7, 8]]
+
+# Storing Large Ragged Lists Compactly
+# Every inner list is its own Python object, which adds up with millions of rows.
+# ragged.py packs all the values into one flat array and keeps where each row starts,
+# so a row's length is known without looking at the row.
+from ragged import RaggedArray
+
+packed = RaggedArray.from_lists(ragged_list)
+for row in range(len(packed)):
+    print("Row", row, "has", packed.row_length(row), "columns:", list(packed[row]))
+print(packed.row_sums())   # Output: [6, 9, 6, 34]
+print(packed.to_lists())   # Output: [[1, 2, 3], [4, 5], [6], [7, 8, 9, 10]]
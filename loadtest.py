@@ -0,0 +1,180 @@
+# Puts load on server.py and reports how long moves take.
+# Run with: python loadtest.py --sessions 10000 --connections 200
+#
+# Every session plays random moves on its own board, starting a new game
+# when one ends. Sessions share a fixed number of connections, matching
+# replies to requests by "id", so thousands of sessions do not need
+# thousands of sockets.
+
+import argparse
+import asyncio
+import itertools
+import json
+import random
+import time
+
+class Connection:
+    """
+    One connection to the server that many sessions can send requests over.
+
+    Parameters:
+    - reader (asyncio.StreamReader): The connection's input.
+    - writer (asyncio.StreamWriter): The connection's output.
+    """
+
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self.waiting = {}  # Request id -> future for its reply
+        self._ids = itertools.count()
+        self._listener = asyncio.create_task(self._listen())
+
+    async def _listen(self):
+        while True:
+            line = await self.reader.readline()
+            if not line:
+                break
+            reply = json.loads(line)
+            future = self.waiting.pop(reply.get("id"), None)
+            if future is not None and not future.done():
+                future.set_result(reply)
+        for future in self.waiting.values():
+            future.set_exception(ConnectionError("The server closed the connection."))
+
+    async def request(self, **request):
+        """
+        Sends a request and waits for its reply.
+
+        Returns:
+        - dict: The reply.
+        """
+        request["id"] = next(self._ids)
+        future = asyncio.get_running_loop().create_future()
+        self.waiting[request["id"]] = future
+        self.writer.write(json.dumps(request, separators=(",", ":")).encode() + b"\n")
+        return await future
+
+    async def close(self):
+        self.writer.close()
+        await self.writer.wait_closed()
+        self._listener.cancel()
+
+async def play_session(connection, moves, rows, cols, mines, rng, latencies):
+    """
+    Plays random moves in one session, timing each move.
+
+    Parameters:
+    - connection (Connection): The connection to use.
+    - moves (int): How many moves to make.
+    - rows (int), cols (int), mines (int): The board to ask for.
+    - rng (random.Random): Picks the moves.
+    - latencies (list of float): Each move's time in seconds is added here.
+
+    Returns:
+    - int: The number of games started.
+    """
+    games = 0
+    session = None
+    for _ in range(moves):
+        if session is None:
+            reply = await connection.request(cmd="new", rows=rows, cols=cols,
+                                             mines=mines, seed=rng.getrandbits(32))
+            session = reply["session"]
+            games += 1
+        start = time.perf_counter()
+        reply = await connection.request(cmd="move", session=session,
+                                         row=rng.randrange(rows), col=rng.randrange(cols))
+        latencies.append(time.perf_counter() - start)
+        if reply.get("won") or reply.get("lost"):
+            await connection.request(cmd="close", session=session)
+            session = None
+    if session is not None:
+        await connection.request(cmd="close", session=session)
+    return games
+
+def percentile(values, fraction):
+    """
+    Finds a percentile by the nearest-rank method.
+
+    Parameters:
+    - values (list of float): The sorted values.
+    - fraction (float): Which percentile, e.g. 0.99.
+
+    Returns:
+    - float: The value, or 0.0 when there are none.
+    """
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+async def run_load(host="127.0.0.1", port=8765, unix_path=None, sessions=1000,
+                   connections=100, moves=20, rows=9, cols=9, mines=10, seed=0):
+    """
+    Runs many sessions against a server at once.
+
+    Parameters:
+    - host (str), port (int): The server's TCP address.
+    - unix_path (str or None): Connect to this Unix socket instead.
+    - sessions (int): How many sessions to run at once (default is 1000).
+    - connections (int): How many connections to share them over (default is 100).
+    - moves (int): Moves per session (default is 20).
+    - rows (int), cols (int), mines (int): The board each session asks for.
+    - seed (int): Seed for the moves (default is 0).
+
+    Returns:
+    - dict: Totals and move latencies in milliseconds (p50, p99 and max).
+    """
+    links = []
+    for _ in range(min(connections, sessions)):
+        if unix_path:
+            reader, writer = await asyncio.open_unix_connection(unix_path)
+        else:
+            reader, writer = await asyncio.open_connection(host, port)
+        links.append(Connection(reader, writer))
+
+    rng = random.Random(seed)
+    latencies = []
+    start = time.perf_counter()
+    games = await asyncio.gather(*(
+        play_session(links[number % len(links)], moves, rows, cols, mines,
+                     random.Random(rng.getrandbits(64)), latencies)
+        for number in range(sessions)
+    ))
+    elapsed = time.perf_counter() - start
+    for link in links:
+        await link.close()
+
+    latencies.sort()
+    return {
+        "sessions": sessions,
+        "connections": len(links),
+        "games": sum(games),
+        "moves": len(latencies),
+        "seconds": round(elapsed, 3),
+        "moves_per_second": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 3),
+        "max_ms": round(latencies[-1] * 1000, 3) if latencies else 0.0,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the Minesweeper server.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--unix", help="connect to this Unix socket path instead")
+    parser.add_argument("--sessions", type=int, default=1000)
+    parser.add_argument("--connections", type=int, default=100)
+    parser.add_argument("--moves", type=int, default=20)
+    parser.add_argument("--rows", type=int, default=9)
+    parser.add_argument("--cols", type=int, default=9)
+    parser.add_argument("--mines", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    result = asyncio.run(run_load(args.host, args.port, args.unix, args.sessions,
+                                  args.connections, args.moves, args.rows,
+                                  args.cols, args.mines, args.seed))
+    print(json.dumps(result, indent=2))
+
+if __name__ == "__main__":
+    main()
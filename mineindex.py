@@ -0,0 +1,214 @@
+# An index of where the mines are on a board.
+#
+# Finding every mine on a CompactBoard means scanning its whole bitset,
+# and on a list of lists grid it means looking at every cell. On a huge
+# sparse board (10^8 cells at 1% density) that scan is far more work than
+# the mines themselves. MineIndex keeps the mines' row-major indexes in
+# one sorted array. It costs 8 bytes a mine, so a board only builds it from
+# its bitset the first time it is asked for. Because the array is sorted,
+# each row's mines sit next to each other, so a row or a rectangle can be
+# found with a binary search instead of a scan.
+
+import re
+from array import array
+from bisect import bisect_left, bisect_right
+
+_NON_ZERO = re.compile(rb"[^\x00]")
+
+def bitset_indexes(mines):
+    """
+    Yields the position of every set bit in a bitset like CompactBoard.mines.
+
+    Parameters:
+    - mines (bytes-like): One bit per cell, lowest bit first.
+
+    Returns:
+    - generator of int: The positions of the set bits, in increasing order.
+    """
+    # The regular expression skips runs of empty bytes in C
+    for match in _NON_ZERO.finditer(mines):
+        byte_index = match.start()
+        byte = mines[byte_index]
+        while byte:
+            low_bit = byte & -byte
+            yield (byte_index << 3) + low_bit.bit_length() - 1
+            byte ^= low_bit
+
+class MineIndex:
+    """
+    The sorted row-major indexes (row * cols + col) of a board's mines.
+
+    Parameters:
+    - rows (int): The number of rows on the board.
+    - cols (int): The number of columns on the board.
+    - mines (iterable of int): The mine indexes, in any order. Repeats
+                               count once.
+    """
+
+    __slots__ = ("rows", "cols", "indexes")
+
+    def __init__(self, rows, cols, mines=()):
+        self.rows = rows
+        self.cols = cols
+        self.indexes = array("q")
+        add = self.indexes.append
+        previous = None
+        # Once sorted, repeats sit next to each other and can be skipped
+        for index in sorted(mines):
+            if index != previous:
+                add(index)
+                previous = index
+
+    @classmethod
+    def from_sorted(cls, rows, cols, indexes):
+        """
+        Builds the index from mine indexes that are already sorted, such as
+        those from generation.place_mines, without sorting them again.
+
+        Parameters:
+        - rows (int): The number of rows on the board.
+        - cols (int): The number of columns on the board.
+        - indexes (list of int or NumPy array): The sorted mine indexes.
+
+        Returns:
+        - MineIndex: The index.
+        """
+        index = cls.__new__(cls)
+        index.rows = rows
+        index.cols = cols
+        if isinstance(indexes, list):
+            index.indexes = array("q", indexes)
+        else:  # A NumPy array; copy its memory straight across
+            index.indexes = array("q")
+            index.indexes.frombytes(indexes.astype("int64").tobytes())
+        return index
+
+    @classmethod
+    def from_bitset(cls, rows, cols, mines):
+        """
+        Builds the index from a mine bitset like CompactBoard.mines.
+
+        Parameters:
+        - rows (int): The number of rows on the board.
+        - cols (int): The number of columns on the board.
+        - mines (bytes-like): One bit per cell, lowest bit first.
+
+        Returns:
+        - MineIndex: The index.
+        """
+        index = cls.__new__(cls)
+        index.rows = rows
+        index.cols = cols
+        index.indexes = array("q", bitset_indexes(mines))
+        return index
+
+    def __len__(self):
+        return len(self.indexes)
+
+    @property
+    def nbytes(self):
+        """
+        int: The number of bytes used by the sorted indexes.
+        """
+        return len(self.indexes) * self.indexes.itemsize
+
+    def __iter__(self):
+        return iter(self.indexes)
+
+    def __contains__(self, index):
+        position = bisect_left(self.indexes, index)
+        return position < len(self.indexes) and self.indexes[position] == index
+
+    def coordinates(self):
+        """
+        Yields the (row, col) of every mine, row by row.
+
+        Returns:
+        - generator of tuple of int: The mine coordinates.
+        """
+        cols = self.cols
+        for index in self.indexes:
+            yield divmod(index, cols)
+
+    def row(self, row):
+        """
+        Lists the columns of the mines in one row.
+
+        Parameters:
+        - row (int): The row index.
+
+        Returns:
+        - list of int: The mine columns, in increasing order.
+        """
+        start = row * self.cols
+        low = bisect_left(self.indexes, start)
+        high = bisect_left(self.indexes, start + self.cols, low)
+        return [index - start for index in self.indexes[low:high]]
+
+    def _clip(self, top, left, bottom, right):
+        return max(top, 0), max(left, 0), min(bottom, self.rows - 1), min(right, self.cols - 1)
+
+    def in_rectangle(self, top, left, bottom, right):
+        """
+        Lists the mines in a rectangle. Parts outside the board are ignored.
+
+        Parameters:
+        - top (int): The first row (inclusive).
+        - left (int): The first column (inclusive).
+        - bottom (int): The last row (inclusive).
+        - right (int): The last column (inclusive).
+
+        Returns:
+        - list of tuple of int: The (row, col) of each mine, row by row.
+        """
+        top, left, bottom, right = self._clip(top, left, bottom, right)
+        if top > bottom or left > right:
+            return []
+        indexes, cols = self.indexes, self.cols
+        low = bisect_left(indexes, top * cols + left)
+        high = bisect_right(indexes, bottom * cols + right, low)
+        # With few mines in the band of rows, filtering them is quickest;
+        # otherwise search each row for its slice of the rectangle
+        if high - low <= 2 * (bottom - top + 1):
+            return [(index // cols, index % cols) for index in indexes[low:high]
+                    if left <= index % cols <= right]
+        found = []
+        for row in range(top, bottom + 1):
+            start = row * cols
+            first = bisect_left(indexes, start + left, low, high)
+            last = bisect_right(indexes, start + right, first, high)
+            found.extend((row, index - start) for index in indexes[first:last])
+            low = last
+        return found
+
+    def count_in_rectangle(self, top, left, bottom, right):
+        """
+        Counts the mines in a rectangle. Parts outside the board are ignored.
+
+        Takes two binary searches per row, however many mines there are.
+
+        Parameters:
+        - top (int): The first row (inclusive).
+        - left (int): The first column (inclusive).
+        - bottom (int): The last row (inclusive).
+        - right (int): The last column (inclusive).
+
+        Returns:
+        - int: The number of mines inside the rectangle.
+        """
+        top, left, bottom, right = self._clip(top, left, bottom, right)
+        if top > bottom or left > right:
+            return 0
+        indexes, cols = self.indexes, self.cols
+        if left == 0 and right == cols - 1:  # Whole rows are one slice
+            return (bisect_right(indexes, bottom * cols + right)
+                    - bisect_left(indexes, top * cols))
+        low = bisect_left(indexes, top * cols + left)
+        high = bisect_right(indexes, bottom * cols + right, low)
+        total = 0
+        for row in range(top, bottom + 1):
+            start = row * cols
+            first = bisect_left(indexes, start + left, low, high)
+            low = bisect_right(indexes, start + right, first, high)
+            total += low - first
+        return total
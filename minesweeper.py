@@ -14,7 +14,17 @@
 
 # Written by Gower Campbell.
 
+import argparse
 import random
+import sys
+from collections import deque
+
+import instrument
+import movelog
+from board import CompactBoard
+from engine import Game
+from mineindex import MineIndex
+from render import ViewportRenderer
 
 def create_random_grid(rows, cols, mine_probability=0.2):
     """
@@ -27,32 +37,104 @@ def create_random_grid(rows, cols, mine_probability=0.2):
                                (default is 0.2).
 
     Returns:
-    - list of list of str: A 2D list representing the Minesweeper grid.
+    - SolvedGrid: A 2D list representing the Minesweeper grid, with the
+                  adjacent mine counts kept in its .counts attribute and
+                  the mine positions in .mine_index.
     """
     grid = []
-    for _ in range(rows):
+    mines = []  # Row-major indexes of the mines, in order
+    for r in range(rows):
         row = []
-        for _ in range(cols):
+        for c in range(cols):
             # Randomly decides if the cell is a mine based on set probability
             if random.random() < mine_probability:
                 row.append("#")  # Mine
+                mines.append(r * cols + c)
             else:
                 row.append("-")  # Mine-free spot
         grid.append(row)
-    return grid
+    return SolvedGrid(grid, build_count_grid(grid), MineIndex.from_sorted(rows, cols, mines))
+
+class SolvedGrid(list):
+    """
+    A Minesweeper grid (a list of rows) that also carries its neighbour counts.
 
-def count_adjacent_mines(grid, row, col):
+    It behaves exactly like the list of lists returned before, so existing
+    code can keep indexing it with grid[row][col]. The counts are worked out
+    once when the grid is built, so revealing a cell is a simple lookup.
+    Changing a cell afterwards does not update the counts or the mine index.
+
+    Parameters:
+    - rows (list of list of str): The grid rows with "#" for mines.
+    - counts (list of list of int): The mine count around every cell.
+    - mine_index (MineIndex or None): Where the mines are.
+    """
+
+    def __init__(self, rows, counts, mine_index=None):
+        super().__init__(rows)
+        self.counts = counts
+        self.mine_index = mine_index
+
+def build_count_grid(grid):
+    """
+    Works out the adjacent mine count for every cell in a single pass.
+
+    Instead of walking the 8 directions for each cell, the mines in each
+    row are first summed three at a time (left, centre, right), and then
+    three of those row sums are added together (above, centre, below).
+    The cell itself is taken away again so only its neighbours are counted.
+
+    Parameters:
+    - grid (list of list of str): The grid with "#" for mines.
+
+    Returns:
+    - list of list of int: The number of adjacent mines for each cell.
+    """
+    if not grid:
+        return []
+    cols = len(grid[0])
+    # 1 where there is a mine, 0 otherwise
+    mines = [[1 if cell == "#" else 0 for cell in row] for row in grid]
+
+    # Sums of each cell with its left and right neighbours
+    row_sums = []
+    for row in mines:
+        padded = [0] + row + [0]
+        row_sums.append([padded[c] + padded[c + 1] + padded[c + 2]
+                         for c in range(cols)])
+
+    zeros = [0] * cols
+    counts = []
+    for r in range(len(mines)):
+        above = row_sums[r - 1] if r > 0 else zeros
+        below = row_sums[r + 1] if r + 1 < len(mines) else zeros
+        counts.append([above[c] + row_sums[r][c] + below[c] - mines[r][c]
+                       for c in range(cols)])
+    return counts
+
+def count_adjacent_mines(grid, row, col, index=None):
     """
     Counts the number of mines to a specific cell in the grid.
 
     Parameters:
-    - grid ( a list of a list set to str): Representing the Minesweeper grid.
+    - grid ( a list of a list set to str, or CompactBoard): Representing the
+                                                           Minesweeper grid.
     - row (int): The row index of the cell to check.
     - col (int): The column index of the cell to check.
+    - index (SummedAreaTable or FenwickGrid or None): A mine index built from
+                                                     the grid (see
+                                                     neighbourhood.py) to
+                                                     answer from instead.
 
     Returns:
     - int: The number of mines adjacent to the cell at (row, col).
     """
+    # A CompactBoard already knows its counts
+    if isinstance(grid, CompactBoard):
+        return grid.count_adjacent_mines(row, col)
+    if index is not None:
+        return index.moore(row, col)
+
     # Directions for checking adjacent cells 
     # (8 directions: NW, N, NE, W, E, SW, S, SE)
     directions = [
@@ -79,29 +161,100 @@ def reveal_cell(grid, visible_grid, row, col):
     Reveals a cell in the grid and updates the visible grid.
 
     Parameters:
-    - grid (list of list set of str): The grid with mines and counts.
-    - visible_grid (list of list set of str): The grid visible to the player.
+    - grid (list of list set of str, or CompactBoard): The grid with mines and counts.
+    - visible_grid (list of list set of str): The grid visible to the player
+                                              (not used for a CompactBoard).
     - row (int): The row index of the cell to reveal.
     - col (int): The column index of the cell to reveal.
 
     Returns:
     - bool: True if the revealed cell is a mine, False otherwise.
     """
+    # A CompactBoard keeps its own visible state
+    if isinstance(grid, CompactBoard):
+        return grid.reveal_cell(row, col)
+
     if grid[row][col] == "#":
         visible_grid[row][col] = "#"  # Reveal the mine
         return True  # Player hit a mine
     else:
+        # Use the precomputed counts when the grid has them
+        counts = getattr(grid, "counts", None)
+        if counts is not None:
+            count = counts[row][col]
+        else:
+            count = count_adjacent_mines(grid, row, col)
         # Update the visible grid with the mine count
-        visible_grid[row][col] = str(count_adjacent_mines(grid, row, col))
+        visible_grid[row][col] = str(count)
         return False
 
+def reveal_region(grid, visible_grid, row, col):
+    """
+    Reveals a cell and, when it has no adjacent mines, opens the whole
+    connected empty area around it together with its numbered border.
+
+    A queue of cells is used instead of recursion, so even huge empty
+    areas do not hit Python's recursion limit. Each cell in the area is
+    only looked at once.
+
+    Parameters:
+    - grid (list of list set of str, or CompactBoard): The grid with mines and counts.
+    - visible_grid (list of list set of str): The grid visible to the player
+                                              (not used for a CompactBoard).
+    - row (int): The row index of the cell to reveal.
+    - col (int): The column index of the cell to reveal.
+
+    Returns:
+    - list of tuple of int: The (row, col) of every cell that was revealed.
+    """
+    if isinstance(grid, CompactBoard):
+        return grid.reveal_region(row, col)
+
+    rows, cols = len(grid), len(grid[0])
+    counts = getattr(grid, "counts", None)
+    changed = []
+
+    def open_cell(r, c):
+        # Reveals one hidden cell and returns its count (-1 for a mine)
+        if grid[r][c] == "#":
+            visible_grid[r][c] = "#"
+            changed.append((r, c))
+            return -1
+        count = counts[r][c] if counts is not None else count_adjacent_mines(grid, r, c)
+        visible_grid[r][c] = str(count)
+        changed.append((r, c))
+        return count
+
+    if visible_grid[row][col] == "-":
+        count = open_cell(row, col)
+    elif visible_grid[row][col] == "0":
+        count = 0
+    else:
+        return changed
+
+    queue = deque([(row, col)] if count == 0 else [])
+    while queue:
+        r, c = queue.popleft()
+        # A cell with no adjacent mines can safely open all its neighbours
+        for new_row in range(max(r - 1, 0), min(r + 2, rows)):
+            for new_col in range(max(c - 1, 0), min(c + 2, cols)):
+                if visible_grid[new_row][new_col] == "-":
+                    if open_cell(new_row, new_col) == 0:
+                        queue.append((new_row, new_col))
+    return changed
+
 def print_grid(grid):
     """
     Prints the grid in a readable format with row and column numbers.
 
     Parameters:
-    - grid (list of list of str/int): The 2D list representing the grid.
+    - grid (list of list of str/int, or CompactBoard): The 2D list representing
+                                                       the grid.
     """
+    if isinstance(grid, CompactBoard):
+        grid.print_grid()
+        return
+
     # Print column numbers (right-aligned)
     print("    " + "  ".join(f"{i:>2}" for i in range(len(grid[0]))))
 
@@ -116,82 +269,158 @@ def mark_mines(grid, visible_grid):
     Marks the locations of mines on the visible grid.
 
     Parameters:
-    - grid (list of list of str): The original grid with mines.
-    - visible_grid (list of list of str): The grid visible to the player.
+    - grid (list of list of str, or CompactBoard): The original grid with mines.
+    - visible_grid (list of list of str): The grid visible to the player
+                                          (not used for a CompactBoard).
+
+    Returns:
+    - list of tuple of int: For a CompactBoard, the (row, col) of every mine
+                            that was revealed.
     """
+    if isinstance(grid, CompactBoard):
+        return grid.mark_mines()
+
+    # Go straight to the mines when the grid knows where they are
+    mine_index = getattr(grid, "mine_index", None)
+    if mine_index is not None:
+        for row, col in mine_index.coordinates():
+            visible_grid[row][col] = "#"
+        return
+
     for row in range(len(grid)):
         for col in range(len(grid[0])):
             if grid[row][col] == "#":
                 visible_grid[row][col] = "#"  # Mark the mine
 
-def play_minesweeper(rows, cols, mine_probability=0.2):
+def play_minesweeper(rows, cols, mine_probability=0.2, viewport=None, seed=None, log=None):
     """
     Playable Minesweeper game.
 
+    The rules live in engine.Game; this function only handles the
+    player's input and the printing. Call instrument.enable() first to time
+    the drawing, input and move phases of each turn.
+
     Parameters:
     - rows (int): The number of rows in the grid.
     - cols (int): The number of columns in the grid.
-    - mine_probability (float): The probability of a cell being a mine.
+    - mine_probability (float): The share of cells that are mines.
+    - viewport (tuple of int or None): (height, width) to show only that
+                                       much of the board around the last
+                                       move, redrawing just the cells that
+                                       change. By default the whole board
+                                       is printed each turn.
+    - seed (int or None): Seed so the same game can be played again.
+    - log (str or None): Path of a move log (see movelog.py) to add this
+                         game to, so it can be replayed later.
     """
-    # Creates the original grid with mines
-    grid = create_random_grid(rows, cols, mine_probability)
-
-    # Creates a grid for the player (all cells hidden, represented by "-")
-    visible_grid = [["-" for _ in range(cols)] for _ in range(rows)]
-
-    # Introduces lives: Player starts with 3 lives
-    lives = 3
-
-    # Flag to control the game loop
-    game_over = False
+    # Creates the game. The mines are placed after the first move so it is
+    # always safe, and the board keeps count of the hidden safe cells so
+    # checking for a win does not need to scan the grid.
+    # The player starts with 3 lives.
+    # A logged game needs a seed to be replayed from
+    if log is not None and seed is None:
+        seed = movelog.new_seed()
+    game = Game(rows, cols, round(rows * cols * mine_probability), seed=seed)
+    writer = None
+    if log is not None:
+        writer = movelog.MoveLogWriter(log)
+        writer.start_game(game)
+
+    # With a viewport, messages are shown under the board on the next frame
+    renderer = None
+    messages = []
+    say = print
+    if viewport is not None:
+        renderer = ViewportRenderer(game.board, *viewport)
+        say = messages.append
 
     # Game loop
-    while not game_over:
-        print("\nMinesweeper:")
-        print("Will you survive?")
-        print(f"\nLives remaining: {lives}")
-        print("------------------>")
-        print_grid(visible_grid)
+    while not game.over:
+        with instrument.phase("draw"):
+            if renderer is None:
+                print("\nMinesweeper:")
+                print("Will you survive?")
+                print(f"\nLives remaining: {game.lives}")
+                print("------------------>")
+                print_grid(game.board)
+            else:
+                renderer.render(messages + [f"Lives remaining: {game.lives}"])
+                messages.clear()
 
         # Get player input
         try:
-            row = int(input("\nEnter row number: "))
-            col = int(input("Enter column number: "))
+            with instrument.phase("input"):
+                row = int(input("\nEnter row number: "))
+                col = int(input("Enter column number: "))
         except ValueError:
-            print("\nInvalid input! Please enter numbers.")
+            say("\nInvalid input! Please enter numbers.")
             continue
 
         # Check if the input is within bounds
-        if row < 0 or row >= rows or col < 0 or col >= cols:
-            print("\nInvalid row or column! Try again.")
+        if not game.in_bounds(row, col):
+            say("\nInvalid row or column! Try again.")
             continue
 
-        # Reveal the cell
-        if reveal_cell(grid, visible_grid, row, col):
-            lives -= 1  # Decrease lives when the player hits a mine
-            print("\nYou hit a mine!")
-            if lives == 0:  # Check if the player has run out of lives
-                print("\nGame Over! You've run out of lives.")
-                mark_mines(grid, visible_grid)  # Mark all mines
-                print("\nFinal Grid:")
-                print_grid(visible_grid)
-                game_over = True
+        # Reveal the cell (and any empty area around it)
+        with instrument.phase("move"):
+            hit_mine, changed = game.move(row, col)
+        if writer is not None:
+            writer.record(row, col, movelog.outcome_of(game, hit_mine))
+        if hit_mine:
+            say("\nYou hit a mine!")
+            if game.lost:
+                say("\nGame Over! You've run out of lives.")
             else:
-                print(f"Lives remaining: {lives}")
-        else:
-            # Check if the player has won
-            if all(cell != "-" for row in visible_grid for cell in row):
-                print("\nCongratulations! You've cleared the grid.")
-                mark_mines(grid, visible_grid)  # Mark all mines
-                print("Final Grid:")
-                print_grid(visible_grid)
-                game_over = True
-
-# Start the game
-rows = 5
-cols = 5
-mine_probability = 0.2  # 20% chance of a cell being a mine
-play_minesweeper(rows, cols, mine_probability)
+                say(f"Lives remaining: {game.lives}")
+        elif game.won:
+            say("\nCongratulations! You've cleared the grid.")
+
+        if renderer is not None:
+            renderer.board = game.board  # The mines are placed on the first move
+            renderer.center_on(row, col)
+            renderer.mark_dirty(changed)
+
+    if writer is not None:
+        writer.close()
+
+    # Show the final grid
+    if renderer is None:
+        print("\nFinal Grid:")
+        print_grid(game.board)
+    else:
+        renderer.render(messages)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Play Minesweeper in the terminal.")
+    parser.add_argument("--rows", type=int, default=5)
+    parser.add_argument("--cols", type=int, default=5)
+    parser.add_argument("--density", type=float, default=0.2,
+                        help="share of cells that are mines (default 0.2, a 20%% chance)")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--viewport", type=int, nargs=2, metavar=("HEIGHT", "WIDTH"),
+                        help="show only this much of the board around the last move")
+    parser.add_argument("--log", help="add the game to this move log")
+    parser.add_argument("--stats", action="store_true",
+                        help="print counters and timings (Prometheus format) at the end")
+    args = parser.parse_args(argv)
+    if args.rows < 1 or args.cols < 1:
+        parser.error("--rows and --cols must be at least 1")
+    if not 0 <= args.density <= 1:
+        parser.error("--density must be between 0 and 1")
+
+    if args.stats:
+        # Pass this module in: run as a script it is __main__, and a fresh
+        # "import minesweeper" would load a second copy that never runs
+        instrument.enable(sys.modules[__name__])
+    play_minesweeper(args.rows, args.cols, args.density, viewport=args.viewport,
+                     seed=args.seed, log=args.log)
+    if args.stats:
+        instrument.disable()
+        print(instrument.to_prometheus(), end="")
+
+# Start the game (only when run directly, so the functions can be imported)
+if __name__ == "__main__":
+    main()
 
 #<----- Reflections -------->
 
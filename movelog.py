@@ -0,0 +1,354 @@
+# Recording games in a compact binary log and replaying them.
+#
+# A game is fully decided by its settings, its seed and the cells clicked,
+# so that is all the log keeps. Many games can share one file, and games
+# are only ever appended, so a log can be written while playing.
+#
+# File layout:
+# - b"MSLG" and a version byte, once at the start of the file.
+# - For each game, b"G" and then varints: rows, cols, mine count, lives,
+#   flags (1 = has a seed, 2 = mines placed with NumPy) and the seed.
+# - Then one entry per move: varint(1 + (zigzag(row change) << 2 | outcome))
+#   followed by varint(zigzag(column change)). Changes are from the
+#   previous move (the first from (0, 0)), so nearby clicks take one byte
+#   each. The outcome is SAFE, MINE, WON or LOST.
+# - A 0 byte ends the game. A game cut off by a crash just has no end, so
+#   a writer adding to an existing file first writes a 0 in case the last
+#   game was left open; readers skip spare 0 bytes between games.
+#
+# Varints store 7 bits per byte, low bits first, with the top bit set on
+# every byte but the last. Zigzag turns 0, -1, 1, -2, ... into 0, 1, 2, 3,
+# ... so small negative changes stay small too.
+
+import mmap
+import os
+import random
+
+from engine import Game
+from generation import uses_numpy
+
+MAGIC = b"MSLG"
+VERSION = 1
+GAME = b"G"[0]
+HAS_SEED = 1
+USED_NUMPY = 2
+
+# Move outcomes
+SAFE, MINE, WON, LOST = range(4)
+
+def _zigzag(value):
+    return value << 1 if value >= 0 else ((-value) << 1) - 1
+
+def _unzigzag(value):
+    return value >> 1 if not value & 1 else -((value + 1) >> 1)
+
+def _varint(value):
+    out = bytearray()
+    while value >= 0x80:
+        out.append(value & 0x7F | 0x80)
+        value >>= 7
+    out.append(value)
+    return out
+
+def _read_varint(data, position):
+    # Returns (value, next position)
+    byte = data[position]
+    if byte < 0x80:
+        return byte, position + 1
+    value, shift = 0, 0
+    while byte >= 0x80:
+        value |= (byte & 0x7F) << shift
+        shift += 7
+        position += 1
+        byte = data[position]
+    return value | byte << shift, position + 1
+
+def outcome_of(game, hit_mine):
+    """
+    Works out what a move led to.
+
+    Parameters:
+    - game (Game): The game just after the move.
+    - hit_mine (bool): Whether the move hit a mine.
+
+    Returns:
+    - int: WON, LOST, MINE or SAFE.
+    """
+    if game.won:
+        return WON
+    if game.lost:
+        return LOST
+    return MINE if hit_mine else SAFE
+
+class MoveLogWriter:
+    """
+    Appends games to a log file.
+
+    Use it as a context manager, or call close when done.
+
+    Parameters:
+    - path (str): The log file. It is created if needed and added to otherwise.
+    """
+
+    def __init__(self, path):
+        self.file = open(path, "ab")
+        if self.file.tell() == 0:
+            self.file.write(MAGIC + bytes([VERSION]))
+        else:
+            self.file.write(b"\0")  # Closes a game left open by a crash
+        self._last = None  # The previous move's (row, col), None between games
+
+    def start_game(self, game):
+        """
+        Records a new game's settings. Call before its first move.
+
+        The game needs a seed, or it could not be replayed; use
+        new_seed() to pick one for an otherwise random game.
+
+        Parameters:
+        - game (Game): The game about to be played.
+
+        Raises:
+        - ValueError: If the game has no seed.
+        """
+        if game.seed is None:
+            raise ValueError("Only games with a seed can be logged.")
+        if self._last is not None:
+            self.end_game()
+        use_numpy = uses_numpy(game.rows, game.cols, game.seed, use_numpy=game.use_numpy)
+        flags = HAS_SEED | (USED_NUMPY if use_numpy else 0)
+        record = bytearray([GAME])
+        for value in (game.rows, game.cols, game.mine_count, game.starting_lives,
+                      flags, _zigzag(game.seed)):
+            record += _varint(value)
+        self.file.write(record)
+        self._last = (0, 0)
+
+    def record(self, row, col, outcome):
+        """
+        Records one move of the current game.
+
+        Parameters:
+        - row (int): The row clicked.
+        - col (int): The column clicked.
+        - outcome (int): What the move led to (see outcome_of).
+        """
+        last_row, last_col = self._last
+        self.file.write(_varint(1 + (_zigzag(row - last_row) << 2 | outcome))
+                        + _varint(_zigzag(col - last_col)))
+        self._last = (row, col)
+
+    def end_game(self):
+        """
+        Marks the end of the current game and writes it out.
+        """
+        if self._last is not None:
+            self.file.write(b"\0")
+            self._last = None
+        self.file.flush()
+
+    def close(self):
+        self.end_game()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+def new_seed():
+    """
+    Picks a random seed for a game that is going to be logged.
+
+    Returns:
+    - int: The seed.
+    """
+    return random.getrandbits(63)
+
+class LoggedGame:
+    """
+    One game read back from a log.
+
+    Parameters:
+    - rows (int), cols (int), mine_count (int), lives (int): The settings.
+    - seed (int): The seed the mines were placed with.
+    - use_numpy (bool): Whether the mines were placed by NumPy.
+    - moves (list of tuple of int): (row, col, outcome) for each move.
+    - finished (bool): False if the log stopped in the middle of the game.
+    """
+
+    __slots__ = ("rows", "cols", "mine_count", "lives", "seed", "use_numpy",
+                 "moves", "finished")
+
+    def __init__(self, rows, cols, mine_count, lives, seed, use_numpy, moves, finished=True):
+        self.rows = rows
+        self.cols = cols
+        self.mine_count = mine_count
+        self.lives = lives
+        self.seed = seed
+        self.use_numpy = use_numpy
+        self.moves = moves
+        self.finished = finished
+
+    @property
+    def result(self):
+        """
+        int or None: The last move's outcome, or None if there were no moves.
+        """
+        return self.moves[-1][2] if self.moves else None
+
+    def new_game(self):
+        """
+        Sets up the game before any moves.
+
+        Returns:
+        - Game: The game, ready for its first move.
+        """
+        return Game(self.rows, self.cols, self.mine_count, seed=self.seed,
+                    lives=self.lives, use_numpy=self.use_numpy)
+
+def _parse(data, position):
+    # Reads one game starting at its b"G"; returns (LoggedGame, next position)
+    end = len(data)
+    position += 1
+    values = []
+    for _ in range(6):
+        value, position = _read_varint(data, position)
+        values.append(value)
+    rows, cols, mine_count, lives, flags, seed = values
+    moves = []
+    row = col = 0
+    finished = False
+    try:
+        while position < end:
+            head = data[position]
+            if head == 0:
+                position += 1
+                finished = True
+                break
+            if head < 0x80 and position + 1 < end and data[position + 1] < 0x80:
+                # Both varints are one byte, the usual case
+                step, column_step = head - 1, data[position + 1]
+                position += 2
+            else:
+                step, position = _read_varint(data, position)
+                step -= 1
+                column_step, position = _read_varint(data, position)
+            row += _unzigzag(step >> 2)
+            col += _unzigzag(column_step)
+            moves.append((row, col, step & 3))
+    except IndexError:  # The file ends in the middle of a move
+        position = end
+    return LoggedGame(rows, cols, mine_count, lives,
+                      _unzigzag(seed) if flags & HAS_SEED else None,
+                      bool(flags & USED_NUMPY), moves, finished), position
+
+def scan(path):
+    """
+    Reads every game in a log, one at a time, without replaying them.
+
+    The file is memory-mapped, so huge logs are streamed rather than
+    loaded. A game cut short at the end of the file is still yielded, with
+    finished set to False.
+
+    Parameters:
+    - path (str): The log file.
+
+    Yields:
+    - LoggedGame: Each game in the order it was written.
+
+    Raises:
+    - ValueError: If the file is not a move log.
+    """
+    if os.path.getsize(path) == 0:
+        return
+    with open(path, "rb") as file, \
+            mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        if data[:4] != MAGIC or data[4] != VERSION:
+            raise ValueError("Not a move log.")
+        position = len(MAGIC) + 1
+        while position < len(data):
+            if data[position] == 0:
+                position += 1
+                continue
+            if data[position] != GAME:
+                raise ValueError(f"Broken move log at byte {position}.")
+            try:
+                game, position = _parse(data, position)
+            except IndexError:  # The file ends in the middle of a game's settings
+                return
+            yield game
+
+def scan_many(paths):
+    """
+    Reads the games from several logs in turn.
+
+    Parameters:
+    - paths (iterable of str): The log files.
+
+    Yields:
+    - LoggedGame: Each game from each file.
+    """
+    for path in paths:
+        yield from scan(path)
+
+class Replay:
+    """
+    Rebuilds a logged game as it was after any move.
+
+    A copy of the game is kept every snapshot_every moves as the replay
+    passes it, so jumping to move N only has to play the moves since the
+    nearest copy before it.
+
+    Parameters:
+    - logged (LoggedGame): The game to replay.
+    - snapshot_every (int): Moves between kept copies (default is 32).
+    """
+
+    def __init__(self, logged, snapshot_every=32):
+        self.logged = logged
+        self.snapshot_every = snapshot_every
+        self.snapshots = {0: None}  # Move number -> (board, lives), None for the start
+
+    def __len__(self):
+        return len(self.logged.moves)
+
+    def _restore(self, turn):
+        snapshot = self.snapshots[turn]
+        if snapshot is None:
+            return self.logged.new_game()
+        board, lives = snapshot
+        game = Game.resume(board.copy(), seed=self.logged.seed, lives=lives,
+                           starting_lives=self.logged.lives)
+        game.use_numpy = self.logged.use_numpy
+        game.moves = turn
+        return game
+
+    def seek(self, turn):
+        """
+        Rebuilds the game after a number of moves.
+
+        Parameters:
+        - turn (int): How many moves to play (0 for the start, len(replay)
+                      for the end).
+
+        Returns:
+        - Game: A new Game in that state, free to be played on.
+
+        Raises:
+        - IndexError: If turn is not between 0 and the number of moves.
+        """
+        if not 0 <= turn <= len(self):
+            raise IndexError("Turn out of range.")
+        start = max(t for t in self.snapshots if t <= turn)
+        game = self._restore(start)
+        moves = self.logged.moves
+        for number in range(start, turn):
+            row, col, outcome = moves[number]
+            hit_mine, _ = game.move(row, col)
+            if outcome_of(game, hit_mine) != outcome:
+                raise ValueError(f"Move {number + 1} did not replay as logged.")
+            if game.moves % self.snapshot_every == 0 and game.moves not in self.snapshots:
+                self.snapshots[game.moves] = (game.board.copy(), game.lives)
+        return game
@@ -0,0 +1,223 @@
+# Counting what is inside any rectangle of a grid in constant time.
+#
+# count_adjacent_mines (minesweeper.py) and count_adjacent (example.py) only
+# look at the 8 cells around a cell, one at a time. A summed-area table
+# stores, for every cell, the total of everything above and to the left of
+# it. Any rectangle's total then comes from four of those numbers, whatever
+# its size, which makes wider neighbourhoods ("mines within 5 cells") just
+# as cheap. When the grid keeps changing, FenwickGrid answers the same
+# questions and can also be updated one cell at a time.
+
+class _RectangleQueries:
+    # Neighbourhood queries shared by both index types. Subclasses provide
+    # rows, cols, value_at() and _prefix(), the total of cells above and to
+    # the left of (row, col), not including that row and column.
+
+    def rect_sum(self, top, left, bottom, right):
+        """
+        Adds up the cells in a rectangle. Parts outside the grid are ignored.
+
+        Parameters:
+        - top (int): The first row (inclusive).
+        - left (int): The first column (inclusive).
+        - bottom (int): The last row (inclusive).
+        - right (int): The last column (inclusive).
+
+        Returns:
+        - int: The total of the cells inside the rectangle.
+        """
+        top, left = max(top, 0), max(left, 0)
+        bottom, right = min(bottom, self.rows - 1), min(right, self.cols - 1)
+        if top > bottom or left > right:
+            return 0
+        return (self._prefix(bottom + 1, right + 1) - self._prefix(top, right + 1)
+                - self._prefix(bottom + 1, left) + self._prefix(top, left))
+
+    def moore(self, row, col, radius=1, include_centre=False):
+        """
+        Adds up the square of cells within radius steps, diagonals included.
+        With radius 1 this is the same 8 cells count_adjacent_mines uses.
+
+        Parameters:
+        - row (int): The row index of the centre cell.
+        - col (int): The column index of the centre cell.
+        - radius (int): How far the square reaches (default is 1).
+        - include_centre (bool): Whether to count the centre cell itself.
+
+        Returns:
+        - int: The total of the neighbourhood.
+        """
+        total = self.rect_sum(row - radius, col - radius, row + radius, col + radius)
+        return total if include_centre else total - self.value_at(row, col)
+
+    def von_neumann(self, row, col, radius=1, include_centre=False):
+        """
+        Adds up the diamond of cells within radius steps, moving only up,
+        down, left and right. Costs one rectangle per row of the diamond.
+
+        Parameters:
+        - row (int): The row index of the centre cell.
+        - col (int): The column index of the centre cell.
+        - radius (int): How far the diamond reaches (default is 1).
+        - include_centre (bool): Whether to count the centre cell itself.
+
+        Returns:
+        - int: The total of the neighbourhood.
+        """
+        total = 0
+        for offset in range(-radius, radius + 1):
+            reach = radius - abs(offset)
+            total += self.rect_sum(row + offset, col - reach, row + offset, col + reach)
+        return total if include_centre else total - self.value_at(row, col)
+
+def _cell_values(grid, value):
+    # The value of every cell as a flat row-major list, padding ragged rows
+    rows = len(grid)
+    cols = max((len(row) for row in grid), default=0)
+    values = [0] * (rows * cols)
+    for r, row in enumerate(grid):
+        base = r * cols
+        for c, cell in enumerate(row):
+            values[base + c] = value(cell)
+    return rows, cols, values
+
+def is_mine(cell):
+    """
+    Counts Minesweeper mines: 1 for "#", 0 otherwise.
+
+    Parameters:
+    - cell (str): A grid cell.
+
+    Returns:
+    - int: 1 if the cell is a mine.
+    """
+    return 1 if cell == "#" else 0
+
+def is_non_zero(cell):
+    """
+    Counts non-zero cells, as example.count_adjacent does.
+
+    Parameters:
+    - cell (int): A grid cell.
+
+    Returns:
+    - int: 1 if the cell is not 0.
+    """
+    return 1 if cell != 0 else 0
+
+class SummedAreaTable(_RectangleQueries):
+    """
+    Answers rectangle totals in O(1) for a grid that does not change.
+
+    Parameters:
+    - grid (list of list): The grid to index. Ragged rows are padded.
+    - value (callable): Turns a cell into the number to add up
+                        (default is is_mine).
+    """
+
+    def __init__(self, grid, value=is_mine):
+        self.rows, self.cols, self._values = _cell_values(grid, value)
+        stride = self.cols + 1
+        prefix = [0] * ((self.rows + 1) * stride)
+        for r in range(self.rows):
+            running = 0
+            above = r * stride
+            here = above + stride
+            base = r * self.cols
+            for c in range(self.cols):
+                running += self._values[base + c]
+                prefix[here + c + 1] = prefix[above + c + 1] + running
+        self._table = prefix
+
+    def _prefix(self, row, col):
+        return self._table[row * (self.cols + 1) + col]
+
+    def value_at(self, row, col):
+        """
+        Returns the value of one cell (0 outside the grid).
+
+        Parameters:
+        - row (int): The row index.
+        - col (int): The column index.
+
+        Returns:
+        - int: The cell's value.
+        """
+        if 0 <= row < self.rows and 0 <= col < self.cols:
+            return self._values[row * self.cols + col]
+        return 0
+
+class FenwickGrid(_RectangleQueries):
+    """
+    Answers rectangle totals in O(log rows * log cols) and can be updated
+    one cell at a time, for grids that change as they are used.
+
+    Parameters:
+    - grid (list of list): The grid to index. Ragged rows are padded.
+    - value (callable): Turns a cell into the number to add up
+                        (default is is_mine).
+    """
+
+    def __init__(self, grid, value=is_mine):
+        self.rows, self.cols, self._values = _cell_values(grid, value)
+        self._tree = [0] * ((self.rows + 1) * (self.cols + 1))
+        for index, amount in enumerate(self._values):
+            if amount:
+                self._add(index // self.cols, index % self.cols, amount)
+
+    def _add(self, row, col, amount):
+        stride = self.cols + 1
+        r = row + 1
+        while r <= self.rows:
+            c = col + 1
+            while c <= self.cols:
+                self._tree[r * stride + c] += amount
+                c += c & -c
+            r += r & -r
+
+    def _prefix(self, row, col):
+        stride = self.cols + 1
+        total = 0
+        r = row
+        while r > 0:
+            c = col
+            while c > 0:
+                total += self._tree[r * stride + c]
+                c -= c & -c
+            r -= r & -r
+        return total
+
+    def value_at(self, row, col):
+        """
+        Returns the value of one cell (0 outside the grid).
+
+        Parameters:
+        - row (int): The row index.
+        - col (int): The column index.
+
+        Returns:
+        - int: The cell's value.
+        """
+        if 0 <= row < self.rows and 0 <= col < self.cols:
+            return self._values[row * self.cols + col]
+        return 0
+
+    def set_value(self, row, col, amount):
+        """
+        Changes one cell's value.
+
+        Parameters:
+        - row (int): The row index.
+        - col (int): The column index.
+        - amount (int): The new value.
+
+        Raises:
+        - IndexError: If the cell is not on the grid.
+        """
+        if not (0 <= row < self.rows and 0 <= col < self.cols):
+            raise IndexError(f"({row}, {col}) is not on the grid.")
+        index = row * self.cols + col
+        change = amount - self._values[index]
+        if change:
+            self._values[index] = amount
+            self._add(row, col, change)
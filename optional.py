@@ -0,0 +1,37 @@
+# Loading the optional heavy libraries only when they are first needed.
+#
+# NumPy and matplotlib each take a large share of a second to import, far
+# longer than the game itself takes to start. Modules here do not import
+# them at the top; the functions with a NumPy or plotting path call
+# load_numpy() or load_pyplot() instead, so importing a module stays cheap
+# and the library is only loaded once something actually uses it.
+
+import importlib
+
+_loaded = {}  # Module name -> module, or None when it is not installed
+
+def _load(name):
+    if name not in _loaded:
+        try:
+            _loaded[name] = importlib.import_module(name)
+        except ImportError:
+            _loaded[name] = None
+    return _loaded[name]
+
+def load_numpy():
+    """
+    Imports NumPy the first time it is asked for.
+
+    Returns:
+    - module or None: The numpy module, or None if it is not installed.
+    """
+    return _load("numpy")
+
+def load_pyplot():
+    """
+    Imports matplotlib.pyplot the first time it is asked for.
+
+    Returns:
+    - module or None: The pyplot module, or None if matplotlib is not installed.
+    """
+    return _load("matplotlib.pyplot")
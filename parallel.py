@@ -0,0 +1,182 @@
+# Counting non-zero neighbours of every cell with several processes.
+#
+# example.process_grid_fast counts a whole grid in one process. For grids
+# with billions of cells that is still too slow, but every cell's count
+# only needs the rows just above and below it, so the grid can be cut into
+# bands of rows and each band counted by a different process.
+#
+# The grid and the counts live in multiprocessing.shared_memory blocks.
+# Workers open the blocks by name when they start, and each task is just a
+# (top, bottom) pair of rows, so no cells are ever pickled or copied
+# between processes. A worker reads its band plus one halo row on each
+# side, and writes only its own rows of the counts, so no locking is needed.
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+from optional import load_numpy  # NumPy is optional, bands fall back to Python lists
+
+# The most cells a worker handles in one task, to keep its memory small
+BAND_CELLS = 1 << 23
+
+class SharedGrid:
+    """
+    A rows x cols grid of bytes kept in shared memory.
+
+    Use it as a context manager (or call close) so the memory is freed.
+    Fill it in place through .array (with NumPy) or .buffer, so huge grids
+    never need a second copy in ordinary memory.
+
+    Parameters:
+    - rows (int): The number of rows.
+    - cols (int): The number of columns.
+    - name (str or None): Open an existing block with this name instead of
+                          making a new one.
+    """
+
+    def __init__(self, rows, cols, name=None):
+        self.rows = rows
+        self.cols = cols
+        self._owner = name is None
+        self.memory = shared_memory.SharedMemory(name=name, create=self._owner,
+                                                 size=max(rows * cols, 1))
+        self.buffer = self.memory.buf[:rows * cols]
+        np = load_numpy()
+        self.array = (np.ndarray((rows, cols), dtype=np.uint8, buffer=self.buffer)
+                      if np is not None else None)
+
+    @property
+    def name(self):
+        """
+        str: The name other processes use to open the block.
+        """
+        return self.memory.name
+
+    def close(self):
+        """
+        Stops using the block, and frees it if this grid made it.
+        """
+        self.array = None
+        self.buffer.release()
+        self.memory.close()
+        if self._owner:
+            self.memory.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+# Set in each worker by _attach: (grid, counts)
+_shared = None
+
+def _attach(grid_name, counts_name, rows, cols):
+    global _shared
+    _shared = (SharedGrid(rows, cols, grid_name), SharedGrid(rows, cols, counts_name))
+
+def _count_band(top, bottom):
+    # Counts rows top to bottom - 1, reading one extra row on each side
+    grid, counts = _shared
+    if grid.array is not None:
+        _count_band_numpy(grid.array, counts.array, top, bottom)
+    else:
+        _count_band_lists(grid.buffer, counts.buffer, grid.rows, grid.cols, top, bottom)
+    return bottom - top
+
+def _count_band_numpy(grid, counts, top, bottom):
+    np = load_numpy()
+    rows, cols = grid.shape
+    # The band's non-zero flags with its halo rows, and zero rows past the
+    # edges of the grid
+    window = np.zeros((bottom - top + 2, cols), dtype=np.uint8)
+    low, high = max(top - 1, 0), min(bottom + 1, rows)
+    np.not_equal(grid[low:high], 0, out=window[low - top + 1:high - top + 1], casting="unsafe")
+    # Each flag plus its left and right neighbours, then three rows of those
+    across = window.copy()
+    across[:, 1:] += window[:, :-1]
+    across[:, :-1] += window[:, 1:]
+    band = counts[top:bottom]
+    np.add(across[:-2], across[1:-1], out=band)
+    band += across[2:]
+    band -= window[1:-1]
+
+def _count_band_lists(grid, counts, rows, cols, top, bottom):
+    def across(row):
+        if not 0 <= row < rows:
+            return [0] * cols
+        flags = [0] + [1 if cell else 0 for cell in grid[row * cols:(row + 1) * cols]] + [0]
+        return [flags[c] + flags[c + 1] + flags[c + 2] for c in range(cols)]
+
+    above, middle = across(top - 1), across(top)
+    for row in range(top, bottom):
+        below = across(row + 1)
+        start = row * cols
+        own = grid[start:start + cols]
+        counts[start:start + cols] = bytes(
+            above[c] + middle[c] + below[c] - (1 if own[c] else 0) for c in range(cols))
+        above, middle = middle, below
+
+def count_neighbours(grid, workers=None, band_rows=None, out=None):
+    """
+    Counts the non-zero neighbours of every cell using a pool of processes.
+
+    Parameters:
+    - grid (SharedGrid, NumPy array or list of lists): The grid. Any
+           non-zero value counts as occupied. Anything but a SharedGrid is
+           first copied into shared memory.
+    - workers (int or None): The number of processes (default is one per CPU).
+    - band_rows (int or None): Rows per task (default splits the grid into
+                               about four bands per worker).
+    - out (SharedGrid or None): Where to write the counts. Pass one to keep
+                                huge results in shared memory.
+
+    Returns:
+    - SharedGrid, NumPy array or list of list of int: out when it is given,
+      otherwise a NumPy array of counts (or lists without NumPy).
+    """
+    if isinstance(grid, SharedGrid):
+        return _count_shared(grid, workers, band_rows, out)
+    rows = len(grid)
+    cols = len(grid[0]) if rows else 0
+    with SharedGrid(rows, cols) as shared:
+        if shared.array is not None:
+            np = load_numpy()
+            np.not_equal(grid, 0, out=shared.array, casting="unsafe")
+        else:
+            for row, cells in enumerate(grid):
+                shared.buffer[row * cols:(row + 1) * cols] = bytes(1 if cell else 0 for cell in cells)
+        return _count_shared(shared, workers, band_rows, out)
+
+def _count_shared(grid, workers, band_rows, out):
+    rows, cols = grid.rows, grid.cols
+    workers = workers or os.cpu_count() or 1
+    if band_rows is None:
+        band_rows = -(-rows // (workers * 4)) or 1
+        band_rows = max(1, min(band_rows, BAND_CELLS // max(cols, 1)))
+
+    counts = out if out is not None else SharedGrid(rows, cols)
+    try:
+        bands = [(top, min(top + band_rows, rows)) for top in range(0, rows, band_rows)]
+        if workers == 1:
+            # Count in this process rather than starting a pool of one
+            global _shared
+            previous, _shared = _shared, (grid, counts)
+            try:
+                for top, bottom in bands:
+                    _count_band(top, bottom)
+            finally:
+                _shared = previous
+        elif bands:
+            with ProcessPoolExecutor(workers, initializer=_attach,
+                                     initargs=(grid.name, counts.name, rows, cols)) as pool:
+                list(pool.map(_count_band, *zip(*bands)))
+        if out is not None:
+            return out
+        if counts.array is not None:
+            return counts.array.copy()
+        return [list(counts.buffer[row * cols:(row + 1) * cols]) for row in range(rows)]
+    finally:
+        if out is None:
+            counts.close()
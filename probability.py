@@ -0,0 +1,312 @@
+# Exact chances of each hidden cell being a mine.
+#
+# The FrontierSolver's rules ("exactly n of these cells are mines") only
+# settle some cells. For the rest, the chance of a mine is the share of all
+# possible mine layouts, consistent with every rule and the total number
+# of mines, that put a mine there. Counting layouts cell by cell blows up
+# quickly, so:
+# - The frontier is split into components: rules that share no cells
+#   cannot affect each other, so each component is counted on its own.
+# - Cells that belong to exactly the same rules are interchangeable, so
+#   they are grouped, and a group of s cells holding m mines counts as
+#   comb(s, m) layouts at once.
+# - Each component's counts are kept, keyed by its rules. A move only
+#   changes the rules near it, so only those components get new keys and
+#   are counted again; the rest come straight from the cache.
+# - The components are then combined with the hidden cells away from the
+#   frontier, which share the remaining mines evenly, weighting every
+#   split of the mines by binomial coefficients. Python's integers are
+#   exact however big these get.
+
+from math import comb
+
+from engine import random_policy
+from solver import FrontierSolver
+
+def _components(rules, watchers):
+    # Groups the rules into sets that share cells
+    seen = set()
+    components = []
+    for start in rules:
+        if start in seen:
+            continue
+        seen.add(start)
+        component, pending = [], [start]
+        while pending:
+            owner = pending.pop()
+            component.append(owner)
+            for cell in rules[owner][0]:
+                for other in watchers.get(cell, ()):
+                    if other not in seen and other in rules:
+                        seen.add(other)
+                        pending.append(other)
+        components.append(component)
+    return components
+
+def count_layouts(rules):
+    """
+    Counts the mine layouts that satisfy every rule in one component.
+
+    Parameters:
+    - rules (list of tuple): (cells, mines) pairs, where cells is a set of
+                             (row, col) and mines is how many of them are mines.
+
+    Returns:
+    - tuple: (groups, ways, mines) where groups is a list of lists of cells
+             that share the same rules, ways maps a total number of mines k
+             to the number of layouts with k mines, and mines maps k to a
+             list with the total mines in each group over those layouts.
+    """
+    # Cells in exactly the same rules are interchangeable
+    owners = {}
+    for number, (cells, _) in enumerate(rules):
+        for cell in cells:
+            owners.setdefault(cell, []).append(number)
+    grouped = {}
+    for cell, numbers in owners.items():
+        grouped.setdefault(tuple(numbers), []).append(cell)
+    # Order the groups so each rule's groups come close together, letting
+    # rules be checked (and dead ends dropped) as early as possible
+    keys = sorted(grouped, key=lambda numbers: (numbers[0], -len(numbers)))
+    groups = [sorted(grouped[key]) for key in keys]
+    sizes = [len(group) for group in groups]
+    group_rules = [list(key) for key in keys]
+
+    need = [mines for _, mines in rules]
+    placed = [0] * len(rules)
+    room = [len(cells) for cells, _ in rules]  # Unassigned cells in each rule
+    chosen = [0] * len(groups)
+    ways, mines = {}, {}
+
+    def place(position, weight, total):
+        if position == len(groups):
+            ways[total] = ways.get(total, 0) + weight
+            per_group = mines.get(total)
+            if per_group is None:
+                per_group = mines[total] = [0] * len(groups)
+            for number, count in enumerate(chosen):
+                if count:
+                    per_group[number] += weight * count
+            return
+        size, numbers = sizes[position], group_rules[position]
+        low, high = 0, size
+        for number in numbers:
+            left = need[number] - placed[number]
+            high = min(high, left)
+            low = max(low, left - (room[number] - size))
+        if low > high:
+            return
+        for number in numbers:
+            room[number] -= size
+        for count in range(low, high + 1):
+            for number in numbers:
+                placed[number] += count
+            chosen[position] = count
+            place(position + 1, weight * comb(size, count), total + count)
+            for number in numbers:
+                placed[number] -= count
+        chosen[position] = 0
+        for number in numbers:
+            room[number] += size
+
+    place(0, 1, 0)
+    return groups, ways, mines
+
+def _convolve(first, second):
+    # Multiplies two "number of mines -> ways" polynomials
+    result = {}
+    for k1, w1 in first.items():
+        for k2, w2 in second.items():
+            result[k1 + k2] = result.get(k1 + k2, 0) + w1 * w2
+    return result
+
+class ProbabilityEngine:
+    """
+    Works out the chance that each hidden cell is a mine.
+
+    Feed it every move's revealed cells with update, then ask for
+    probabilities. Like the FrontierSolver it sits on, it only looks at
+    revealed cells.
+
+    Parameters:
+    - board (CompactBoard): The board being played.
+    - solver (FrontierSolver or None): An existing solver for the board to
+                                       share (default makes a new one).
+    """
+
+    def __init__(self, board, solver=None):
+        self.board = board
+        self.solver = solver if solver is not None else FrontierSolver(board)
+        self._cache = {}    # Component key -> count_layouts result
+        self._result = None
+
+    def update(self, changed):
+        """
+        Takes in newly revealed cells. See FrontierSolver.update.
+
+        Parameters:
+        - changed (iterable of tuple of int): The cells the latest move revealed.
+
+        Returns:
+        - tuple of set: (safe, mines) newly proven by the solver.
+        """
+        self._result = None
+        return self.solver.update(changed)
+
+    def probabilities(self):
+        """
+        Works out the chance of a mine for the frontier cells.
+
+        Returns:
+        - tuple: (chances, outside) where chances maps (row, col) to a
+                 float for every frontier cell and every hidden cell the
+                 solver has settled, and outside is the chance for each
+                 other hidden cell (None if there are none).
+
+        Raises:
+        - ValueError: If no layout of the mines fits what has been revealed.
+        """
+        if self._result is None:
+            self._result = self._work_out()
+        return self._result
+
+    def _work_out(self):
+        board, solver = self.board, self.solver
+        rules = {owner: rule for owner, rule in solver.rules.items() if rule[0]}
+
+        # Count each component, reusing the counts of unchanged ones
+        cache, results = {}, []
+        for component in _components(rules, solver.watchers):
+            component_rules = [(frozenset(rules[owner][0]), rules[owner][1])
+                               for owner in component]
+            key = frozenset(component_rules)
+            result = self._cache.get(key)
+            if result is None:
+                result = count_layouts(component_rules)
+            cache[key] = result
+            results.append(result)
+        self._cache = cache  # Components that no longer exist are dropped
+
+        # The hidden cells nobody knows anything about share what is left
+        known_mines = [cell for cell in solver.mines if not board.is_revealed(*cell)]
+        hidden = board.hidden_safe + board.mine_count - board.mines_revealed
+        frontier = sum(len(group) for groups, _, _ in results for group in groups)
+        outside = hidden - len(known_mines) - len(solver.safe) - frontier
+        mines_left = board.mine_count - board.mines_revealed - len(known_mines)
+
+        def outside_ways(k):
+            # Layouts of the other cells when the frontier holds k mines
+            rest = mines_left - k
+            return comb(outside, rest) if 0 <= rest <= outside else 0
+
+        # Running products from each end, so every component can be
+        # combined with all the others without redoing the whole product
+        prefix = [{0: 1}]
+        for _, ways, _ in results:
+            prefix.append(_convolve(prefix[-1], ways))
+        suffix = [{0: 1}]
+        for _, ways, _ in reversed(results):
+            suffix.append(_convolve(suffix[-1], ways))
+        suffix.reverse()
+
+        total = sum(count * outside_ways(k) for k, count in prefix[-1].items())
+        if total == 0:
+            raise ValueError("No layout of the mines fits the revealed cells.")
+
+        chances = dict.fromkeys(solver.safe, 0.0)
+        chances.update(dict.fromkeys(known_mines, 1.0))
+        for number, (groups, ways, mines) in enumerate(results):
+            others = _convolve(prefix[number], suffix[number + 1])
+            for k in ways:
+                weight = sum(count * outside_ways(k + j) for j, count in others.items())
+                if not weight:
+                    continue
+                for group, group_mines in zip(groups, mines[k]):
+                    share = group_mines * weight
+                    for cell in group:
+                        chances[cell] = chances.get(cell, 0) + share
+            for group in groups:
+                for cell in group:
+                    chances[cell] = chances.get(cell, 0) / (total * len(group))
+
+        outside_chance = None
+        if outside:
+            expected = sum(count * outside_ways(k) * (mines_left - k)
+                           for k, count in prefix[-1].items())
+            outside_chance = expected / (total * outside)
+        return chances, outside_chance
+
+    def probability(self, row, col):
+        """
+        Gets the chance of a mine in one hidden cell.
+
+        Parameters:
+        - row (int): The row index of the cell.
+        - col (int): The column index of the cell.
+
+        Returns:
+        - float or None: The chance, or None if the cell is revealed.
+        """
+        if self.board.is_revealed(row, col):
+            return None
+        chances, outside = self.probabilities()
+        return chances.get((row, col), outside)
+
+    def heatmap(self):
+        """
+        Gets the chance of a mine for every cell of the board.
+
+        Returns:
+        - list of list of float or None: One row per board row, with None
+                                         for revealed cells.
+        """
+        board = self.board
+        chances, outside = self.probabilities()
+        return [[None if board.is_revealed(row, col) else chances.get((row, col), outside)
+                 for col in range(board.cols)]
+                for row in range(board.rows)]
+
+    def safest(self):
+        """
+        Finds the hidden cell least likely to be a mine.
+
+        Frontier cells win ties with the cells away from it, since
+        revealing them tells more about their neighbours.
+
+        Returns:
+        - tuple or None: ((row, col), chance), or None if nothing is hidden.
+        """
+        board = self.board
+        chances, outside = self.probabilities()
+        best = min(chances.items(), key=lambda item: item[1], default=None)
+        if outside is not None and (best is None or outside < best[1]):
+            for row in range(board.rows):
+                for col in range(board.cols):
+                    if not board.is_revealed(row, col) and (row, col) not in chances:
+                        return (row, col), outside
+        return best
+
+def probability_policy(seed=None):
+    """
+    Makes a policy that always reveals the hidden cell least likely to be a
+    mine (which is a proven-safe cell whenever there is one).
+
+    Parameters:
+    - seed (int or None): Seed for the first move.
+
+    Returns:
+    - callable: The policy, taking a Game and returning (row, col).
+    """
+    first_move = random_policy(seed)
+    engine = None
+
+    def choose(game):
+        nonlocal engine
+        if game.moves == 0:
+            return first_move(game)
+        if engine is None:
+            engine = ProbabilityEngine(game.board)
+        engine.update(game.last_changed)
+        return engine.safest()[0]
+
+    return choose
@@ -0,0 +1,232 @@
+# A ragged 2D list stored as one flat array plus row offsets.
+#
+# knotes.py walks ragged lists with index loops, and every row there is a
+# separate Python list holding pointers to separate int objects. With
+# millions of rows that overhead is far bigger than the numbers themselves.
+# RaggedArray keeps every value in one typed array and records where each
+# row starts (the "compressed sparse row" layout):
+#
+#     [[1, 2, 3], [4, 5], [6], [7, 8, 9, 10]]
+#     values  = 1 2 3 4 5 6 7 8 9 10
+#     offsets = 0 3 5 6 10
+#
+# Row i is values[offsets[i]:offsets[i + 1]], so a row's length never
+# needs the data at all, and whole-array sums and maxima run over one
+# contiguous buffer.
+
+from array import array
+
+from optional import load_numpy  # NumPy is optional, the reductions fall back to Python
+
+class RaggedArray:
+    """
+    Rows of different lengths stored in a single typed array.
+
+    ragged[i] gives row i as a memoryview into the shared array, so no
+    values are copied. While any of those views are alive the array cannot
+    grow, and append raises BufferError; release the views (or copy them
+    with list()) first.
+
+    Parameters:
+    - values (array.array): Every value, row after row.
+    - offsets (array.array): Where each row starts, plus the end of the last
+                             row, so it has one more entry than there are rows.
+    """
+
+    __slots__ = ("values", "offsets")
+
+    def __init__(self, values=None, offsets=None):
+        self.values = values if values is not None else array("q")
+        self.offsets = offsets if offsets is not None else array("q", [0])
+        if self.offsets[0] != 0 or self.offsets[-1] != len(self.values):
+            raise ValueError("The offsets do not match the values.")
+
+    @classmethod
+    def from_lists(cls, rows, typecode="q"):
+        """
+        Packs a list of lists into a RaggedArray.
+
+        Parameters:
+        - rows (list of list): The ragged list.
+        - typecode (str): The array typecode for the values (default is "q",
+                          64-bit signed ints; use "d" for floats).
+
+        Returns:
+        - RaggedArray: The packed rows.
+        """
+        values = array(typecode)
+        offsets = array("q", [0])
+        for row in rows:
+            values.extend(row)
+            offsets.append(len(values))
+        return cls(values, offsets)
+
+    def to_lists(self):
+        """
+        Unpacks the rows back into a list of lists.
+
+        Returns:
+        - list of list: The ragged list.
+        """
+        values, offsets = self.values, self.offsets
+        return [values[offsets[row]:offsets[row + 1]].tolist() for row in range(len(self))]
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, row):
+        if row < 0:
+            row += len(self)
+        if not 0 <= row < len(self):
+            raise IndexError("Row index out of range.")
+        return memoryview(self.values)[self.offsets[row]:self.offsets[row + 1]]
+
+    def __iter__(self):
+        view = memoryview(self.values)
+        offsets = self.offsets
+        for row in range(len(self)):
+            yield view[offsets[row]:offsets[row + 1]]
+
+    def __eq__(self, other):
+        if isinstance(other, RaggedArray):
+            return self.offsets == other.offsets and self.values == other.values
+        return self.to_lists() == [list(row) for row in other]
+
+    def __repr__(self):
+        return f"RaggedArray({self.to_lists()!r})"
+
+    def append(self, row):
+        """
+        Adds a row to the end.
+
+        Parameters:
+        - row (iterable): The values in the row.
+        """
+        self.values.extend(row)
+        self.offsets.append(len(self.values))
+
+    def row_length(self, row):
+        """
+        Gets the length of one row without touching its values.
+
+        Parameters:
+        - row (int): The row index.
+
+        Returns:
+        - int: The number of values in the row.
+        """
+        if row < 0:
+            row += len(self)
+        return self.offsets[row + 1] - self.offsets[row]
+
+    def row_lengths(self):
+        """
+        Gets the length of every row.
+
+        Returns:
+        - array.array: One length per row.
+        """
+        offsets = self.offsets
+        return array("q", [offsets[row + 1] - offsets[row] for row in range(len(self))])
+
+    @property
+    def nbytes(self):
+        """
+        int: The bytes used by the values and the offsets.
+        """
+        return (len(self.values) * self.values.itemsize
+                + len(self.offsets) * self.offsets.itemsize)
+
+    # Reductions over every row. With NumPy each one is a handful of calls
+    # over the whole flat array; without it, each row is reduced in C by
+    # sum(), min() or max() on a memoryview slice.
+
+    def _numpy_arrays(self):
+        np = load_numpy()
+        return (np.frombuffer(self.values, dtype=self.values.typecode),
+                np.frombuffer(self.offsets, dtype=self.offsets.typecode))
+
+    def row_sums(self, use_numpy=None):
+        """
+        Adds up each row. Empty rows sum to 0.
+
+        Parameters:
+        - use_numpy (bool or None): Force the NumPy path on or off.
+
+        Returns:
+        - list: One sum per row.
+        """
+        if use_numpy is None:
+            use_numpy = load_numpy() is not None
+        if use_numpy:
+            np = load_numpy()
+            values, offsets = self._numpy_arrays()
+            # Each row is added up on its own (a running total over the
+            # whole array would lose float precision and could overflow
+            # between rows), giving reduceat only the rows with values
+            starts = offsets[:-1]
+            filled = offsets[1:] > starts
+            sums = np.zeros(len(self), dtype=values.dtype)
+            if filled.any():
+                sums[filled] = np.add.reduceat(values, starts[filled])
+            return sums.tolist()
+        return [sum(row) for row in self]
+
+    def row_maximums(self, empty=None, use_numpy=None):
+        """
+        Finds the largest value in each row.
+
+        Parameters:
+        - empty: The result for empty rows (default is None).
+        - use_numpy (bool or None): Force the NumPy path on or off.
+
+        Returns:
+        - list: One maximum per row.
+        """
+        return self._extreme(max, "maximum", empty, use_numpy)
+
+    def row_minimums(self, empty=None, use_numpy=None):
+        """
+        Finds the smallest value in each row.
+
+        Parameters:
+        - empty: The result for empty rows (default is None).
+        - use_numpy (bool or None): Force the NumPy path on or off.
+
+        Returns:
+        - list: One minimum per row.
+        """
+        return self._extreme(min, "minimum", empty, use_numpy)
+
+    def _extreme(self, builtin, ufunc, empty, use_numpy):
+        if use_numpy is None:
+            use_numpy = load_numpy() is not None
+        if not use_numpy:
+            return [builtin(row) if len(row) else empty for row in self]
+
+        np = load_numpy()
+        values, offsets = self._numpy_arrays()
+        starts = offsets[:-1]
+        filled = offsets[1:] > starts
+        result = [empty] * len(self)
+        if filled.any():
+            # reduceat goes from each start to the next start, so give it
+            # only the rows that have values
+            found = getattr(np, ufunc).reduceat(values, starts[filled]).tolist()
+            for row, value in zip(np.flatnonzero(filled).tolist(), found):
+                result[row] = value
+        return result
+
+    def row_means(self, use_numpy=None):
+        """
+        Averages each row. Empty rows give None.
+
+        Parameters:
+        - use_numpy (bool or None): Force the NumPy path on or off.
+
+        Returns:
+        - list: One mean per row.
+        """
+        lengths = self.row_lengths()
+        return [total / length if length else None
+                for total, length in zip(self.row_sums(use_numpy), lengths)]
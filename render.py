@@ -0,0 +1,117 @@
+# Terminal drawing for large boards.
+#
+# print_grid prints the whole board every turn, which floods the terminal
+# on big boards. The ViewportRenderer shows only a window of the board
+# around the last move. After the first frame it redraws just the cells
+# that changed, moving the cursor to each one with ANSI escape codes, and
+# sends each frame to the terminal in a single write.
+
+import sys
+
+CLEAR_SCREEN = "\x1b[2J"
+CLEAR_BELOW = "\x1b[J"
+CELL_WIDTH = 4  # Two spaces between cells plus a right-aligned value of 2
+
+def move_cursor(line, column):
+    """
+    Returns the escape code that moves the cursor (both start at 1).
+
+    Parameters:
+    - line (int): The screen line.
+    - column (int): The screen column.
+
+    Returns:
+    - str: The escape code.
+    """
+    return f"\x1b[{line};{column}H"
+
+class ViewportRenderer:
+    """
+    Draws a scrollable window of a board, repainting only changed cells.
+
+    The board needs a visible_cell(row, col) method, as CompactBoard and
+    EndlessBoard have. If it also has rows and cols, the window is kept
+    inside the board.
+
+    Parameters:
+    - board: The board to draw.
+    - height (int): The number of board rows to show (default is 20).
+    - width (int): The number of board columns to show (default is 20).
+    - out (file): Where to write (default is sys.stdout).
+    """
+
+    def __init__(self, board, height=20, width=20, out=None):
+        self.board = board
+        self.height = min(height, getattr(board, "rows", height))
+        self.width = min(width, getattr(board, "cols", width))
+        self.out = out if out is not None else sys.stdout
+        self.top = 0
+        self.left = 0
+        self._dirty = set()
+        self._full_redraw = True
+
+    def center_on(self, row, col):
+        """
+        Moves the window so (row, col) is near its middle.
+
+        Parameters:
+        - row (int): The board row to centre on.
+        - col (int): The board column to centre on.
+        """
+        top = row - self.height // 2
+        left = col - self.width // 2
+        if hasattr(self.board, "rows"):
+            top = max(0, min(top, self.board.rows - self.height))
+            left = max(0, min(left, self.board.cols - self.width))
+        if (top, left) != (self.top, self.left):
+            self.top, self.left = top, left
+            self._full_redraw = True
+
+    def mark_dirty(self, cells):
+        """
+        Records cells that need repainting. Cells outside the window are
+        ignored, as they will be drawn when the window moves to them.
+
+        Parameters:
+        - cells (iterable of tuple of int): The (row, col) of changed cells.
+        """
+        top, left = self.top, self.left
+        bottom, right = top + self.height, left + self.width
+        self._dirty.update((row, col) for row, col in cells
+                           if top <= row < bottom and left <= col < right)
+
+    def _screen_position(self, row, col):
+        # Line 1 holds the column numbers, and each row starts with its
+        # number in 2 characters followed by the cells.
+        return row - self.top + 2, (col - self.left) * CELL_WIDTH + 3
+
+    def render(self, status=()):
+        """
+        Draws the next frame and any status lines below the window.
+
+        Parameters:
+        - status (iterable of str): Lines to show under the board.
+        """
+        parts = []
+        visible_cell = self.board.visible_cell
+        if self._full_redraw:
+            columns = range(self.left, self.left + self.width)
+            parts.append(CLEAR_SCREEN + move_cursor(1, 1))
+            parts.append("  " + "".join(f"{col % 100:>{CELL_WIDTH}}" for col in columns))
+            for row in range(self.top, self.top + self.height):
+                cells = "".join(f"{visible_cell(row, col):>{CELL_WIDTH}}" for col in columns)
+                parts.append(f"\n{row % 100:>2}{cells}")
+            self._full_redraw = False
+        else:
+            for row, col in sorted(self._dirty):
+                line, column = self._screen_position(row, col)
+                parts.append(move_cursor(line, column) + f"{visible_cell(row, col):>{CELL_WIDTH}}")
+        self._dirty.clear()
+
+        # Status lines go underneath, replacing the previous ones
+        parts.append(move_cursor(self.height + 3, 1) + CLEAR_BELOW)
+        parts.append("\n".join(status))
+        if status:
+            parts.append("\n")
+        self.out.write("".join(parts))
+        self.out.flush()
@@ -0,0 +1,203 @@
+# Saving and loading CompactBoards in a compact binary file.
+#
+# File layout (all numbers little-endian):
+# - Header page (4096 bytes): magic b"MSWB", version, rows, cols, seed,
+#   lives and mine count, padded with zeros.
+# - The mine bitset, then the cell bytes, each starting on a page boundary.
+# - Zero or more saves appended later. Each is a run of PAGE records (a
+#   page of cell bytes that changed, found from the cells the caller says
+#   changed, or by comparing with the file) closed by a SAVE record holding the
+#   lives and the board's counters. A save only counts once its SAVE record
+#   is written, so a save cut short by a crash is ignored.
+#
+# Loading memory-maps the file instead of reading it, so even a 10^8 cell
+# board opens at once; only the short list of appended records is read.
+# The mapping is private (copy on write), so playing on a loaded board
+# does not touch the file until the changes are saved.
+
+import mmap
+import os
+import struct
+
+from board import CompactBoard
+
+MAGIC = b"MSWB"
+VERSION = 1
+PAGE_SIZE = 4096
+HEADER = struct.Struct("<4sHHIIqHxxQ")  # magic, version, flags, rows, cols, seed, lives, mines
+PAGE_RECORD = struct.Struct("<4sQI")  # b"PAGE", page number, length
+SAVE_RECORD = struct.Struct("<4sHQQ")  # b"SAVE", lives, hidden_safe, mines_revealed
+HAS_SEED = 1
+
+def _round_up(size):
+    return -(-size // PAGE_SIZE) * PAGE_SIZE
+
+def _layout(rows, cols):
+    # Where the mine bitset and the cells start
+    cells = rows * cols
+    mines_offset = PAGE_SIZE
+    cells_offset = mines_offset + _round_up((cells + 7) // 8)
+    return mines_offset, cells_offset, cells_offset + cells
+
+def save_board(path, board, seed=None, lives=3):
+    """
+    Writes a whole board to a new file, replacing any old one.
+
+    The board is written to a temporary file which then takes the old
+    file's place, so a board loaded from that file (which still reads from
+    it) keeps its cells, and a crash part way leaves the old file whole.
+
+    Parameters:
+    - path (str): Where to save.
+    - board (CompactBoard): The board to save.
+    - seed (int or None): The seed the board was made from, if any.
+    - lives (int): The player's remaining lives (default is 3).
+    """
+    mines_offset, cells_offset, end = _layout(board.rows, board.cols)
+    header = HEADER.pack(MAGIC, VERSION, HAS_SEED if seed is not None else 0,
+                         board.rows, board.cols, seed or 0, lives, board.mine_count)
+    temporary = os.fspath(path) + ".tmp"
+    try:
+        with open(temporary, "wb") as file:
+            file.write(header.ljust(PAGE_SIZE, b"\0"))
+            file.write(board.mines)
+            file.seek(cells_offset)
+            file.write(board.cells)
+            file.write(SAVE_RECORD.pack(b"SAVE", lives, board.hidden_safe, board.mines_revealed))
+        os.replace(temporary, path)
+    except BaseException:
+        if os.path.exists(temporary):
+            os.remove(temporary)
+        raise
+
+def _read_saves(data, start):
+    # Walks the appended records, returning the latest copy of each changed
+    # page and the last SAVE record. Records after the last SAVE are ignored.
+    pages, pending, last_save = {}, {}, None
+    position = start
+    while position + 4 <= len(data):
+        kind = data[position:position + 4]
+        if kind == b"PAGE" and position + PAGE_RECORD.size <= len(data):
+            _, page, length = PAGE_RECORD.unpack_from(data, position)
+            position += PAGE_RECORD.size
+            pending[page] = (position, length)
+            position += length
+        elif kind == b"SAVE" and position + SAVE_RECORD.size <= len(data):
+            last_save = SAVE_RECORD.unpack_from(data, position)[1:]
+            position += SAVE_RECORD.size
+            pages.update(pending)
+            pending = {}
+        else:
+            break
+    return pages, last_save
+
+def _read_header(data):
+    if len(data) < PAGE_SIZE or data[:4] != MAGIC:
+        raise ValueError("Not a Minesweeper board file.")
+    _, version, flags, rows, cols, seed, _, mine_count = HEADER.unpack_from(data, 0)
+    if version != VERSION:
+        raise ValueError(f"Unsupported board file version {version}.")
+    return rows, cols, (seed if flags & HAS_SEED else None), mine_count
+
+def load_board(path):
+    """
+    Opens a saved board by memory-mapping the file.
+
+    Parameters:
+    - path (str): The file to open.
+
+    Returns:
+    - tuple: (board, seed, lives) with the CompactBoard, its seed (or None)
+             and the player's remaining lives.
+
+    Raises:
+    - ValueError: If the file is not a board file or has no complete save.
+    """
+    with open(path, "rb") as file:
+        data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_COPY)
+    rows, cols, seed, mine_count = _read_header(data)
+    mines_offset, cells_offset, end = _layout(rows, cols)
+    pages, last_save = _read_saves(data, end)
+    if last_save is None:
+        raise ValueError("The board file has no complete save.")
+
+    view = memoryview(data)
+    cells = view[cells_offset:end]
+    # Lay the saved pages over the original cells (only in memory)
+    for page, (position, length) in pages.items():
+        cells[page * PAGE_SIZE:page * PAGE_SIZE + length] = view[position:position + length]
+
+    board = CompactBoard.__new__(CompactBoard)
+    board.rows = rows
+    board.cols = cols
+    board.mines = view[mines_offset:mines_offset + (rows * cols + 7) // 8].toreadonly()
+    board.cells = cells
+    board.mine_count = mine_count
+    board._mine_index = None  # Built from the bitset when first needed
+    lives, board.hidden_safe, board.mines_revealed = last_save
+    return board, seed, lives
+
+def save_changes(path, board, lives=3, changed=None):
+    """
+    Appends the pages of cells that changed since the file was last saved.
+
+    The board must have the same size as the one in the file. Pass the
+    cells changed since the last save (the lists Game.move returns, plus
+    any cells flagged or unflagged) so only their pages are written, without
+    reading the rest of the board. Without them every page is compared with
+    the file, which reads the whole board.
+
+    Parameters:
+    - path (str): The file saved earlier with save_board.
+    - board (CompactBoard): The board to save.
+    - lives (int): The player's remaining lives (default is 3).
+    - changed (iterable of tuple of int or None): The (row, col) of every
+                                                   cell changed since the
+                                                   last save.
+
+    Returns:
+    - int: The number of pages written.
+    """
+    with open(path, "r+b") as file:
+        if changed is not None:
+            rows, cols, _, _ = _read_header(file.read(PAGE_SIZE))
+            if (rows, cols) != (board.rows, board.cols):
+                raise ValueError("The board does not match the saved board's size.")
+            current = memoryview(board.cells)
+            records = []
+            for page in sorted({(row * cols + col) // PAGE_SIZE for row, col in changed}):
+                start = page * PAGE_SIZE
+                new = current[start:start + PAGE_SIZE]
+                records.append(PAGE_RECORD.pack(b"PAGE", page, len(new)) + bytes(new))
+            file_size = file.seek(0, 2)
+        else:
+            records, file_size = _changed_pages(file, board)
+
+        file.seek(file_size)
+        file.writelines(records)
+        file.write(SAVE_RECORD.pack(b"SAVE", lives, board.hidden_safe, board.mines_revealed))
+    return len(records)
+
+def _changed_pages(file, board):
+    # Finds the changed pages by comparing every page with the newest copy
+    # in the file; returns (PAGE records, file size)
+    with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data, \
+            memoryview(data) as saved:
+        rows, cols, _, _ = _read_header(data)
+        if (rows, cols) != (board.rows, board.cols):
+            raise ValueError("The board does not match the saved board's size.")
+        _, cells_offset, end = _layout(rows, cols)
+        pages, _ = _read_saves(data, end)
+
+        current = memoryview(board.cells)
+        records = []
+        for page in range(_round_up(len(current)) // PAGE_SIZE):
+            start = page * PAGE_SIZE
+            new = current[start:start + PAGE_SIZE]
+            if page in pages:
+                position, length = pages[page]
+            else:
+                position, length = cells_offset + start, len(new)
+            if new != saved[position:position + length]:
+                records.append(PAGE_RECORD.pack(b"PAGE", page, len(new)) + bytes(new))
+        return records, len(data)
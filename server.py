@@ -0,0 +1,253 @@
+# Hosts many Minesweeper games from one process with asyncio.
+# Run with: python server.py --port 8765   (or --unix /tmp/minesweeper.sock)
+#
+# Clients send one JSON object per line and get one JSON object back per
+# line, in the same order. Any request may carry an "id", which is copied
+# into the reply. Requests:
+#   {"cmd": "new", "rows": 9, "cols": 9, "mines": 10, "seed": 1, "lives": 3}
+#       -> {"session": "..."}
+#   {"cmd": "move", "session": "...", "row": 0, "col": 0}
+#       -> {"hit_mine": false, "changed": [[0, 0], ...], "lives": 3,
+#           "won": false, "lost": false}
+#       A move that reveals more than max_changed cells sends
+#       "changed": null and "changed_count" instead; ask for a view to see them.
+#   {"cmd": "view", "session": "..."}  -> {"rows": ["--12-", ...]}
+#   {"cmd": "close", "session": "..."} -> {"closed": true}
+# Errors come back as {"error": "..."}. Sessions that are not used for
+# idle_timeout seconds are removed.
+#
+# Moves and views on big boards run in a worker thread, so one large flood
+# fill does not hold up every other client. Each session has a lock, so its
+# requests still run one at a time.
+
+import argparse
+import asyncio
+import json
+import secrets
+import time
+
+from engine import Game
+
+# Boards with more cells than this are played in a worker thread
+THREAD_CELLS = 10_000
+
+class Session:
+    """
+    One game being played on the server.
+
+    Parameters:
+    - game (Game): The game.
+    """
+
+    __slots__ = ("game", "last_used", "lock")
+
+    def __init__(self, game):
+        self.game = game
+        self.last_used = time.monotonic()
+        self.lock = asyncio.Lock()
+
+class GameServer:
+    """
+    Keeps the sessions and answers requests for them.
+
+    Parameters:
+    - idle_timeout (float): Seconds a session may sit unused before it is
+                            removed (default is 300).
+    - max_sessions (int): The most sessions to keep at once (default is 100,000).
+    - max_cells (int): The largest board a client may ask for
+                       (default is 250,000 cells).
+    - max_changed (int): The most revealed cells listed in a move's reply
+                         (default is 10,000).
+    """
+
+    def __init__(self, idle_timeout=300, max_sessions=100_000, max_cells=250_000,
+                 max_changed=10_000):
+        self.idle_timeout = idle_timeout
+        self.max_sessions = max_sessions
+        self.max_cells = max_cells
+        self.max_changed = max_changed
+        self.sessions = {}
+
+    def _session(self, request):
+        # Looks up the request's session, or returns an error reply
+        session_id = request.get("session")
+        if not isinstance(session_id, str):
+            return None, {"error": "session must be a string"}
+        session = self.sessions.get(session_id)
+        if session is None:
+            return None, {"error": "unknown session"}
+        return session, None
+
+    async def answer(self, request):
+        """
+        Answers one request, playing big boards in a worker thread.
+
+        Parameters:
+        - request (dict): The decoded request.
+
+        Returns:
+        - dict: The reply.
+        """
+        if request.get("cmd") == "new":
+            return self.handle_request(request)
+        session, error = self._session(request)
+        if error:
+            return error
+        async with session.lock:
+            board = session.game.board
+            if board.rows * board.cols <= THREAD_CELLS:
+                return self.handle_request(request)
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(None, self.handle_request, request)
+
+    def handle_request(self, request):
+        """
+        Answers one request straight away, however big the board.
+
+        Parameters:
+        - request (dict): The decoded request.
+
+        Returns:
+        - dict: The reply.
+        """
+        command = request.get("cmd")
+        if command == "new":
+            return self._new_session(request)
+        session, error = self._session(request)
+        if error:
+            return error
+        session.last_used = time.monotonic()
+        game = session.game
+
+        if command == "move":
+            try:
+                hit_mine, changed = game.move(int(request["row"]), int(request["col"]))
+            except (KeyError, TypeError, ValueError, OverflowError) as error:
+                return {"error": str(error)}
+            reply = {"hit_mine": hit_mine, "changed": changed, "lives": game.lives,
+                     "won": game.won, "lost": game.lost}
+            if len(changed) > self.max_changed:
+                reply["changed"] = None
+                reply["changed_count"] = len(changed)
+            return reply
+        if command == "view":
+            board = game.board
+            return {"rows": ["".join(board.visible_row(row)) for row in range(board.rows)]}
+        if command == "close":
+            self.sessions.pop(request["session"], None)
+            return {"closed": True}
+        return {"error": f"unknown command {command!r}"}
+
+    def _new_session(self, request):
+        try:
+            rows, cols = int(request.get("rows", 9)), int(request.get("cols", 9))
+            mines = int(request.get("mines", 10))
+            lives = int(request.get("lives", 3))
+            seed = request.get("seed")
+        except (TypeError, ValueError, OverflowError) as error:
+            return {"error": str(error)}
+        # Check each value on its own, so nothing slips through as a product
+        if rows < 1 or cols < 1 or rows * cols > self.max_cells:
+            return {"error": "bad board size"}
+        if not 0 <= mines <= rows * cols:
+            return {"error": "bad mine count"}
+        if lives < 1:
+            return {"error": "bad number of lives"}
+        if seed is not None and (type(seed) is not int or seed < 0):
+            return {"error": "seed must be a non-negative integer or null"}
+        if len(self.sessions) >= self.max_sessions:
+            return {"error": "server full"}
+        # Random ids, so one client cannot guess another's session
+        session_id = secrets.token_hex(16)
+        self.sessions[session_id] = Session(Game(rows, cols, mines, seed=seed, lives=lives))
+        return {"session": session_id}
+
+    def evict_idle(self):
+        """
+        Removes sessions that have not been used for idle_timeout seconds.
+
+        Returns:
+        - int: The number of sessions removed.
+        """
+        cutoff = time.monotonic() - self.idle_timeout
+        idle = [key for key, session in self.sessions.items() if session.last_used < cutoff]
+        for key in idle:
+            del self.sessions[key]
+        return len(idle)
+
+    async def evict_loop(self, interval=30):
+        """
+        Calls evict_idle every interval seconds, forever.
+
+        Parameters:
+        - interval (float): Seconds between checks (default is 30).
+        """
+        while True:
+            await asyncio.sleep(interval)
+            self.evict_idle()
+
+    async def handle_client(self, reader, writer):
+        """
+        Serves one connection until the client closes it.
+
+        Parameters:
+        - reader (asyncio.StreamReader): The connection's input.
+        - writer (asyncio.StreamWriter): The connection's output.
+        """
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    request = json.loads(line)
+                    reply = await self.answer(request)
+                    if "id" in request:
+                        reply["id"] = request["id"]
+                except (ValueError, AttributeError, OverflowError):
+                    reply = {"error": "bad request"}
+                writer.write(json.dumps(reply, separators=(",", ":")).encode() + b"\n")
+                # Only wait for the client to catch up when it falls behind
+                if writer.transport.get_write_buffer_size() > 1 << 16:
+                    await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+async def serve(host="127.0.0.1", port=8765, unix_path=None, idle_timeout=300):
+    """
+    Runs the server until it is stopped.
+
+    Parameters:
+    - host (str): The address to listen on (default is 127.0.0.1).
+    - port (int): The TCP port (default is 8765).
+    - unix_path (str or None): Listen on this Unix socket instead of TCP.
+    - idle_timeout (float): Seconds before an unused session is removed.
+    """
+    game_server = GameServer(idle_timeout=idle_timeout)
+    if unix_path:
+        server = await asyncio.start_unix_server(game_server.handle_client, unix_path)
+    else:
+        server = await asyncio.start_server(game_server.handle_client, host, port)
+    evictor = asyncio.create_task(game_server.evict_loop(min(idle_timeout, 30)))
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        evictor.cancel()
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve Minesweeper games.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--unix", help="listen on this Unix socket path instead")
+    parser.add_argument("--idle-timeout", type=float, default=300)
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args.host, args.port, args.unix, args.idle_timeout))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,208 @@
+# Plays many seeded Minesweeper games at once to measure policies.
+# Run with: python simulate.py --games 10000 --rows 9 --cols 9 --mines 10
+
+import argparse
+import json
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from engine import Game, random_policy
+from probability import probability_policy
+from solver import solver_policy
+
+POLICIES = {"random": random_policy, "solver": solver_policy,
+            "probability": probability_policy}
+
+# Small batches are cut into at least this many chunks per worker, so every
+# process gets a share and a slow chunk at the end does not hold up the rest
+CHUNKS_PER_WORKER = 4
+
+def play_one(rows, cols, mine_count, seed, policy_factory=random_policy, lives=3):
+    """
+    Plays a single game with a new policy.
+
+    Parameters:
+    - rows (int): The number of rows in the grid.
+    - cols (int): The number of columns in the grid.
+    - mine_count (int): How many mines to place.
+    - seed (int): Seed for both the board and the policy.
+    - policy_factory (callable): Takes a seed and returns a policy.
+    - lives (int): How many mines the player may hit (default is 3).
+
+    Returns:
+    - dict: The seed, whether it was won, the moves, the lives used and
+            the time taken in seconds.
+    """
+    start = time.perf_counter()
+    game = Game(rows, cols, mine_count, seed=seed, lives=lives)
+    game.play(policy_factory(seed))
+    return {
+        "seed": seed,
+        "won": game.won,
+        "moves": game.moves,
+        "lives_used": game.lives_used,
+        "seconds": time.perf_counter() - start,
+    }
+
+def play_chunk(rows, cols, mine_count, seeds, policy_factory=random_policy, lives=3):
+    """
+    Plays a run of games and adds up their results. Runs in a worker process.
+
+    Parameters:
+    - rows (int): The number of rows in the grid.
+    - cols (int): The number of columns in the grid.
+    - mine_count (int): How many mines to place.
+    - seeds (range): The seeds of the games to play.
+    - policy_factory (callable): Takes a seed and returns a policy.
+    - lives (int): How many mines the player may hit (default is 3).
+
+    Returns:
+    - dict: Totals for the games in the chunk.
+    """
+    totals = new_totals()
+    for seed in seeds:
+        add_result(totals, play_one(rows, cols, mine_count, seed, policy_factory, lives))
+    return totals
+
+def new_totals():
+    """
+    Returns empty running totals for a batch of games.
+
+    Returns:
+    - dict: Zeroed totals.
+    """
+    return {"games": 0, "wins": 0, "moves": 0, "lives_used": 0,
+            "seconds": 0.0, "max_seconds": 0.0}
+
+def add_result(totals, result):
+    """
+    Adds one game's result to the running totals.
+
+    Parameters:
+    - totals (dict): The totals to update.
+    - result (dict): A result from play_one.
+    """
+    totals["games"] += 1
+    totals["wins"] += result["won"]
+    totals["moves"] += result["moves"]
+    totals["lives_used"] += result["lives_used"]
+    totals["seconds"] += result["seconds"]
+    totals["max_seconds"] = max(totals["max_seconds"], result["seconds"])
+
+def merge_totals(totals, other):
+    """
+    Adds the totals from one chunk into another.
+
+    Parameters:
+    - totals (dict): The totals to update.
+    - other (dict): The totals to add.
+    """
+    for key in ("games", "wins", "moves", "lives_used", "seconds"):
+        totals[key] += other[key]
+    totals["max_seconds"] = max(totals["max_seconds"], other["max_seconds"])
+
+def summarise(totals, wall_seconds):
+    """
+    Turns running totals into averages.
+
+    Parameters:
+    - totals (dict): The totals for the whole batch.
+    - wall_seconds (float): How long the whole batch took.
+
+    Returns:
+    - dict: The win rate, average moves, lives used and time per game.
+    """
+    games = max(totals["games"], 1)
+    return {
+        "games": totals["games"],
+        "win_rate": totals["wins"] / games,
+        "mean_moves": totals["moves"] / games,
+        "mean_lives_used": totals["lives_used"] / games,
+        "mean_seconds_per_game": totals["seconds"] / games,
+        "max_seconds_per_game": totals["max_seconds"],
+        "wall_seconds": wall_seconds,
+    }
+
+def split_seeds(games, seed, workers, chunk_size):
+    """
+    Cuts the seeds of a batch into the chunks handed to the workers.
+
+    Parameters:
+    - games (int): How many games to play.
+    - seed (int): The seed of the first game.
+    - workers (int): The number of processes.
+    - chunk_size (int): The most games in one chunk.
+
+    Returns:
+    - generator of range: The seeds of each chunk, in order.
+    """
+    size = max(1, min(chunk_size, -(-games // (workers * CHUNKS_PER_WORKER))))
+    return (range(first, min(first + size, seed + games))
+            for first in range(seed, seed + games, size))
+
+def run_batch(games, rows, cols, mine_count, seed=0, policy_factory=random_policy,
+              lives=3, workers=None, chunk_size=500):
+    """
+    Plays games with seeds seed, seed + 1, ... across several processes.
+
+    Work is handed out in chunks, with only a few chunks waiting per
+    worker, so a million games do not queue a million tasks up front.
+    The policy factory must be a module-level function so it can be sent
+    to the workers.
+
+    Parameters:
+    - games (int): How many games to play.
+    - rows (int): The number of rows in the grid.
+    - cols (int): The number of columns in the grid.
+    - mine_count (int): How many mines to place.
+    - seed (int): The seed of the first game (default is 0).
+    - policy_factory (callable): Takes a seed and returns a policy.
+    - lives (int): How many mines the player may hit (default is 3).
+    - workers (int or None): The number of processes (default is one per core).
+    - chunk_size (int): The most games one task plays (default is 500). Smaller
+                        batches use smaller tasks so every worker gets some.
+
+    Returns:
+    - dict: The summary from summarise.
+    """
+    start = time.perf_counter()
+    workers = workers or os.cpu_count() or 1
+    totals = new_totals()
+    chunks = split_seeds(games, seed, workers, chunk_size)
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = set()
+        for seeds in chunks:
+            pending.add(executor.submit(play_chunk, rows, cols, mine_count, seeds,
+                                        policy_factory, lives))
+            if len(pending) >= workers * 2:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    merge_totals(totals, future.result())
+        for future in pending:
+            merge_totals(totals, future.result())
+
+    return summarise(totals, time.perf_counter() - start)
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulate many Minesweeper games.")
+    parser.add_argument("--games", type=int, default=1000)
+    parser.add_argument("--rows", type=int, default=9)
+    parser.add_argument("--cols", type=int, default=9)
+    parser.add_argument("--mines", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--lives", type=int, default=3)
+    parser.add_argument("--policy", choices=sorted(POLICIES), default="random")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--chunk-size", type=int, default=500)
+    args = parser.parse_args()
+
+    summary = run_batch(args.games, args.rows, args.cols, args.mines, seed=args.seed,
+                        policy_factory=POLICIES[args.policy],
+                        lives=args.lives, workers=args.workers,
+                        chunk_size=args.chunk_size)
+    print(json.dumps(summary, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+# Works out which hidden cells are certainly safe or certainly mines.
+#
+# Every revealed number gives a rule: "exactly n of these hidden cells are
+# mines". The solver keeps these rules for the frontier (hidden cells next
+# to revealed numbers) and only looks again at the rules touched by the
+# latest move, so each move costs about as much as the part of the
+# frontier it changed. Two deductions are used:
+# - Single rule: if n is 0 all its cells are safe, and if n equals the
+#   number of cells they are all mines.
+# - Subset: if one rule's cells are all inside another's, the extra cells
+#   hold the difference in mines, which can settle them the same way.
+
+from engine import random_policy
+
+class FrontierSolver:
+    """
+    Keeps the frontier rules for a board up to date as cells are revealed.
+
+    Only revealed cells are looked at, so the solver never peeks at hidden
+    mines.
+
+    Parameters:
+    - board (CompactBoard): The board being played.
+    """
+
+    def __init__(self, board):
+        self.board = board
+        self.rules = {}     # Numbered cell -> [set of unsettled cells, mines left]
+        self.watchers = {}  # Hidden cell -> numbered cells whose rule holds it
+        self.safe = set()   # Hidden cells proven safe
+        self.mines = set()  # Cells proven (or revealed) to be mines
+        self._found_safe = set()
+        self._found_mines = set()
+
+    def _neighbours(self, row, col):
+        board = self.board
+        return [(r, c)
+                for r in range(max(row - 1, 0), min(row + 2, board.rows))
+                for c in range(max(col - 1, 0), min(col + 2, board.cols))
+                if r != row or c != col]
+
+    def _settle(self, cell, is_mine, touched):
+        # Takes a cell out of every rule that holds it
+        for owner in self.watchers.pop(cell, ()):
+            rule = self.rules[owner]
+            rule[0].discard(cell)
+            if is_mine:
+                rule[1] -= 1
+            touched.add(owner)
+        if is_mine:
+            if cell not in self.mines:
+                self.mines.add(cell)
+                self._found_mines.add(cell)
+        elif not self.board.is_revealed(*cell):
+            self.safe.add(cell)
+            self._found_safe.add(cell)
+
+    def _add_rule(self, cell):
+        board = self.board
+        cells = set()
+        mines_left = board.count_adjacent_mines(*cell)
+        for neighbour in self._neighbours(*cell):
+            if neighbour in self.mines or (board.is_revealed(*neighbour)
+                                           and board.is_mine(*neighbour)):
+                mines_left -= 1
+            elif not board.is_revealed(*neighbour) and neighbour not in self.safe:
+                cells.add(neighbour)
+        if cells:
+            self.rules[cell] = [cells, mines_left]
+            for neighbour in cells:
+                self.watchers.setdefault(neighbour, set()).add(cell)
+
+    def update(self, changed):
+        """
+        Takes in newly revealed cells and works out what follows from them.
+
+        Parameters:
+        - changed (iterable of tuple of int): The (row, col) of cells the
+                                              latest move revealed.
+
+        Returns:
+        - tuple of set: (safe, mines), the cells newly proven safe and
+                        newly proven to be mines.
+        """
+        board = self.board
+        touched = set()
+        self._found_safe, self._found_mines = set(), set()
+
+        for cell in changed:
+            self.safe.discard(cell)
+            if board.is_mine(*cell):
+                self._settle(cell, True, touched)
+            else:
+                self._settle(cell, False, touched)
+                self._add_rule(cell)
+                touched.add(cell)
+
+        while touched:
+            owner = touched.pop()
+            rule = self.rules.get(owner)
+            if rule is None:
+                continue
+            cells, mines_left = rule
+            if not cells:
+                del self.rules[owner]
+            elif mines_left == 0 or mines_left == len(cells):
+                for cell in list(cells):
+                    self._settle(cell, mines_left > 0, touched)
+            else:
+                self._apply_subsets(owner, cells, mines_left, touched)
+
+        return self._found_safe & self.safe, self._found_mines
+
+    def _apply_subsets(self, owner, cells, mines_left, touched):
+        # Compares a rule with the other rules that share its cells
+        others = set()
+        for cell in cells:
+            others.update(self.watchers.get(cell, ()))
+        others.discard(owner)
+        for other in others:
+            other_rule = self.rules.get(other)
+            if other_rule is None or owner not in self.rules:
+                continue
+            other_cells, other_left = other_rule
+            if cells < other_cells:
+                extra, extra_mines = other_cells - cells, other_left - mines_left
+            elif other_cells < cells:
+                extra, extra_mines = cells - other_cells, mines_left - other_left
+            else:
+                continue
+            if extra_mines == 0 or extra_mines == len(extra):
+                for cell in extra:
+                    self._settle(cell, extra_mines > 0, touched)
+                # The rules changed, so look at both again from the start
+                touched.update((owner, other))
+                return
+
+def solver_policy(seed=None):
+    """
+    Makes a policy that reveals proven-safe cells and guesses otherwise.
+
+    Parameters:
+    - seed (int or None): Seed for the guesses.
+
+    Returns:
+    - callable: The policy, taking a Game and returning (row, col).
+    """
+    guess = random_policy(seed)
+    solver = None
+
+    def choose(game):
+        nonlocal solver
+        if game.moves == 0:
+            return guess(game)
+        if solver is None:
+            solver = FrontierSolver(game.board)
+        solver.update(game.last_changed)
+        if solver.safe:
+            return next(iter(solver.safe))
+        # Guess, but never on a cell already proven to be a mine
+        for _ in range(100):
+            cell = guess(game)
+            if cell not in solver.mines:
+                break
+        return cell
+
+    return choose
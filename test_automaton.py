@@ -0,0 +1,42 @@
+# Checks the automaton against stepping every cell of a list of lists.
+# Run with: python -m pytest
+
+import random
+
+import pytest
+
+from automaton import Automaton, parse_rule
+
+def naive_step(grid, birth, survival, offsets):
+    rows, cols = len(grid), len(grid[0])
+    return [[1 if sum(grid[r + dr][c + dc] for dr, dc in offsets
+                      if 0 <= r + dr < rows and 0 <= c + dc < cols)
+             in (survival if grid[r][c] else birth) else 0
+             for c in range(cols)]
+            for r in range(rows)]
+
+@pytest.mark.parametrize("rule, options", [
+    ("B3/S23", {}),
+    ("B36/S23", {}),
+    ("B2/S", {"neighbourhood": "von_neumann", "radius": 2}),
+    ("B0/S8", {}),
+    ("B0123/S", {}),
+    ("B0/S", {}),
+])
+def test_matches_naive_stepping(rule, options):
+    rng = random.Random(9)
+    birth, survival = parse_rule(rule)
+    for _ in range(100):
+        rows, cols = rng.randrange(1, 10), rng.randrange(1, 10)
+        grid = [[1 if rng.random() < 0.3 else 0 for _ in range(cols)] for _ in range(rows)]
+        automaton = Automaton.from_grid(grid, rule=rule, **options)
+        for _ in range(5):
+            grid = naive_step(grid, birth, survival, automaton.offsets)
+            automaton.step()
+            assert automaton.to_grid() == grid
+            assert automaton.population == sum(map(sum, grid))
+
+def test_bad_rules_are_rejected():
+    for rule in ("B3", "X3/S23", "B3/Sx"):
+        with pytest.raises(ValueError):
+            parse_rule(rule)
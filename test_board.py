@@ -0,0 +1,78 @@
+# Checks CompactBoard against the list of lists grid in minesweeper.py.
+# Run with: python -m pytest
+
+import random
+
+import minesweeper
+from board import CompactBoard
+
+def random_grid(rng, rows, cols, density):
+    return [["#" if rng.random() < density else "-" for _ in range(cols)]
+            for _ in range(rows)]
+
+def test_counts_match_list_grid():
+    rng = random.Random(1)
+    for _ in range(100):
+        grid = random_grid(rng, rng.randrange(1, 12), rng.randrange(1, 12), 0.3)
+        board = CompactBoard.from_grid(grid)
+        counts = minesweeper.build_count_grid(grid)
+        for row in range(len(grid)):
+            for col in range(len(grid[0])):
+                expected = minesweeper.count_adjacent_mines(grid, row, col)
+                assert counts[row][col] == expected
+                assert board.count_adjacent_mines(row, col) == expected
+                assert board.is_mine(row, col) == (grid[row][col] == "#")
+
+def test_board_is_smaller_than_list_grid():
+    board = CompactBoard.random(200, 200, 0.2, rng=random.Random(2))
+    # One byte per cell plus one bit per cell
+    assert board.nbytes <= 200 * 200 * 9 // 8 + 1
+
+def test_reveal_region_matches_list_grid():
+    rng = random.Random(3)
+    for _ in range(200):
+        rows, cols = rng.randrange(1, 15), rng.randrange(1, 15)
+        grid = random_grid(rng, rows, cols, 0.15)
+        board = CompactBoard.from_grid(grid)
+        visible = [["-"] * cols for _ in range(rows)]
+        for _ in range(3):
+            row, col = rng.randrange(rows), rng.randrange(cols)
+            expected = minesweeper.reveal_region(grid, visible, row, col)
+            assert sorted(board.reveal_region(row, col)) == sorted(expected)
+            assert board.to_visible_grid() == visible
+        hidden_safe = sum(cell == "-" and grid[r][c] != "#"
+                          for r, line in enumerate(visible) for c, cell in enumerate(line))
+        assert board.hidden_safe == hidden_safe
+
+def test_huge_empty_area_opens_without_recursion():
+    board = CompactBoard(600, 600)
+    assert len(board.reveal_region(0, 0)) == 600 * 600
+    assert board.is_cleared()
+
+def test_mine_index_matches_bitset():
+    rng = random.Random(3)
+    for _ in range(50):
+        rows, cols = rng.randrange(1, 30), rng.randrange(1, 30)
+        board = CompactBoard.generate(rows, cols, rng.randrange(rows * cols + 1),
+                                      seed=rng.randrange(1000))
+        from_bits = [index for index in range(rows * cols) if board.is_mine(*divmod(index, cols))]
+        assert list(board.mine_indexes()) == from_bits
+        top, left = rng.randrange(rows), rng.randrange(cols)
+        bottom, right = rng.randrange(top, rows), rng.randrange(left, cols)
+        inside = [(r, c) for r in range(top, bottom + 1) for c in range(left, right + 1)
+                  if board.is_mine(r, c)]
+        assert board.mines_in(top, left, bottom, right) == inside
+        assert board.count_mines_in(top, left, bottom, right) == len(inside)
+
+def test_repeated_mines_count_once():
+    board = CompactBoard(3, 3, [1, 1, 4])
+    assert board.mine_count == 2
+    assert board.hidden_safe == 7
+    assert list(CompactBoard(3, 3, [4, 1, 4, 1]).mine_index) == [1, 4]
+
+def test_mine_index_is_built_when_first_used():
+    board = CompactBoard.random(100, 100, 0.2, random.Random(2))
+    size = board.nbytes
+    assert board._mine_index is None
+    assert board.count_mines_in(0, 0, 99, 99) == board.mine_count
+    assert board.nbytes == size + board.mine_count * 8
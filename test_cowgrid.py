@@ -0,0 +1,54 @@
+# Checks that copy-on-write grids never change each other and only copy
+# the rows that are written.
+# Run with: python -m pytest
+
+import pytest
+
+import tutorial
+from cowgrid import CowGrid
+
+def test_writes_copy_one_row():
+    source = [[0, 1, 2], [3, 4, 5], [6, 7, 8]]
+    grid = CowGrid(source)
+    grid[1][2] = 9
+    grid[1, 0] = 9
+    assert grid == [[0, 1, 2], [9, 4, 9], [6, 7, 8]]
+    assert source == [[0, 1, 2], [3, 4, 5], [6, 7, 8]]
+    assert grid.copied_rows == 1
+    assert grid._rows[0] is source[0] and grid._rows[2] is source[2]
+
+def test_snapshots_are_independent():
+    grid = CowGrid([[0] * 4 for _ in range(4)])
+    grid[0, 0] = 1
+    copy = grid.snapshot()
+    grid[0, 1] = 2
+    copy[0, 2] = 3
+    assert grid[0] == [1, 2, 0, 0]
+    assert copy[0] == [1, 0, 3, 0]
+
+def test_grid_made_from_a_grid_shares_plain_rows():
+    grid = CowGrid([[0, 0], [0, 0]])
+    grid[0, 0] = 1
+    child = CowGrid(grid)
+    assert all(type(row) is list for row in child._rows)
+    # The row grid owned is shared now, so neither may write to it in place
+    child[0, 1] = 2
+    grid[0, 1] = 3
+    assert child == [[1, 2], [0, 0]]
+    assert grid == [[1, 3], [0, 0]]
+
+def test_rows_act_like_lists():
+    grid = CowGrid([[1, 2], [3, 4]])
+    assert [list(row) for row in grid] == [[1, 2], [3, 4]]
+    assert len(grid[-1]) == 2 and grid[-1][0] == 3
+    with pytest.raises(IndexError):
+        grid[2]
+    with pytest.raises(TypeError):
+        grid[0] = [5, 6]
+
+def test_tutorial_process_grid_copies_one_row():
+    start = [[0, 2, 0], [0, 0, 0], [0, 0, 0]]
+    grid = tutorial.process_grid(start)
+    assert grid == [[0, 2, 0], [0, 0, 0], [0, 0, 1]]
+    assert start == [[0, 2, 0], [0, 0, 0], [0, 0, 0]]
+    assert grid.copied_rows == 1
@@ -0,0 +1,48 @@
+# Checks the endless board against counting mines by hand, and that
+# dropped chunks come back as the player left them.
+# Run with: python -m pytest
+
+import random
+
+from endless import EndlessBoard
+
+def count_by_hand(board, row, col):
+    return sum(board.is_mine(r, c) for r in range(row - 1, row + 2)
+               for c in range(col - 1, col + 2) if (r, c) != (row, col))
+
+def test_counts_cross_chunk_borders():
+    board = EndlessBoard(seed=4, chunk_size=8)
+    rng = random.Random(4)
+    cells = [(row, col) for row in (-9, -8, -1, 0, 7, 8) for col in (-9, -8, -1, 0, 7, 8)]
+    cells += [(rng.randrange(-10**6, 10**6), rng.randrange(-10**6, 10**6)) for _ in range(200)]
+    for row, col in cells:
+        assert board.count_adjacent_mines(row, col) == count_by_hand(board, row, col)
+
+def test_mine_chance_is_roughly_right():
+    board = EndlessBoard(seed=1, mine_probability=0.3)
+    mines = sum(board.is_mine(row, col) for row in range(100) for col in range(100))
+    assert 2700 < mines < 3300
+
+def test_changed_chunks_survive_being_dropped():
+    board = EndlessBoard(seed=2, chunk_size=4, max_chunks=2)
+    board.toggle_flag(1, 1)
+    board.reveal_cell(-3, 5)
+    for col in range(0, 400, 4):  # Pushes both chunks out of memory
+        board.is_revealed(50, col)
+    assert board.loaded_chunks == 2
+    assert board.visible_cell(1, 1) == "F"
+    assert board.is_revealed(-3, 5)
+
+def test_reveal_region_stops_at_numbers_and_limit():
+    board = EndlessBoard(seed=3, mine_probability=0.1, chunk_size=16)
+    row, col = next((r, c) for r in range(100) for c in range(100)
+                    if not board.is_mine(r, c) and board.count_adjacent_mines(r, c) == 0)
+    changed = board.reveal_region(row, col)
+    assert len(changed) == len(set(changed)) > 1
+    for r, c in changed:
+        assert not board.is_mine(r, c)
+        if board.count_adjacent_mines(r, c) == 0:
+            # Every neighbour of an opened empty cell is open too
+            assert all(board.is_revealed(r + dr, c + dc) for dr in (-1, 0, 1) for dc in (-1, 0, 1))
+    wide_open = EndlessBoard(seed=3, mine_probability=0.0)
+    assert len(wide_open.reveal_region(0, 0, limit=500)) < 520
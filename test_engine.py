@@ -0,0 +1,36 @@
+# Checks the game rules and how simulate.py shares games between workers.
+# Run with: python -m pytest
+
+import pytest
+
+from engine import Game
+from simulate import play_chunk, run_batch, split_seeds
+
+def test_first_move_is_safe_on_crowded_boards():
+    for rows, cols, mines in ((3, 3, 2), (5, 5, 22), (5, 5, 24), (2, 2, 4)):
+        for seed in range(10):
+            game = Game(rows, cols, mines, seed=seed)
+            hit_mine, _ = game.move(1, 1)
+            assert game.board.mine_count == mines
+            # The clicked cell is kept free whenever there is room for it
+            assert hit_mine == (mines == rows * cols)
+
+def test_impossible_games_are_rejected():
+    for rows, cols, mines in ((3, 3, 10), (3, 3, -1), (0, 3, 0), (-3, -3, 1)):
+        with pytest.raises(ValueError):
+            Game(rows, cols, mines)
+
+def test_small_batches_reach_every_worker():
+    chunks = list(split_seeds(500, 10, 8, 500))
+    assert len(chunks) >= 8
+    assert [seed for chunk in chunks for seed in chunk] == list(range(10, 510))
+    # Big batches still stop at chunk_size
+    assert max(map(len, split_seeds(10**6, 0, 4, 500))) == 500
+    assert list(split_seeds(3, 0, 16, 500)) == [range(0, 1), range(1, 2), range(2, 3)]
+
+def test_batch_matches_playing_in_order():
+    summary = run_batch(40, 6, 6, 5, seed=3, workers=2)
+    expected = play_chunk(6, 6, 5, range(3, 43))
+    assert summary["games"] == 40
+    assert summary["win_rate"] == expected["wins"] / 40
+    assert summary["mean_moves"] == expected["moves"] / 40
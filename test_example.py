@@ -0,0 +1,31 @@
+# Checks the whole-grid counts in example.py against counting cell by cell.
+# Run with: python -m pytest
+
+import random
+
+import example
+
+def naive_sum(grid, cells):
+    total = 0
+    for row, col in cells:
+        if 0 <= row < len(grid) and 0 <= col < len(grid[row]):
+            total += 1 if grid[row][col] != 0 else 0
+    return total
+
+def random_grid(rng):
+    return [[rng.choice((0, 0, 0, 1, 2)) for _ in range(rng.randrange(1, 12))]
+            for _ in range(rng.randrange(1, 12))]
+
+def test_process_grid_fast_matches_process_grid():
+    rng = random.Random(6)
+    for _ in range(100):
+        grid = random_grid(rng)
+        expected = example.process_grid(grid)
+        assert example.process_grid_fast(grid, use_numpy=False) == expected
+        assert example.process_grid_fast(grid) == expected
+        for row in range(len(grid)):
+            for col in range(len(grid[row])):
+                if grid[row][col] == 0:
+                    around = [(row + dr, col + dc) for dr in (-1, 0, 1) for dc in (-1, 0, 1)
+                              if dr or dc]
+                    assert expected[row][col] == naive_sum(grid, around)
@@ -0,0 +1,93 @@
+# Checks the image writers by reading the files back by hand.
+# Run with: python -m pytest
+
+import random
+import struct
+import zlib
+
+import pytest
+
+import optional
+from board import CompactBoard
+from export import (EMPTY_SHADE, FLAG_SHADE, HIDDEN_SHADE, MINE_SHADE, NUMBER_STEP,
+                    board_rows, export, export_many, write_pbm, write_pgm, write_png)
+
+def read_png(path):
+    # Returns (width, height, depth, rows of pixel values) for a greyscale PNG
+    data = path.read_bytes()
+    assert data[:8] == b"\x89PNG\r\n\x1a\n"
+    position, chunks = 8, []
+    while position < len(data):
+        length, = struct.unpack(">I", data[position:position + 4])
+        kind = data[position + 4:position + 8]
+        body = data[position + 8:position + 8 + length]
+        crc, = struct.unpack(">I", data[position + 8 + length:position + 12 + length])
+        assert crc == zlib.crc32(body, zlib.crc32(kind))
+        chunks.append((kind, body))
+        position += 12 + length
+    assert chunks[0][0] == b"IHDR" and chunks[-1] == (b"IEND", b"")
+    width, height, depth, colour, *_ = struct.unpack(">IIBBBBB", chunks[0][1])
+    assert colour == 0
+    raw = zlib.decompress(b"".join(body for kind, body in chunks if kind == b"IDAT"))
+    size = width * depth // 8
+    rows = []
+    for row in range(height):
+        line = raw[row * (size + 1):(row + 1) * (size + 1)]
+        assert line[0] == 0  # No filter
+        if depth == 8:
+            rows.append(list(line[1:]))
+        else:
+            rows.append([int.from_bytes(line[i:i + 2], "big") for i in range(1, size + 1, 2)])
+    return width, height, depth, rows
+
+def random_image(rng, rows, cols, top):
+    return [[rng.randrange(-5, top + 5) for _ in range(cols)] for _ in range(rows)]
+
+def test_png_round_trip(tmp_path):
+    rng = random.Random(1)
+    image = random_image(rng, 70, 300, 255)
+    write_png(tmp_path / "a.png", image, level=1)
+    clamped = [[min(max(pixel, 0), 255) for pixel in row] for row in image]
+    assert read_png(tmp_path / "a.png") == (300, 70, 8, clamped)
+
+    wide = random_image(rng, 5, 9, 1000)
+    write_png(tmp_path / "b.png", wide, maxval=1000)
+    stretched = [[min(max(pixel, 0), 1000) * 65535 // 1000 for pixel in row] for row in wide]
+    assert read_png(tmp_path / "b.png") == (9, 5, 16, stretched)
+
+def test_numpy_arrays_match_lists(tmp_path):
+    np = optional.load_numpy()
+    if np is None:
+        pytest.skip("NumPy is not installed")
+    image = random_image(random.Random(2), 40, 33, 300)
+    for name, options in (("c.pgm", {}), ("c.png", {"maxval": 300}), ("c.pbm", {})):
+        export(tmp_path / ("list" + name), image, **options)
+        export(tmp_path / ("array" + name), np.array(image), **options)
+        assert (tmp_path / ("list" + name)).read_bytes() == (tmp_path / ("array" + name)).read_bytes()
+
+def test_pgm_and_pbm_bytes(tmp_path):
+    write_pgm(tmp_path / "a.pgm", [[0, 1], [2, 300]], maxval=2)
+    assert (tmp_path / "a.pgm").read_bytes() == b"P5\n2 2\n2\n\x00\x01\x02\x02"
+    # Pixels above zero are white, which PBM writes as 0 bits
+    write_pbm(tmp_path / "a.pbm", [[1, 0, 0, 0, 0, 0, 0, 0, 1], [0] * 9])
+    assert (tmp_path / "a.pbm").read_bytes() == b"P4\n9 2\n" + bytes([0x7F, 0x00, 0xFF, 0x80])
+
+def test_board_shades():
+    board = CompactBoard(2, 3, [0])
+    board.reveal_cell(0, 0)
+    board.reveal_cell(0, 1)
+    board.toggle_flag(1, 2)
+    assert list(board_rows(board)) == [
+        bytes([MINE_SHADE, EMPTY_SHADE - NUMBER_STEP, HIDDEN_SHADE]),
+        bytes([HIDDEN_SHADE, HIDDEN_SHADE, FLAG_SHADE]),
+    ]
+    assert list(board_rows(board, 2))[2] == bytes([HIDDEN_SHADE] * 4 + [FLAG_SHADE] * 2)
+    assert board._mine_index is None  # Drawing does not build the mine index
+
+def test_export_many(tmp_path):
+    jobs = [(str(tmp_path / f"{n}.png"), [[n] * 4] * 3) for n in range(6)]
+    jobs.append((str(tmp_path / "6.pgm"), [[1]], {"maxval": 1}))
+    assert export_many(jobs, workers=3) == [job[0] for job in jobs]
+    assert read_png(tmp_path / "5.png")[3] == [[5] * 4] * 3
+    with pytest.raises(ValueError):
+        export(tmp_path / "a.gif", [[0]])
@@ -0,0 +1,46 @@
+# Checks that mine placement is exact, repeatable and keeps the safe area.
+# Run with: python -m pytest
+
+import random
+
+import pytest
+
+import optional
+from generation import fitting_safe_radius, place_mines, safe_zone
+
+def test_exact_count_outside_safe_area():
+    rng = random.Random(10)
+    for _ in range(200):
+        rows, cols = rng.randrange(3, 30), rng.randrange(3, 30)
+        cell = (rng.randrange(rows), rng.randrange(cols))
+        excluded = safe_zone(rows, cols, *cell)
+        count = rng.randrange(rows * cols - len(excluded) + 1)
+        for use_numpy in (False, True):
+            mines = [int(index) for index in place_mines(rows, cols, count, seed=rng.randrange(100),
+                                                         safe_cell=cell, use_numpy=use_numpy)]
+            assert len(set(mines)) == count and mines == sorted(mines)
+            assert not set(mines) & set(excluded)
+            assert all(0 <= index < rows * cols for index in mines)
+
+def test_seeded_boards_do_not_depend_on_numpy(monkeypatch):
+    with_numpy = place_mines(200, 200, 5000, seed=3, safe_cell=(5, 5))
+    monkeypatch.setitem(optional._loaded, "numpy", None)  # As if NumPy were not installed
+    assert place_mines(200, 200, 5000, seed=3, safe_cell=(5, 5)) == with_numpy
+
+def test_negative_seeds_repeat():
+    for use_numpy in (False, True):
+        first = list(place_mines(9, 9, 10, seed=-5, use_numpy=use_numpy))
+        assert list(place_mines(9, 9, 10, seed=-5, use_numpy=use_numpy)) == first
+
+def test_random_source_must_match_path():
+    np = optional.load_numpy()
+    with pytest.raises(TypeError):
+        place_mines(9, 9, 10, rng=random.Random(1), use_numpy=True)
+    with pytest.raises(TypeError):
+        place_mines(9, 9, 10, rng=np.random.default_rng(1), use_numpy=False)
+
+def test_too_many_mines():
+    with pytest.raises(ValueError):
+        place_mines(3, 3, 1, safe_cell=(1, 1))
+    assert fitting_safe_radius(3, 3, 1, (1, 1)) == 0
+    assert fitting_safe_radius(3, 3, 9, (1, 1)) is None
@@ -0,0 +1,57 @@
+# Checks the streaming image pipeline against running the stages pixel by
+# pixel, with and without NumPy.
+# Run with: python -m pytest
+
+import random
+from array import array
+
+import pytest
+
+from image_pipeline import normalize, process_file, threshold
+
+def write_raw(path, code, pixels):
+    with open(path, "wb") as file:
+        file.write(array(code, pixels).tobytes())
+
+def read_raw(path, code):
+    values = array(code)
+    with open(path, "rb") as file:
+        values.frombytes(file.read())
+    return values.tolist()
+
+CASES = [
+    ("uint16", "H", [normalize(), threshold(100, 255)], range(0, 1 << 16)),
+    ("int16", "h", [normalize(0, 200)], range(-(1 << 15), 1 << 15)),
+    ("uint8", "B", [threshold()], range(256)),
+    ("int8", "b", [normalize(0, 100)], range(-128, 128)),
+]
+
+@pytest.mark.parametrize("use_numpy", [False, True])
+@pytest.mark.parametrize("source_type, code, stages, values", CASES)
+def test_matches_pixel_by_pixel(tmp_path, use_numpy, source_type, code, stages, values):
+    rng = random.Random(1)
+    width, rows = 13, 37
+    pixels = [rng.choice(values) for _ in range(width * rows)]
+    write_raw(tmp_path / "in.raw", code, pixels)
+    expected = []
+    for pixel in pixels:
+        for stage in stages:
+            pixel = stage(pixel)
+        expected.append(pixel)
+    assert process_file(tmp_path / "in.raw", tmp_path / "out.raw", width, stages,
+                        source_type=source_type, block_rows=5, use_numpy=use_numpy) == rows
+    assert read_raw(tmp_path / "out.raw", "B") == expected
+
+@pytest.mark.parametrize("use_numpy", [False, True])
+def test_empty_file(tmp_path, use_numpy):
+    (tmp_path / "in.raw").write_bytes(b"")
+    assert process_file(tmp_path / "in.raw", tmp_path / "out.raw", 4, [normalize()],
+                        use_numpy=use_numpy) == 0
+    assert (tmp_path / "out.raw").read_bytes() == b""
+
+def test_bad_input_is_rejected(tmp_path):
+    (tmp_path / "in.raw").write_bytes(b"\0" * 7)
+    with pytest.raises(ValueError):
+        process_file(tmp_path / "in.raw", tmp_path / "out.raw", 2, [normalize()])
+    with pytest.raises(ValueError):
+        process_file(tmp_path / "in.raw", tmp_path / "out.raw", 7, [], source_type="float32")
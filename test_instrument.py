@@ -0,0 +1,56 @@
+# Checks that instrumentation counts what the game does and leaves no trace
+# once it is turned off.
+# Run with: python -m pytest
+
+import json
+
+import instrument
+import minesweeper
+from board import CompactBoard
+from engine import Game, random_policy
+
+def test_disable_puts_the_originals_back():
+    reveal_region = CompactBoard.__dict__["reveal_region"]
+    count = minesweeper.count_adjacent_mines
+    with instrument.recording():
+        assert instrument.is_enabled()
+        assert CompactBoard.__dict__["reveal_region"] is not reveal_region
+    assert not instrument.is_enabled()
+    assert CompactBoard.__dict__["reveal_region"] is reveal_region
+    assert minesweeper.count_adjacent_mines is count
+    assert instrument.phase is instrument._no_phase
+
+def test_counts_match_the_game():
+    game = Game(20, 20, 40, seed=5, lives=10)
+    policy = random_policy(5)
+    revealed = 0
+    with instrument.recording() as result:
+        while not game.over and game.moves < 15:
+            revealed += len(game.move(*policy(game))[1])
+        if not game.over:
+            game.board.toggle_flag(*policy(game))
+        with instrument.phase("input"):
+            pass
+    counters = result["counters"]
+    assert counters["reveals"] == revealed
+    assert counters["cell_writes"] >= revealed
+    assert counters["neighbour_probes"] > 0
+    assert result["timers"]["input"]["calls"] == 1
+
+def test_list_grid_probes_count_in_bounds_neighbours():
+    grid = [[0] * 5 for _ in range(4)]
+    with instrument.recording() as result:
+        minesweeper.count_adjacent_mines(grid, 0, 0)   # A corner has 3 neighbours
+        minesweeper.count_adjacent_mines(grid, 2, 2)   # The middle has 8
+    assert result["counters"]["neighbour_probes"] == 11
+
+def test_reports():
+    instrument.reset()
+    instrument.counters["redraws"] = 2
+    instrument._record("redraw", 0.5)
+    report = json.loads(instrument.to_json())
+    assert report["counters"]["redraws"] == 2
+    text = instrument.to_prometheus("game")
+    assert "game_redraws_total 2" in text.splitlines()
+    assert 'game_phase_calls_total{phase="redraw"} 1' in text
+    instrument.reset()
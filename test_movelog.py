@@ -0,0 +1,55 @@
+# Checks that games written to a move log read back and replay exactly.
+# Run with: python -m pytest
+
+import random
+
+import movelog
+from engine import Game, random_policy
+
+def test_round_trip_and_replay(tmp_path):
+    path = tmp_path / "games.mslg"
+    rng = random.Random(8)
+    played = []
+    with movelog.MoveLogWriter(path) as writer:
+        for number in range(40):
+            rows, cols = rng.randrange(2, 40), rng.randrange(2, 40)
+            seed = rng.randrange(-10 ** 12, 10 ** 12)
+            game = Game(rows, cols, rng.randrange(rows * cols // 4 + 1), seed=seed,
+                        lives=rng.randrange(1, 4), use_numpy=number % 2 == 0)
+            writer.start_game(game)
+            policy = random_policy(number)
+            moves = []
+            while not game.over:
+                row, col = policy(game)
+                hit_mine, _ = game.move(row, col)
+                outcome = movelog.outcome_of(game, hit_mine)
+                writer.record(row, col, outcome)
+                moves.append((row, col, outcome))
+            played.append((game, moves))
+
+    logged = list(movelog.scan(path))
+    assert len(logged) == len(played)
+    for record, (game, moves) in zip(logged, played):
+        assert (record.rows, record.cols, record.mine_count, record.seed) == \
+               (game.rows, game.cols, game.mine_count, game.seed)
+        assert record.moves == moves and record.finished
+        replay = movelog.Replay(record, snapshot_every=4)
+        assert replay.seek(len(replay)).board.cells == game.board.cells
+        # Seeking back and forth through the snapshots gives the same boards
+        for turn in rng.sample(range(len(replay) + 1), min(5, len(replay) + 1)):
+            fresh = movelog.Replay(record).seek(turn)
+            assert replay.seek(turn).board.cells == fresh.board.cells
+
+def test_cut_off_log_keeps_finished_games(tmp_path):
+    path = tmp_path / "games.mslg"
+    with movelog.MoveLogWriter(path) as writer:
+        for seed in (1, 2):
+            game = Game(5, 5, 3, seed=seed)
+            writer.start_game(game)
+            hit_mine, _ = game.move(2, 2)
+            writer.record(2, 2, movelog.outcome_of(game, hit_mine))
+    data = path.read_bytes()
+    path.write_bytes(data[:-2])  # Lose the end of the second game
+    games = list(movelog.scan(path))
+    assert games[0].finished and games[0].moves == [(2, 2, games[0].moves[0][2])]
+    assert not games[-1].finished
@@ -0,0 +1,57 @@
+# Checks the summed-area and Fenwick indexes against counting cell by cell.
+# Run with: python -m pytest
+
+import random
+
+import pytest
+
+from neighbourhood import FenwickGrid, SummedAreaTable, is_non_zero
+
+def naive_sum(grid, cells):
+    total = 0
+    for row, col in cells:
+        if 0 <= row < len(grid) and 0 <= col < len(grid[row]):
+            total += 1 if grid[row][col] != 0 else 0
+    return total
+
+def random_grid(rng, ragged=False):
+    rows, cols = rng.randrange(1, 12), rng.randrange(1, 12)
+    return [[rng.choice((0, 0, 0, 1, 2)) for _ in range(rng.randrange(1, 12) if ragged else cols)]
+            for _ in range(rows)]
+
+def test_indexes_match_naive_counts():
+    rng = random.Random(4)
+    for _ in range(100):
+        grid = random_grid(rng, ragged=True)
+        indexes = (SummedAreaTable(grid, is_non_zero), FenwickGrid(grid, is_non_zero))
+        for _ in range(20):
+            row, col = rng.randrange(-2, len(grid) + 2), rng.randrange(-2, 14)
+            radius = rng.randrange(0, 4)
+            square = [(row + dr, col + dc) for dr in range(-radius, radius + 1)
+                      for dc in range(-radius, radius + 1) if dr or dc]
+            diamond = [(r, c) for r, c in square if abs(r - row) + abs(c - col) <= radius]
+            for index in indexes:
+                assert index.moore(row, col, radius) == naive_sum(grid, square)
+                assert index.von_neumann(row, col, radius) == naive_sum(grid, diamond)
+
+def test_fenwick_updates():
+    rng = random.Random(5)
+    for _ in range(50):
+        grid = random_grid(rng)
+        index = FenwickGrid(grid, is_non_zero)
+        for _ in range(30):
+            row, col = rng.randrange(len(grid)), rng.randrange(len(grid[0]))
+            value = rng.choice((0, 1))
+            grid[row][col] = value
+            index.set_value(row, col, value)
+            top, left = rng.randrange(len(grid)), rng.randrange(len(grid[0]))
+            bottom, right = rng.randrange(top, len(grid)), rng.randrange(left, len(grid[0]))
+            cells = [(r, c) for r in range(top, bottom + 1) for c in range(left, right + 1)]
+            assert index.rect_sum(top, left, bottom, right) == naive_sum(grid, cells)
+
+def test_fenwick_rejects_cells_off_the_grid():
+    index = FenwickGrid([[0, 1], [1, 0]], is_non_zero)
+    for row, col in ((2, 0), (0, 2), (-1, 0), (0, -1)):
+        with pytest.raises(IndexError):
+            index.set_value(row, col, 1)
+    assert index.rect_sum(0, 0, 1, 1) == 2
@@ -0,0 +1,39 @@
+# Checks the shared-memory neighbour counts against counting cell by cell.
+# Run with: python -m pytest
+
+import random
+
+import pytest
+
+import optional
+from parallel import SharedGrid, count_neighbours
+
+def naive_counts(grid):
+    rows, cols = len(grid), len(grid[0])
+    return [[sum(1 for r in range(row - 1, row + 2) for c in range(col - 1, col + 2)
+                 if (r, c) != (row, col) and 0 <= r < rows and 0 <= c < cols and grid[r][c])
+             for col in range(cols)] for row in range(rows)]
+
+def random_grid(rng, rows, cols):
+    return [[rng.choice((0, 0, 1, 5)) for _ in range(cols)] for _ in range(rows)]
+
+@pytest.mark.parametrize("workers, band_rows", [(1, None), (1, 1), (2, 3), (2, None)])
+def test_counts_match_naive(workers, band_rows):
+    rng = random.Random(workers * 10 + (band_rows or 0))
+    for rows, cols in ((1, 1), (1, 7), (9, 1), (17, 13)):
+        grid = random_grid(rng, rows, cols)
+        counts = count_neighbours(grid, workers=workers, band_rows=band_rows)
+        assert [list(row) for row in counts] == naive_counts(grid)
+
+def test_counts_without_numpy(monkeypatch):
+    monkeypatch.setitem(optional._loaded, "numpy", None)  # As if NumPy were not installed
+    grid = random_grid(random.Random(3), 11, 6)
+    assert count_neighbours(grid, workers=1, band_rows=4) == naive_counts(grid)
+
+def test_results_can_stay_in_shared_memory():
+    grid = random_grid(random.Random(4), 8, 8)
+    with SharedGrid(8, 8) as shared, SharedGrid(8, 8) as out:
+        for row, cells in enumerate(grid):
+            shared.buffer[row * 8:(row + 1) * 8] = bytes(1 if cell else 0 for cell in cells)
+        assert count_neighbours(shared, workers=2, out=out) is out
+        assert [list(out.buffer[row * 8:(row + 1) * 8]) for row in range(8)] == naive_counts(grid)
@@ -0,0 +1,64 @@
+# Checks the exact mine probabilities against trying every mine layout.
+# Run with: python -m pytest
+
+import random
+from itertools import combinations
+
+import pytest
+
+from engine import Game, random_policy
+from probability import ProbabilityEngine, count_layouts
+
+def play(seed, rows, cols, mines, moves):
+    # Plays some random moves, yielding the game after each one
+    game = Game(rows, cols, mines, seed=seed, lives=mines + 1)
+    policy = random_policy(seed)
+    while not game.over and game.moves < moves:
+        game.move(*policy(game))
+        yield game
+
+def enumerate_chances(board):
+    # The chance of a mine in each hidden cell, by trying every layout
+    hidden = [(row, col) for row in range(board.rows) for col in range(board.cols)
+              if not board.is_revealed(row, col)]
+    found = {(row, col) for row in range(board.rows) for col in range(board.cols)
+             if board.is_revealed(row, col) and board.is_mine(row, col)}
+    numbers = [(row, col) for row in range(board.rows) for col in range(board.cols)
+               if board.is_revealed(row, col) and not board.is_mine(row, col)]
+    around = {cell: [(r, c) for r in range(cell[0] - 1, cell[0] + 2)
+                     for c in range(cell[1] - 1, cell[1] + 2) if (r, c) != cell]
+              for cell in numbers}
+    totals = dict.fromkeys(hidden, 0)
+    layouts = 0
+    for chosen in combinations(hidden, board.mine_count - len(found)):
+        mines = found.union(chosen)
+        if all(sum(cell in mines for cell in around[number]) == board.count_adjacent_mines(*number)
+               for number in numbers):
+            layouts += 1
+            for cell in chosen:
+                totals[cell] += 1
+    return {cell: total / layouts for cell, total in totals.items()}
+
+def test_probabilities_match_enumeration():
+    rng = random.Random(7)
+    checked = 0
+    for seed in range(60):
+        rows, cols = rng.randrange(4, 6), rng.randrange(4, 6)
+        engine = None
+        for game in play(seed, rows, cols, rng.randrange(3, 7), 4):
+            if engine is None:
+                engine = ProbabilityEngine(game.board)
+            engine.update(game.last_changed)
+            if game.over:
+                break
+            expected = enumerate_chances(game.board)
+            for (row, col), chance in expected.items():
+                assert engine.probability(row, col) == pytest.approx(chance)
+            checked += 1
+    assert checked > 50
+
+def test_count_layouts_groups_shared_cells():
+    # Two rules sharing one cell: a+b = 1 and b+c = 1
+    groups, ways, mines = count_layouts([({(0, 0), (0, 1)}, 1), ({(0, 1), (0, 2)}, 1)])
+    assert ways == {1: 1, 2: 1}
+    assert sorted(map(len, groups)) == [1, 1, 1]
@@ -0,0 +1,48 @@
+# Checks RaggedArray against working on the plain ragged lists, with and
+# without NumPy.
+# Run with: python -m pytest
+
+import random
+from array import array
+
+import pytest
+
+from ragged import RaggedArray
+
+def random_rows(rng, typecode):
+    make = (lambda: rng.uniform(-1e6, 1e6)) if typecode == "d" else (lambda: rng.randrange(-10**9, 10**9))
+    return [[make() for _ in range(rng.choice((0, 0, 1, 2, 5, 9)))]
+            for _ in range(rng.randrange(0, 40))]
+
+@pytest.mark.parametrize("typecode", ["q", "d"])
+@pytest.mark.parametrize("use_numpy", [False, True])
+def test_reductions_match_lists(typecode, use_numpy):
+    rng = random.Random(8)
+    for _ in range(50):
+        rows = random_rows(rng, typecode)
+        ragged = RaggedArray.from_lists(rows, typecode)
+        assert ragged.to_lists() == rows and ragged == rows
+        assert ragged.row_sums(use_numpy) == pytest.approx([sum(row) for row in rows])
+        assert ragged.row_maximums(use_numpy=use_numpy) == [max(row) if row else None for row in rows]
+        assert ragged.row_minimums(-1, use_numpy) == [min(row) if row else -1 for row in rows]
+        assert ragged.row_means(use_numpy) == pytest.approx(
+            [sum(row) / len(row) if row else None for row in rows])
+        assert list(ragged.row_lengths()) == [len(row) for row in rows]
+
+def test_rows_are_views_and_appends():
+    ragged = RaggedArray.from_lists([[1, 2, 3], [], [4]])
+    assert list(ragged[0]) == [1, 2, 3] and list(ragged[-1]) == [4]
+    assert ragged.row_length(1) == 0
+    with pytest.raises(IndexError):
+        ragged[3]
+    ragged.append([5, 6])
+    assert ragged.to_lists() == [[1, 2, 3], [], [4], [5, 6]]
+    assert ragged.nbytes == 6 * 8 + 5 * 8
+    view = ragged[0]
+    with pytest.raises(BufferError):
+        ragged.append([7])
+    view.release()
+
+def test_offsets_must_match_values():
+    with pytest.raises(ValueError):
+        RaggedArray(array("q", [1, 2]), array("q", [0, 1]))
@@ -0,0 +1,64 @@
+# Checks that redrawing only the changed cells leaves the same picture on
+# screen as drawing the whole window again.
+# Run with: python -m pytest
+
+import io
+import re
+
+from engine import Game, random_policy
+from render import ViewportRenderer
+
+def screen_after(text, lines=30, columns=120):
+    # Plays the output through a tiny terminal that only knows the escape
+    # codes the renderer uses, returning the screen as a list of strings
+    screen = [[" "] * columns for _ in range(lines)]
+    line = column = 0
+    for escape, char in re.findall(r"(\x1b\[[0-9;]*[A-Za-z])|(.)", text, re.S):
+        if escape.endswith("H"):
+            line, column = (int(part) - 1 for part in escape[2:-1].split(";"))
+        elif escape == "\x1b[2J":
+            screen = [[" "] * columns for _ in range(lines)]
+        elif escape == "\x1b[J":
+            screen[line][column:] = [" "] * (columns - column)
+            screen[line + 1:] = [[" "] * columns for _ in range(lines - line - 1)]
+        elif char == "\n":
+            line, column = line + 1, 0
+        elif char:
+            screen[line][column] = char
+            column += 1
+    return ["".join(row).rstrip() for row in screen]
+
+def test_partial_redraws_match_full_frames():
+    game = Game(40, 40, 250, seed=6, lives=30)
+    policy = random_policy(6)
+    out = io.StringIO()
+    renderer = ViewportRenderer(game.board, height=12, width=15, out=out)
+    renderer.render(["start"])
+    for turn in range(25):
+        if game.over:
+            break
+        changed = game.move(*policy(game))[1]
+        renderer.board = game.board  # The mines are placed on the first move
+        renderer.mark_dirty(changed)
+        renderer.render([f"turn {turn}"])
+        fresh = io.StringIO()
+        ViewportRenderer(game.board, height=12, width=15, out=fresh).render([f"turn {turn}"])
+        assert screen_after(out.getvalue()) == screen_after(fresh.getvalue())
+
+def test_only_dirty_cells_are_sent():
+    game = Game(30, 30, 0, seed=1)
+    out = io.StringIO()
+    renderer = ViewportRenderer(game.board, height=10, width=10, out=out)
+    renderer.render()
+    out.seek(0)
+    out.truncate()
+    game.board.toggle_flag(3, 4)
+    renderer.mark_dirty([(3, 4), (25, 25)])  # The second is outside the window
+    renderer.render()
+    assert out.getvalue().count("\x1b[") == 3  # One cell, then the status line
+
+def test_window_stays_inside_the_board():
+    game = Game(30, 30, 0, seed=1)
+    renderer = ViewportRenderer(game.board, height=10, width=10, out=io.StringIO())
+    renderer.center_on(29, 0)
+    assert (renderer.top, renderer.left) == (20, 0)
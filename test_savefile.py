@@ -0,0 +1,51 @@
+# Checks that saved boards load back exactly, with and without the list
+# of changed cells.
+# Run with: python -m pytest
+
+from engine import Game, random_policy
+from savefile import load_board, save_board, save_changes
+
+def test_incremental_saves_load_back(tmp_path):
+    for use_changed in (True, False):
+        path = tmp_path / f"board{use_changed}.msb"
+        game = Game(150, 200, 3000, seed=11, lives=50)
+        policy = random_policy(11)
+        game.move(*policy(game))
+        save_board(path, game.board, seed=11, lives=game.lives)
+        for _ in range(5):
+            changed = []
+            for _ in range(10):
+                if game.over:
+                    break
+                changed += game.move(*policy(game))[1]
+            row, col = policy(game) if not game.over else (0, 0)
+            game.board.toggle_flag(row, col)
+            changed.append((row, col))
+            written = save_changes(path, game.board, game.lives,
+                                   changed if use_changed else None)
+            assert written <= len({(r * 200 + c) // 4096 for r, c in changed})
+            board, seed, lives = load_board(path)
+            assert bytes(board.cells) == bytes(game.board.cells)
+            assert (seed, lives, board.hidden_safe) == (11, game.lives, game.board.hidden_safe)
+
+def test_loaded_board_can_be_saved_over_its_own_file(tmp_path):
+    path = tmp_path / "board.msb"
+    game = Game(120, 90, 1500, seed=4, lives=20)
+    policy = random_policy(4)
+    game.move(*policy(game))
+    save_board(path, game.board, seed=4, lives=game.lives)
+
+    board, seed, lives = load_board(path)
+    game = Game.resume(board, seed=seed, lives=lives)
+    for _ in range(10):
+        if not game.over:
+            game.move(*policy(game))
+    expected = bytes(game.board.cells), bytes(game.board.mines)
+    save_board(path, game.board, seed=4, lives=game.lives)
+    # The loaded board still reads from the file it replaced
+    assert (bytes(game.board.cells), bytes(game.board.mines)) == expected
+
+    board, _, lives = load_board(path)
+    assert (bytes(board.cells), bytes(board.mines)) == expected
+    assert (lives, board.hidden_safe) == (game.lives, game.board.hidden_safe)
+    assert [file.name for file in tmp_path.iterdir()] == ["board.msb"]
@@ -0,0 +1,72 @@
+# Checks the game server's replies, and that a move on a big board does not
+# hold up other clients.
+# Run with: python -m pytest
+
+import asyncio
+import json
+
+from server import GameServer
+
+def test_game_over_the_protocol():
+    server = GameServer()
+    session = server.handle_request({"cmd": "new", "rows": 5, "cols": 5, "mines": 3, "seed": 2})
+    reply = server.handle_request({"cmd": "move", "session": session["session"], "row": 2, "col": 2})
+    assert not reply["hit_mine"] and [2, 2] in map(list, reply["changed"])
+    view = server.handle_request({"cmd": "view", "session": session["session"]})
+    assert len(view["rows"]) == 5 and view["rows"][2][2] != "-"
+    assert server.handle_request({"cmd": "close", "session": session["session"]}) == {"closed": True}
+    assert server.handle_request({"cmd": "view", "session": session["session"]}) == {"error": "unknown session"}
+
+def test_bad_requests_get_errors():
+    server = GameServer(max_cells=100)
+    for request in ({"cmd": "new", "rows": 20, "cols": 20}, {"cmd": "new", "mines": 100},
+                    {"cmd": "new", "seed": -1}, {"cmd": "new", "rows": "x"},
+                    {"cmd": "view", "session": ["a"]}, {"cmd": "view", "session": {"a": 1}},
+                    {"cmd": "move", "session": None}):
+        assert "error" in server.handle_request(request)
+    session = server.handle_request({"cmd": "new"})["session"]
+    assert "error" in server.handle_request({"cmd": "move", "session": session, "row": 99, "col": 0})
+    assert "error" in server.handle_request({"cmd": "jump", "session": session})
+
+def test_huge_moves_send_a_count():
+    server = GameServer(max_changed=50)
+    session = server.handle_request({"cmd": "new", "rows": 30, "cols": 30, "mines": 0})["session"]
+    reply = server.handle_request({"cmd": "move", "session": session, "row": 0, "col": 0})
+    assert reply["changed"] is None and reply["changed_count"] == 900 and reply["won"]
+
+def test_big_moves_do_not_block_other_clients():
+    async def run():
+        server = GameServer()
+        big = await server.answer({"cmd": "new", "rows": 500, "cols": 500, "mines": 0})
+        small = await server.answer({"cmd": "new", "rows": 5, "cols": 5, "mines": 0})
+        finished = []
+
+        async def play(name, session):
+            await server.answer({"cmd": "move", "session": session, "row": 0, "col": 0})
+            finished.append(name)
+
+        big_move = asyncio.create_task(play("big", big["session"]))
+        await asyncio.sleep(0.01)  # Let the big move start in its thread
+        await play("small", small["session"])
+        await big_move
+        return finished
+
+    assert asyncio.run(run()) == ["small", "big"]
+
+def test_clients_over_a_socket(tmp_path):
+    async def run():
+        server = GameServer()
+        path = str(tmp_path / "server.sock")
+        listener = await asyncio.start_unix_server(server.handle_client, path)
+        reader, writer = await asyncio.open_unix_connection(path)
+        for line in (b'{"cmd": "new", "id": 1}\n', b"not json\n", b"[1, 2]\n"):
+            writer.write(line)
+        replies = [json.loads(await reader.readline()) for _ in range(3)]
+        writer.close()
+        listener.close()
+        await listener.wait_closed()
+        return replies
+
+    replies = asyncio.run(run())
+    assert replies[0]["id"] == 1 and "session" in replies[0]
+    assert replies[1:] == [{"error": "bad request"}] * 2
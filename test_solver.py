@@ -0,0 +1,35 @@
+# Checks that the frontier solver only ever proves true things, and that
+# using it wins more games than guessing.
+# Run with: python -m pytest
+
+from engine import Game, random_policy
+from simulate import play_chunk
+from solver import FrontierSolver, solver_policy
+
+def play(seed, rows, cols, mines, moves):
+    # Plays some random moves, yielding the game after each one
+    game = Game(rows, cols, mines, seed=seed, lives=mines + 1)
+    policy = random_policy(seed)
+    while not game.over and game.moves < moves:
+        game.move(*policy(game))
+        yield game
+
+def test_solver_is_sound():
+    proven = 0
+    for seed in range(100):
+        solver = None
+        for game in play(seed, 8, 8, 12, 12):
+            if solver is None:
+                solver = FrontierSolver(game.board)
+            solver.update(game.last_changed)
+            board = game.board
+            assert not any(board.is_mine(*cell) for cell in solver.safe)
+            assert all(board.is_mine(*cell) for cell in solver.mines)
+            assert not any(board.is_revealed(*cell) for cell in solver.safe)
+            proven += len(solver.safe)
+    assert proven > 0
+
+def test_solver_beats_guessing():
+    guessing = play_chunk(9, 9, 10, range(200), random_policy, lives=1)
+    solving = play_chunk(9, 9, 10, range(200), solver_policy, lives=1)
+    assert solving["wins"] > guessing["wins"]